@@ -0,0 +1,76 @@
+# anchor_bench.py
+#
+# Micro-benchmark: vectorized vs per-pixel Passmark anchor search.
+# Run from the repo root:  python -m benchmarks.anchor_bench [--size 1920x1080]
+
+import argparse
+import random
+import time
+
+from PIL import Image, ImageDraw
+
+from ocr_read import find_grey_white_pair, find_grey_white_pair_loop
+
+
+def make_passmark_like(width, height, anchor_xy, seed=0):
+    """
+    Dark screenshot with some grey/white clutter and one grey-over-white
+    anchor line starting at anchor_xy (x, y_grey).
+    """
+    rnd = random.Random(seed)
+    img = Image.new("RGB", (width, height), (30, 30, 30))
+    draw = ImageDraw.Draw(img)
+
+    # Decoys: short grey-over-white segments and white blocks
+    for _ in range(40):
+        x = rnd.randint(0, width - 300)
+        y = rnd.randint(0, height - 2)
+        draw.line((x, y, x + rnd.randint(10, 300), y), fill=(64, 64, 64))
+        draw.line((x, y + 1, x + rnd.randint(10, 300), y + 1), fill=(255, 255, 255))
+
+    x, y = anchor_xy
+    draw.line((x, y, x + 650, y), fill=(66, 62, 64))
+    draw.line((x, y + 1, x + 650, y + 1), fill=(250, 255, 252))
+    return img
+
+
+def time_call(fn, img, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(img, length=597)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Passmark anchor detection.")
+    parser.add_argument('--size', default='1920x1080', help='Screenshot size, WIDTHxHEIGHT.')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported).')
+    parser.add_argument('--cases', type=int, default=3, help='Number of synthetic screenshots.')
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    rnd = random.Random(42)
+
+    total_loop = total_vec = 0.0
+    for case in range(args.cases):
+        anchor = (rnd.randint(0, width - 700), rnd.randint(0, height - 2))
+        img = make_passmark_like(width, height, anchor, seed=case)
+
+        expected, t_loop = time_call(find_grey_white_pair_loop, img, 1)
+        got, t_vec = time_call(find_grey_white_pair, img, args.repeat)
+        if got != expected:
+            raise SystemExit(f"Mismatch for case {case}: loop={expected} vectorized={got}")
+
+        total_loop += t_loop
+        total_vec += t_vec
+        print(f"case {case}: anchor={got} loop={t_loop * 1000:.1f} ms vectorized={t_vec * 1000:.2f} ms")
+
+    print(f"total: loop={total_loop:.3f} s vectorized={total_vec:.4f} s "
+          f"speedup={total_loop / total_vec:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
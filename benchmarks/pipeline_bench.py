@@ -0,0 +1,262 @@
+# pipeline_bench.py
+#
+# Stage-by-stage benchmark of the ingestion pipeline on synthetic archives
+# (see benchmarks/synthetic.py). Runs offline, with no OCR program.
+# Run from the repo root:
+#   python -m benchmarks.pipeline_bench run [--sizes 10,100,1000] [--out pipeline_bench.json]
+#   python -m benchmarks.pipeline_bench compare BASE.json NEW.json [--threshold 0.15]
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+import PIL
+from PIL import Image
+
+from benchmarks.synthetic import SCREEN_SIZE, SyntheticArchive, archive_entries, strip_backend
+from includes.config import BENCH_CONFIG
+from includes.frame import Frame
+from includes.scan import scan_root
+from includes.stats import refresh_stats
+from includes.store import IsoStore, save_json
+from ocr_read import get_roi_plan, parse_roi_texts, screenshot_offsets
+
+# In pipeline order. The per-screenshot stages run on a sample of the
+# archive and are scaled up to its size; the others run on all of it.
+STAGES = ("scan", "decode", "anchor", "crop", "ocr", "parse", "stats", "save_json")
+SCREENSHOT_STAGES = ("decode", "anchor", "crop", "ocr", "parse")
+
+DEFAULT_SIZES = "10,100,1000"
+DEFAULT_OUT = "pipeline_bench.json"
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_screenshots(archive: SyntheticArchive, paths: List[str], repeat: int) -> Dict[str, float]:
+    """
+    Seconds per stage for one pass over `paths` (best of `repeat`), timing
+    each stage exactly as ocr_reader / process_image run it. Every value is
+    checked against what was rendered.
+    """
+    backend = strip_backend()
+    best = {stage: float("inf") for stage in SCREENSHOT_STAGES}
+    for _ in range(repeat):
+        spent = dict.fromkeys(SCREENSHOT_STAGES, 0.0)
+        for path in paths:
+            bench_key = BENCH_CONFIG[os.path.basename(os.path.dirname(path))]
+            iso_name = os.path.basename(os.path.dirname(os.path.dirname(path)))
+            plan = get_roi_plan(iso_name, bench_key)
+
+            t0 = time.perf_counter()
+            frame = Frame.open(path)
+            t1 = time.perf_counter()
+            offsets = screenshot_offsets(frame, bench_key)
+            t2 = time.perf_counter()
+            if offsets is None:
+                raise SystemExit(f"No anchor found in {path}")
+            crops = [Image.fromarray(roi.crop(frame, offsets)) for roi in plan]
+            t3 = time.perf_counter()
+            texts = backend.recognize_many(crops)
+            t4 = time.perf_counter()
+            result = parse_roi_texts(list(enumerate(texts, start=1)), bench_key, path)
+            t5 = time.perf_counter()
+
+            if result.text != archive.expected[path]:
+                raise SystemExit(f"Mismatch for {path}: rendered `{archive.expected[path]}`, read `{result.text}`")
+            for stage, dt in zip(SCREENSHOT_STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4)):
+                spent[stage] += dt
+        for stage in SCREENSHOT_STAGES:
+            best[stage] = min(best[stage], spent[stage])
+    return best
+
+
+def run_size(archive: SyntheticArchive, sample: int, repeat: int, seed: int, work_dir: str) -> Dict[str, Any]:
+    """Time every stage on the archive as it is now; returns {stage: {...}}."""
+    results: Dict[str, Any] = {}
+    index: Dict[str, Any] = {}
+
+    def scan() -> None:
+        index.clear()
+        index.update(scan_root(archive.root))
+
+    results["scan"] = {"seconds": _best(scan, repeat), "items": len(archive.iso_names), "unit": "iso"}
+
+    paths = [p for benches in index.values() for shots in benches.values() for p in shots]
+    picked = sorted(random.Random(seed).sample(paths, min(sample, len(paths))))
+    per_stage = time_screenshots(archive, picked, repeat)
+    scale = len(paths) / len(picked) if picked else 0.0
+    for stage in SCREENSHOT_STAGES:
+        results[stage] = {
+            "seconds": per_stage[stage] * scale,
+            "items": len(paths),
+            "unit": "screenshot",
+            "sampled": len(picked),
+        }
+
+    entries = archive_entries(archive)
+
+    def stats() -> None:
+        store = IsoStore(json.loads(json.dumps(entries)))
+        for entry in store.entries:
+            for bench_key in ("motionmark", "jetstream", "speedometer"):
+                store.mark_dirty(entry["name"], bench_key)
+        refresh_stats(store)
+
+    results["stats"] = {"seconds": _best(stats, repeat), "items": len(entries), "unit": "iso"}
+
+    json_path = os.path.join(work_dir, "data_benchmarks.json")
+
+    def save() -> None:
+        # A fresh file every time, so the unchanged-content shortcut never applies
+        for path in (json_path, json_path + ".bak"):
+            if os.path.exists(path):
+                os.remove(path)
+        save_json(json_path, entries)
+
+    results["save_json"] = {"seconds": _best(save, repeat), "items": len(entries), "unit": "iso"}
+
+    for result in results.values():
+        result["us_per_item"] = result["seconds"] / result["items"] * 1e6 if result["items"] else 0.0
+    return {stage: results[stage] for stage in STAGES}
+
+
+def run(args: argparse.Namespace) -> None:
+    sizes = sorted({int(s) for s in args.sizes.split(",") if s.strip()})
+    width, height = (int(v) for v in args.screen.lower().split("x"))
+    work_dir = tempfile.mkdtemp(prefix="pipeline_bench_", dir=args.work_dir)
+    archive = SyntheticArchive(
+        os.path.join(work_dir, "data_collected"), shots=args.shots, seed=args.seed, size=(width, height)
+    )
+    report: Dict[str, Any] = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pillow": PIL.__version__,
+            "platform": platform.platform(),
+            "screen": f"{width}x{height}",
+            "shots": args.shots,
+            "sample": args.sample,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "sizes": {},
+    }
+    try:
+        for size in sizes:
+            start = time.perf_counter()
+            archive.add_isos(size)
+            print(f"{size} ISOs: archive ready in {time.perf_counter() - start:.1f} s")
+            results = run_size(archive, args.sample, args.repeat, args.seed, work_dir)
+            report["sizes"][str(size)] = results
+            for stage, result in results.items():
+                print(f"  {stage:<10} {result['seconds'] * 1000:10.1f} ms  "
+                      f"{result['us_per_item']:10.1f} us/{result['unit']}")
+    finally:
+        if args.keep:
+            print(f"Archive kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"Results written to {args.out}")
+
+
+def compare_reports(
+    base: Dict[str, Any],
+    new: Dict[str, Any],
+    threshold: float,
+    min_delta_ms: float,
+) -> List[Dict[str, Any]]:
+    """
+    One row per (size, stage) present in both reports, with the ratio of
+    new to base time; rows slower by more than `threshold` (and by more
+    than min_delta_ms, to ignore timer noise on tiny stages) are regressions.
+    """
+    rows = []
+    for size, stages in new["sizes"].items():
+        for stage, result in stages.items():
+            before = base["sizes"].get(size, {}).get(stage)
+            if before is None:
+                continue
+            ratio = result["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+            delta_ms = (result["seconds"] - before["seconds"]) * 1000
+            rows.append({
+                "size": size,
+                "stage": stage,
+                "base_ms": before["seconds"] * 1000,
+                "new_ms": result["seconds"] * 1000,
+                "ratio": ratio,
+                "regression": ratio > 1 + threshold and delta_ms > min_delta_ms,
+            })
+    return rows
+
+
+def compare(args: argparse.Namespace) -> None:
+    with open(args.base, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, "r", encoding="utf-8") as f:
+        new = json.load(f)
+    for key in ("screen", "shots"):
+        if base["meta"].get(key) != new["meta"].get(key):
+            print(f"Warning: `{key}` differs ({base['meta'].get(key)} vs {new['meta'].get(key)}), "
+                  f"timings are not comparable")
+
+    rows = compare_reports(base, new, args.threshold, args.min_delta_ms)
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['size']:>6} {row['stage']:<10} {row['base_ms']:10.1f} ms -> {row['new_ms']:10.1f} ms "
+              f"({row['ratio']:.2f}x){flag}")
+
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"{len(regressions)} stage(s) slower by more than {args.threshold * 100:.0f}%")
+        sys.exit(1)
+    print("No regressions.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ingestion pipeline on synthetic screenshots.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Time every stage at each archive size.")
+    p_run.add_argument('--sizes', default=DEFAULT_SIZES, help='Comma-separated archive sizes, in ISOs.')
+    p_run.add_argument('--shots', type=int, default=20, help='Screenshots per bench (Passmark always has 1).')
+    p_run.add_argument('--sample', type=int, default=200, help='Screenshots timed per size for the per-screenshot stages.')
+    p_run.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported).')
+    p_run.add_argument('--seed', type=int, default=0, help='Seed for values, layouts and the sample.')
+    p_run.add_argument('--screen', default=f"{SCREEN_SIZE[0]}x{SCREEN_SIZE[1]}", help='Screenshot size, WIDTHxHEIGHT.')
+    p_run.add_argument('--work-dir', default=None, help='Where to build the archive (default: system temp dir).')
+    p_run.add_argument('--keep', action='store_true', help='Keep the synthetic archive afterwards.')
+    p_run.add_argument('--out', default=DEFAULT_OUT, help='Results JSON file.')
+    p_run.set_defaults(func=run)
+
+    p_cmp = sub.add_parser("compare", help="Compare two result files and flag regressions.")
+    p_cmp.add_argument('base', help='Baseline results JSON.')
+    p_cmp.add_argument('new', help='New results JSON.')
+    p_cmp.add_argument('--threshold', type=float, default=0.15, help='Allowed slowdown per stage (0.15 = 15%%).')
+    p_cmp.add_argument('--min-delta-ms', type=float, default=1.0, help='Ignore slowdowns smaller than this.')
+    p_cmp.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
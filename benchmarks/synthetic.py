@@ -0,0 +1,260 @@
+# synthetic.py
+#
+# Synthetic data_collected archives for the pipeline benchmarks: screenshots
+# rendered with PIL at the ROI positions of ocr_read's roi_configurations,
+# plus an OCR backend that reads the values back from the crops.
+
+import os
+import random
+import shutil
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from includes.config import BENCH_CONFIG
+from includes.ocr_backends import FakeOcrBackend, OcrError
+from includes.utils import dt_to_timestamp_str
+from ocr_read import (
+    get_roi_plan,
+    jetstream_roi_configurations,
+    motionmark_roi_configurations,
+    speedometer_roi_configurations,
+    passmark_roi_configurations,
+)
+
+SCREEN_SIZE = (1920, 1080)
+BACKGROUND = (30, 30, 30)
+TEXT_COLOR = (220, 220, 220)
+
+# Every ROI carries its text as a one-pixel-high strip code: a length byte,
+# then the ASCII bytes, one pixel per bit (white = 1), STRIP_INSET pixels in
+# from the ROI's top-left corner. Black and white survive the MotionMark
+# threshold and the hexagon mask, so the fake backend reads back exactly
+# what was rendered. The digits are drawn too, under the strip.
+STRIP_INSET = 2
+
+# Distinct screenshots rendered per (layout, bench); the archive hard-links them
+POOL_SIZE = 8
+
+# ISO folders with their own ROI layout; the other ISOs use 'default'
+LAYOUT_FOLDERS = sorted(
+    {
+        name
+        for configs in (
+            jetstream_roi_configurations,
+            motionmark_roi_configurations,
+            speedometer_roi_configurations,
+            passmark_roi_configurations,
+        )
+        for name in configs
+        if name != "default"
+    }
+)
+
+SUBFOLDER_BY_BENCH = {bench_key: subfolder for subfolder, bench_key in BENCH_CONFIG.items()}
+
+FIRST_TIMESTAMP = datetime(2025, 1, 1, 9, 0, 0)
+
+
+# ---------- Values ----------
+
+def random_tokens(bench_key: str, rnd: random.Random) -> List[str]:
+    """One screenshot's ROI texts, in ROI order."""
+    if bench_key == "jetstream":
+        return [f"{rnd.uniform(120, 200):.3f}"]
+    if bench_key == "speedometer":
+        return [f"{rnd.uniform(5, 15):.1f}"]
+    if bench_key == "motionmark":
+        return [f"{rnd.uniform(250, 500):.2f}", "@60fps", f"{rnd.uniform(10, 80):.2f}%"]
+    # passmark: main, cpu, 2d, 3d, memory, disk
+    return [
+        f"{rnd.uniform(200, 900):.1f}",
+        f"{rnd.uniform(2000, 9000):.1f}",
+        f"{rnd.uniform(20, 200):.1f}",
+        "N/A" if rnd.random() < 0.5 else f"{rnd.uniform(100, 900):.1f}",
+        f"{rnd.uniform(1000, 3000):.1f}",
+        "N/A" if rnd.random() < 0.5 else f"{rnd.uniform(1000, 9000):.1f}",
+    ]
+
+
+def expected_value(bench_key: str, tokens: List[str]) -> str:
+    """The text of the record ocr_read.parse_roi_texts makes of these ROI texts."""
+    return " ".join(tokens)
+
+
+# ---------- Rendering ----------
+
+def _draw_strip(draw: ImageDraw.ImageDraw, x: int, y: int, text: str) -> None:
+    data = bytes([len(text)]) + text.encode("ascii")
+    for i, byte in enumerate(data):
+        for bit in range(8):
+            on = (byte >> (7 - bit)) & 1
+            draw.point((x + i * 8 + bit, y), fill=(255, 255, 255) if on else (0, 0, 0))
+
+
+def render_screenshot(
+    iso_name: str,
+    bench_key: str,
+    tokens: List[str],
+    anchor_offset: Tuple[int, int] = (0, 0),
+    size: Tuple[int, int] = SCREEN_SIZE,
+) -> Image.Image:
+    """
+    A screenshot with each token in its ROI of the folder's layout. For
+    Passmark the ROIs, and the grey/white anchor line they follow, are
+    shifted by anchor_offset.
+    """
+    img = Image.new("RGB", size, BACKGROUND)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default()
+
+    dx, dy = anchor_offset if bench_key == "passmark" else (0, 0)
+    if bench_key == "passmark":
+        # screenshot_offsets: offset = (x0 - 113, y_white - 193)
+        x0, y_grey = 113 + dx, 192 + dy
+        draw.line((x0, y_grey, x0 + 650, y_grey), fill=(64, 64, 64))
+        draw.line((x0, y_grey + 1, x0 + 650, y_grey + 1), fill=(255, 255, 255))
+
+    for roi, token in zip(get_roi_plan(iso_name, bench_key), tokens):
+        if roi.kind == "rectangle":
+            x1, y1, _, _ = roi.box
+        else:
+            x1 = min(x for x, _ in roi.points)
+            y1 = min(y for _, y in roi.points)
+        x1, y1 = x1 + dx, y1 + dy
+        _draw_strip(draw, x1 + STRIP_INSET, y1 + STRIP_INSET, token)
+        draw.text((x1 + STRIP_INSET, y1 + STRIP_INSET + 2), token, fill=TEXT_COLOR, font=font)
+    return img
+
+
+def decode_strip(image: Image.Image) -> str:
+    """Read the strip code back from an ROI crop (RGB or thresholded 'L')."""
+    arr = np.asarray(image)
+    if arr.ndim == 3:
+        arr = arr[..., 0]
+    if arr.shape[0] <= STRIP_INSET:
+        raise OcrError(f"Crop of {arr.shape} is too small for a strip code")
+    bits = arr[STRIP_INSET, STRIP_INSET:] > 127
+
+    def byte_at(i: int) -> int:
+        chunk = bits[i * 8:(i + 1) * 8]
+        if chunk.size != 8:
+            raise OcrError("Strip code runs past the crop")
+        return int(np.packbits(chunk)[0])
+
+    length = byte_at(0)
+    try:
+        return bytes(byte_at(i) for i in range(1, length + 1)).decode("ascii")
+    except UnicodeDecodeError as e:
+        raise OcrError(f"Unreadable strip code: {e}") from e
+
+
+def strip_backend() -> FakeOcrBackend:
+    """In-process fake OCR that reads the strip codes."""
+    return FakeOcrBackend(recognizer=decode_strip)
+
+
+# ---------- Archives ----------
+
+def iso_folder_name(i: int) -> str:
+    """The i-th synthetic ISO; the first ones reuse the folders with their own layouts."""
+    if i < len(LAYOUT_FOLDERS):
+        return LAYOUT_FOLDERS[i]
+    return f"S{i:04d}. Synthetic ISO {i:04d}"
+
+
+def _layout(iso_name: str) -> str:
+    return iso_name if iso_name in LAYOUT_FOLDERS else "default"
+
+
+class SyntheticArchive:
+    """
+    A data_collected-style tree under `root`, grown with add_isos().
+
+    Screenshots are rendered once per (layout, bench, pool slot) into
+    root/../_pool and hard-linked (or copied) into the ISO folders, so
+    archives of thousands of ISOs are cheap to build. `expected` maps
+    every screenshot path to the value its ROIs hold.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        shots: int = 20,
+        seed: int = 0,
+        size: Tuple[int, int] = SCREEN_SIZE,
+    ) -> None:
+        self.root = root
+        self.pool_dir = os.path.join(os.path.dirname(os.path.abspath(root)), "_pool")
+        self.shots = shots
+        self.seed = seed
+        self.size = size
+        self.iso_names: List[str] = []
+        self.expected: Dict[str, str] = {}
+        self._pool: Dict[Tuple[str, str, int], Tuple[str, str]] = {}
+        os.makedirs(self.root, exist_ok=True)
+        os.makedirs(self.pool_dir, exist_ok=True)
+
+    def _pool_file(self, layout: str, bench_key: str, slot: int) -> Tuple[str, str]:
+        key = (layout, bench_key, slot)
+        if key not in self._pool:
+            rnd = random.Random(f"{self.seed}|{layout}|{bench_key}|{slot}")
+            tokens = random_tokens(bench_key, rnd)
+            offset = (rnd.randint(-20, 20), rnd.randint(-10, 10))
+            path = os.path.join(self.pool_dir, f"{len(self._pool):05d}.png")
+            render_screenshot(layout, bench_key, tokens, offset, self.size).save(path, compress_level=1)
+            self._pool[key] = (path, expected_value(bench_key, tokens))
+        return self._pool[key]
+
+    def add_isos(self, count: int) -> None:
+        """Grow the archive to `count` ISOs (20 shots per bench, 1 for Passmark)."""
+        for i in range(len(self.iso_names), count):
+            iso_name = iso_folder_name(i)
+            rnd = random.Random(f"{self.seed}|{iso_name}")
+            for bench_key, subfolder in SUBFOLDER_BY_BENCH.items():
+                folder = os.path.join(self.root, iso_name, subfolder)
+                os.makedirs(folder, exist_ok=True)
+                n = 1 if bench_key == "passmark" else self.shots
+                for k in range(n):
+                    src, value = self._pool_file(_layout(iso_name), bench_key, rnd.randrange(POOL_SIZE))
+                    stamp = dt_to_timestamp_str(FIRST_TIMESTAMP + timedelta(days=i, minutes=k))
+                    dst = os.path.join(folder, f"{stamp}.png")
+                    _link_or_copy(src, dst)
+                    self.expected[dst] = value
+            self.iso_names.append(iso_name)
+
+    def remove(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+        shutil.rmtree(self.pool_dir, ignore_errors=True)
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def archive_entries(archive: SyntheticArchive, iso_names: Optional[List[str]] = None) -> List[Dict]:
+    """data_benchmarks.json entries holding the archive's expected values."""
+    from includes.scan import scan_root
+    from includes.store import get_bench_dict, new_iso_entry
+
+    entries = []
+    index = scan_root(archive.root)
+    for iso_name in iso_names or archive.iso_names:
+        entry = new_iso_entry(iso_name)
+        for bench_key, paths in index.get(iso_name, {}).items():
+            values = [archive.expected[p] for p in paths]
+            bench = get_bench_dict(entry, bench_key)
+            bench["latest"] = os.path.splitext(os.path.basename(paths[-1]))[0] if paths else ""
+            if bench_key == "passmark":
+                tokens = values[0].split(" ")
+                for key, token in zip(("main", "cpu", "2d", "3d", "memory", "disk"), tokens):
+                    bench[key] = token
+            else:
+                bench["values"] = values
+        entries.append(entry)
+    return entries
@@ -1,137 +1,381 @@
-from statistics import mean
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional
+import logging
 import os
-import re
 
 from includes.utils import (
-    get_latest_file_timestamp,
-    dt_to_timestamp_str,
-    timestamp_str_to_dt,
+    get_latest_timestamp_from_files,
+    is_timestamp_name,
 )
-from includes.store import get_bench_dict
-from ocr_read import ocr_reader
+from includes.journal import Failure, RunJournal
+from includes.ocr_cache import get_cache
+from includes.profiling import get_profiler, span
+from includes.provenance import (
+    Provenance,
+    file_signature,
+    get_bench_provenance,
+    recorded_values,
+    set_bench_provenance,
+)
+from includes.records import Result, parse_stored, passmark_text
+from includes.scan import ScreenshotIndex, get_screenshots
+from includes.store import IsoStore, get_bench_dict
+from ocr_read import ocr_reader, roi_fingerprint
+
+
+# Entry "status" of an ISO with a bench that failed in the last run
+# (index.html styles it as status-error)
+FAILED_STATUS = "Error"
+
+
+class BenchError(Exception):
+    """
+    Screenshots of one bench that could not be read. `errors` holds one
+    {"file", "error"} per failed screenshot; the others were still read.
+    """
+
+    def __init__(self, errors: List[Dict[str, str]]) -> None:
+        super().__init__("; ".join(f"{e['file']}: {e['error']}" for e in errors))
+        self.errors = errors
+
+
+def failure_records(iso_name: str, bench_key: str, error: Exception) -> List[Failure]:
+    """The failure report entries for one failed bench."""
+    if isinstance(error, BenchError):
+        return [
+            {"iso": iso_name, "bench": bench_key, "file": e["file"], "error": e["error"]}
+            for e in error.errors
+        ]
+    return [{"iso": iso_name, "bench": bench_key, "file": None, "error": f"{type(error).__name__}: {error}"}]
+
+
+def mark_failed_benches(store: IsoStore, failures: List[Failure]) -> None:
+    """Set FAILED_STATUS on every ISO entry with a failed bench."""
+    for iso_name in sorted({f["iso"] for f in failures}):
+        entry = store.get_or_create(iso_name)
+        if entry.get("status") != FAILED_STATUS:
+            entry["status"] = FAILED_STATUS
+            store.mark_dirty(iso_name)
 
 
 # --------- PLUG YOUR 20-ITEM LOGIC HERE ------------------------------------
 
-def get_values_for_folder(folder_path: str, bench_key: str) -> List[float]:
+def get_values_for_folder(
+    folder_path: str,
+    bench_key: str,
+    index: ScreenshotIndex,
+    on_result: Optional[Callable[[str, str, str, str], None]] = None,
+) -> List[Result]:
     """
     It should:
-      - look at the given folder_path (Screenshots_* folder)
+      - look at the given folder_path (ISO folder name), resolved through
+        the run's screenshot index
       - compute / read whatever you need
-      - return a list of 20 numeric values (float or int)
+      - return a list of 20 result records (includes/records.py)
 
     'bench_key' will be one of:
       - 'motionmark'
       - 'jetstream'
       - 'speedometer'
+
+    on_result is passed on to ocr_reader. Raises BenchError after the
+    whole folder was tried when any screenshot could not be read.
     """
+    errors = []
+
+    def on_error(folder_name: str, this_type: str, image_path: str, error: Exception) -> None:
+        errors.append({"file": os.path.basename(image_path), "error": f"{type(error).__name__}: {error}"})
+
     values = ocr_reader(
         debug=False,
         target_folder_name=folder_path,
-        benchmark_type=bench_key
+        benchmark_type=bench_key,
+        index=index,
+        on_result=on_result,
+        on_error=on_error,
     )
+    if errors:
+        raise BenchError(errors)
     return values
 
 
 # --------- CORE UPDATE LOGIC -----------------------------------------------
 
-def recompute_benchmark_type_avg(entry: Dict[str, Any]) -> None:
-    """
-    Recompute entry['benchmark_avg'] from Motionmark / Jetstream / Speedometer values.
-    """
-    all_means = []
-    for key in ["motionmark", "jetstream", "speedometer"]:
-        b = get_bench_dict(entry, key)
-        raw_vals = b.get("values") or []
-        if not raw_vals:
-            continue
-
-        if key == "motionmark":
-            # Motionmark: extract score, fps, percent from each string
-            scores: List[float] = []
-            fps_list: List[int] = []
-            percents: List[float] = []
-            grouped_text: List[str] = []
-            for v in raw_vals:
-                match = re.match(r"([\d.]+)\s+@(\d+)fps\s+([\d.]+)%", v)
-                if match:
-                    score, fps, percent = match.groups()
-                    scores.append(float(score))
-                    fps_list.append(int(fps))
-                    percents.append(float(percent))
-                    grouped_text.append(f"{float(score):.3f} @{int(fps):.0f}fps {float(percent):.2f}%")
-            
-            # You can combine them as needed — here we're taking the average of all three metrics
-            score_avg = f"{mean(scores):.3f}" if scores else "0.000"
-            fps_avg = f"{mean(fps_list):.0f}" if fps_list else "0"
-            percent_avg = f"{mean(percents):.2f}" if percents else "0.00"
-
-            average = f"{score_avg} @{fps_avg}fps {percent_avg}%"
-            highest = f"{max(grouped_text)}"
-            lowest = f"{min(grouped_text)}"
-        else:
-            # Others: just convert string values to int
-            vals: List[float] = []
-            for v in raw_vals:
-                vals.append(float(v))
-            average = f"{mean(vals):.2f}" if key == "speedometer" else f"{mean(vals):.3f}"
-            highest = f"{max(vals):.2f}" if key == "speedometer" else f"{max(vals):.3f}"
-            lowest = f"{min(vals):.2f}" if key == "speedometer" else f"{min(vals):.3f}"
-        entry[key]["average"] = average
-        entry[key]["highest"] = highest
-        entry[key]["lowest"] = lowest
-
-def update_entry_for_bench(
-    entry: Dict[str, Any],
-    iso_folder: str,
-    screenshots_subfolder: str,
+def plan_bench_update(
+    store: IsoStore,
+    iso_name: str,
     bench_key: str,
-) -> None:
+    index: ScreenshotIndex,
+    provenance: Provenance,
+    journal: Optional[RunJournal] = None,
+) -> Optional[Dict[str, Any]]:
     """
-    Apply rules 04(a), 04(b), 04(c) for one bench type.
+    Apply rules 04(a), 04(b) for one bench type.
+
+    Returns None if there is nothing to do, or a plan for rule 04(c):
+      - "latest": new "latest" timestamp string
+      - "screenshots": every screenshot of the bench, in value order
+      - "stale": the screenshots that must be (re-)OCRed: new, changed
+        (size/mtime) or affected by a ROI/parser fingerprint change
+      - "signatures", "fingerprint": provenance to record afterwards
+      - "recorded": path -> record of the unchanged screenshots, parsed
+        from their recorded value
+      - "resumed": path -> record of the screenshots a replayed run journal
+        (--resume) already read; they are left out of "stale"
+    Unchanged screenshots reuse their recorded value (a recorded value that
+    does not parse any more is read again); removed ones drop out.
+    A bench whose stored values are not the recorded ones (a restored or
+    hand-edited JSON) is stored again from its screenshots.
     """
-    folder_path = os.path.join(iso_folder, screenshots_subfolder)
+    screenshots = get_screenshots(index, iso_name, bench_key)
 
     # 04(a). If folder doesn't exist or has no valid files => do nothing
-    latest_file = get_latest_file_timestamp(folder_path)
+    if screenshots is None:
+        return None
+    latest_file = get_latest_timestamp_from_files(screenshots)
     if latest_file is None:
-        return
+        return None
 
-    _, latest_dt = latest_file
-    latest_str = dt_to_timestamp_str(latest_dt)
+    # Fixed-width timestamp names compare as strings
+    latest_str, _ = latest_file
 
-    bench = get_bench_dict(entry, bench_key)
-    stored_ts_str = bench.get("latest", "")
-    stored_dt = timestamp_str_to_dt(stored_ts_str)
+    bench = get_bench_dict(store.get_or_create(iso_name), bench_key)
+    fingerprint = roi_fingerprint(iso_name, bench_key)
+    signatures = {path: file_signature(path) for path in screenshots}
+    plan = {
+        "latest": latest_str,
+        "screenshots": screenshots,
+        "stale": screenshots,
+        "signatures": signatures,
+        "fingerprint": fingerprint,
+        "recorded": {},
+        "resumed": {},
+    }
 
-    # 04(b). Latest file is same or older than stored -> do nothing
-    if stored_dt is not None and latest_dt <= stored_dt:
+    recorded = get_bench_provenance(provenance, iso_name, bench_key)
+    if recorded is None:
+        # No per-file provenance yet: fall back to the newest timestamp
+        stored_ts_str = bench.get("latest", "")
+
+        # 04(b). Latest file is same or older than stored -> do nothing
+        if is_timestamp_name(stored_ts_str) and latest_str <= stored_ts_str:
+            _adopt_current_values(bench, bench_key, iso_name, plan, provenance)
+            return None
+        return _resume_from_journal(plan, iso_name, bench_key, journal)
+
+    recorded_files = recorded["files"] if recorded["fingerprint"] == fingerprint else {}
+    stale = []
+    for path in screenshots:
+        known = recorded_files.get(os.path.basename(path))
+        result = None
+        if known is not None and known["size"] == signatures[path]["size"] and known["mtime_ns"] == signatures[path]["mtime_ns"]:
+            result = parse_stored(bench_key, known["value"])
+        if result is None:
+            stale.append(path)
+        else:
+            plan["recorded"][path] = result
+
+    # 04(b). Same files, same signatures, same config, same values -> do nothing
+    in_sync = applied_values(bench_key, recorded_values(recorded)) == stored_values(bench_key, bench)
+    if not stale and len(recorded_files) == len(screenshots) and in_sync:
+        return None
+
+    plan["stale"] = stale
+    return _resume_from_journal(plan, iso_name, bench_key, journal)
+
+
+def _resume_from_journal(
+    plan: Dict[str, Any],
+    iso_name: str,
+    bench_key: str,
+    journal: Optional[RunJournal],
+) -> Dict[str, Any]:
+    """Move the stale screenshots a replayed journal already read to plan["resumed"]."""
+    if journal is None or not journal.replayed:
+        return plan
+    values = journal.resumed_values(iso_name, bench_key, plan["fingerprint"], plan["signatures"], plan["stale"])
+    resumed = {path: parse_stored(bench_key, value) for path, value in values.items()}
+    resumed = {path: result for path, result in resumed.items() if result is not None}
+    plan["resumed"] = resumed
+    plan["stale"] = [path for path in plan["stale"] if path not in resumed]
+    return plan
+
+
+def journal_callback(
+    journal: Optional[RunJournal],
+    plan: Dict[str, Any],
+) -> Optional[Callable[[str, str, str, str], None]]:
+    """on_result for ocr_reader that journals each screenshot of the plan as it is read."""
+    if journal is None:
+        return None
+
+    def on_result(iso_name: str, bench_key: str, path: str, value: str) -> None:
+        journal.record(iso_name, bench_key, path, plan["signatures"][path], plan["fingerprint"], value)
+
+    return on_result
+
+
+def stored_values(bench_key: str, bench: Dict[str, Any]) -> List[str]:
+    """The values of a bench dict of an entry, in screenshot order (Passmark: its OCR value)."""
+    if bench_key == "passmark":
+        return [passmark_text(bench)] if bench.get("main") else []
+    return bench.get("values") or []
+
+
+def applied_values(bench_key: str, values: List[str]) -> List[str]:
+    """The part of a bench's screenshot values apply_bench_values stores (Passmark: the first)."""
+    if bench_key == "passmark":
+        return values[:1]
+    return values
+
+
+def _adopt_current_values(
+    bench: Dict[str, Any],
+    bench_key: str,
+    iso_name: str,
+    plan: Dict[str, Any],
+    provenance: Provenance,
+) -> None:
+    """
+    Record provenance for a bench that is up to date but predates it, so
+    later runs can work per screenshot. Values are in filename order, like
+    the screenshots; anything ambiguous is left for the next full recompute.
+    """
+    screenshots = plan["screenshots"]
+    values = stored_values(bench_key, bench)
+    if not values or len(values) != len(screenshots):
         return
+    set_bench_provenance(
+        provenance, iso_name, bench_key, plan["fingerprint"],
+        screenshots, plan["signatures"], values,
+    )
+
 
-    # 04(c). Latest file is newer -> recompute the 20 values
-    values = get_values_for_folder(os.path.basename(iso_folder), bench_key)
-    bench["latest"] = latest_str
+def apply_bench_values(
+    entry: Dict[str, Any],
+    iso_name: str,
+    bench_key: str,
+    latest_str: str,
+    results: List[Result],
+) -> None:
+    """
+    Rule 04(c): store freshly computed results for one bench type.
+    The results are checked before the entry is touched.
+    """
+    bench = get_bench_dict(entry, bench_key)
     if bench_key == "passmark":
-        values = values[0].split(" ")
-        if len(values) != 6:
-            raise ValueError(
-                f"get_values_for_folder must return 6 items, got {len(values)} "
-                f"for {bench_key} in {iso_folder}"
-            )
-        bench["main"] = values[0]
-        bench["cpu"] = values[1]
-        bench["2d"] = values[2]
-        bench["3d"] = values[3]
-        bench["memory"] = values[4]
-        bench["disk"] = values[5]
+        if not results:
+            raise ValueError(f"get_values_for_folder must return a result for {bench_key} in {iso_name}")
+        bench["latest"] = latest_str
+        bench.update(results[0].fields())
     else:
-        if len(values) != 20:
-            raise ValueError(
-                f"get_values_for_folder must return 20 items, got {len(values)} "
-                f"for {bench_key} in {iso_folder}"
-            )
+        if not results:
+            raise ValueError(f"No values for {bench_key} in {iso_name}")
+        if len(results) != 20:
+            # Screenshots can be added or removed one by one now
+            logging.warning(f"Expected 20 values, got {len(results)} for {bench_key} in {iso_name}")
 
-        bench["values"] = values
-        recompute_benchmark_type_avg(entry)
+        # average / highest / lowest are filled in by includes.stats.refresh_stats
+        bench["latest"] = latest_str
+        bench["values"] = [result.text for result in results]
     entry["status"] = ""
+
+
+def finish_bench_update(
+    store: IsoStore,
+    iso_name: str,
+    bench_key: str,
+    plan: Dict[str, Any],
+    fresh_results: List[Result],
+    provenance: Provenance,
+) -> None:
+    """
+    Merge freshly OCRed results for plan["stale"] with the resumed and the
+    recorded results of the unchanged screenshots, store them and record
+    their provenance.
+    """
+    stale = plan["stale"]
+    if len(fresh_results) != len(stale):
+        raise ValueError(
+            f"get_values_for_folder must return {len(stale)} items, got {len(fresh_results)} "
+            f"for {bench_key} in {iso_name}"
+        )
+    by_path = dict(plan["recorded"])
+    by_path.update(plan["resumed"])
+    by_path.update(zip(stale, fresh_results))
+    results = [by_path[path] for path in plan["screenshots"]]
+
+    apply_bench_values(store.get_or_create(iso_name), iso_name, bench_key, plan["latest"], results)
+    store.mark_dirty(iso_name, bench_key)
+    store.set_results(iso_name, bench_key, results)
+    store.set_result_files(iso_name, bench_key, plan["screenshots"])
+    set_bench_provenance(
+        provenance, iso_name, bench_key, plan["fingerprint"],
+        plan["screenshots"], plan["signatures"], [result.text for result in results],
+    )
+
+
+def update_entry_for_bench(
+    store: IsoStore,
+    iso_name: str,
+    bench_key: str,
+    index: ScreenshotIndex,
+    provenance: Provenance,
+    journal: Optional[RunJournal] = None,
+) -> None:
+    """
+    Apply rules 04(a), 04(b), 04(c) for one bench type. Each screenshot
+    read is journaled right away; failures raise BenchError (or the
+    ValueError of finish_bench_update) with the entry left untouched.
+    """
+    with span("bench", iso=iso_name, bench=bench_key):
+        with span("plan", iso=iso_name, bench=bench_key):
+            plan = plan_bench_update(store, iso_name, bench_key, index, provenance, journal)
+        if plan is None:
+            return
+
+        # 04(c). Screenshots changed -> OCR only the stale ones
+        fresh_results = []
+        if plan["stale"]:
+            fresh_results = get_values_for_folder(
+                iso_name, bench_key, {iso_name: {bench_key: plan["stale"]}},
+                on_result=journal_callback(journal, plan),
+            )
+        with span("finish", iso=iso_name, bench=bench_key):
+            finish_bench_update(store, iso_name, bench_key, plan, fresh_results, provenance)
+
+
+# --------- PARALLEL WORK UNITS ---------------------------------------------
+
+def compute_bench_unit(iso_name: str, bench_key: str, index: ScreenshotIndex) -> Dict[str, Any]:
+    """
+    Run the OCR for one (ISO, bench) unit in a worker process.
+    Returns a plain, picklable result record; failures are reported in
+    "error" (and per screenshot in "errors") instead of raised, so one bad
+    unit does not take down the pool. "files" maps every screenshot that
+    was read to its value, for the parent to journal even when others
+    failed. With profiling on, "profile" carries this unit's spans; with
+    the OCR cache open, "cache" its hits and misses.
+    """
+    record: Dict[str, Any] = {
+        "iso": iso_name, "bench": bench_key, "values": None, "files": {}, "error": None, "errors": [],
+        "profile": None, "cache": None,
+    }
+
+    def on_result(folder_name: str, this_type: str, path: str, value: str) -> None:
+        record["files"][path] = value
+
+    try:
+        with span("unit", iso=iso_name, bench=bench_key):
+            record["values"] = get_values_for_folder(iso_name, bench_key, index, on_result=on_result)
+    except BenchError as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        record["errors"] = e.errors
+    except (Exception, SystemExit) as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    profiler = get_profiler()
+    if profiler is not None:
+        record["profile"] = profiler.export()
+    cache = get_cache()
+    if cache is not None:
+        record["cache"] = cache.export()
+    return record
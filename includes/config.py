@@ -8,6 +8,58 @@ ROOT_DIR = os.path.join(".", "data_collected")
 # Path to the JSON file you’re maintaining
 JSON_PATH = os.path.join(".", "data_benchmarks.json")
 
+# SQLite store of the benchmark data, with typed rows per bench and per
+# screenshot result; JSON_PATH is its export (see includes/store.py).
+# Empty to work on the JSON file alone
+STORE_PATH = os.path.join(".", "data_benchmarks.sqlite")
+
+# Pre-aggregated data export read by index.html (see includes/export.py)
+EXPORT_DIR = os.path.join(".", "data")
+
+# Static table rendered from the export (see includes/render.py): the page
+# whose rows are prerendered, the README's table image, and the per-ISO
+# row fragments of the last render
+INDEX_PATH = os.path.join(".", "index.html")
+TABLE_SVG_PATH = os.path.join(".", "table.svg")
+RENDER_CACHE_PATH = os.path.join(".", "data_render_cache.json")
+
+# ISO images of the entries (see includes/iso_hash.py): an entry's image
+# is ISO_DIR/<iso_file_name> or ISO_DIR/<name>.iso. Their SHA-1s are
+# cached in ISO_HASH_CACHE_PATH by (path, size, mtime); ISO_HASH_THREADS
+# images are hashed at once, read ISO_HASH_CHUNK_BYTES at a time
+ISO_DIR = os.path.join(".", "data_isos")
+ISO_HASH_CACHE_PATH = os.path.join(".", "data_iso_hashes.json")
+ISO_HASH_THREADS = 4
+ISO_HASH_CHUNK_BYTES = 8 * 2**20
+
+# Partial results file written by main.py --shard i/N (see includes/shard.py)
+SHARD_PARTIAL_PATH = os.path.join(".", "data_partial_{index}-of-{count}.json")
+
+# Run journal of a --shard run (JOURNAL_PATH is the unsharded runs')
+SHARD_JOURNAL_PATH = os.path.join(".", "run_journal_{index}-of-{count}.jsonl")
+
+# Per-screenshot provenance of the values in JSON_PATH (see includes/provenance.py)
+PROVENANCE_PATH = os.path.join(".", "data_provenance.json")
+
+# Append-only journal of the screenshots read by the current run, replayed
+# by main.py --resume after a crash (see includes/journal.py)
+JOURNAL_PATH = os.path.join(".", "run_journal.jsonl")
+
+# Failures of the last run: one {"iso", "bench", "file", "error"} each
+FAILURE_REPORT_PATH = os.path.join(".", "run_failures.json")
+
+# Chrome trace-event JSON written by main.py --profile (see includes/profiling.py)
+PROFILE_TRACE_PATH = os.path.join(".", "run_trace.json")
+
+# Per-folder mtimes of the last scan, so unchanged folders are skipped (see includes/scan.py)
+SCAN_MANIFEST_PATH = os.path.join(".", "data_scan_manifest.json")
+
+# main.py --watch: a batch of changes is processed once no new event came
+# for WATCH_DEBOUNCE_SECONDS; the polling fallback checks every
+# WATCH_POLL_SECONDS (see includes/watch.py)
+WATCH_DEBOUNCE_SECONDS = 10.0
+WATCH_POLL_SECONDS = 2.0
+
 # Mapping: subfolder name -> JSON parent key
 BENCH_CONFIG = {
     "Screenshots_JetStream": "jetstream",
@@ -16,6 +68,38 @@ BENCH_CONFIG = {
     "Screenshots_Passmark": "passmark",
 }
 
+# OCR backend used by ocr_read.process_image (see includes/ocr_backends.py):
+# "capture2text", "worker", "glyphs" or "fake"
+OCR_BACKEND = "capture2text"
+
+# Capture2Text command line tool, used by the "capture2text" backend
+OCR_EXECUTABLE = "Capture2Text_CLI.exe"
+
+# Command line for the "worker" backend (a long-lived process speaking the
+# JSON line protocol on stdin/stdout), which cannot be used while None. It
+# only saves process startups when the worker keeps an engine loaded, e.g.
+# [sys.executable, "-m", "includes.ocr_backends", "--serve", "glyphs"];
+# "--serve capture2text" still starts Capture2Text once per crop.
+OCR_WORKER_COMMAND = None
+
+# Templates of the in-process "glyphs" backend, built from the values in
+# JSON_PATH with: python -m includes.glyphs --build
+GLYPH_TEMPLATES_PATH = os.path.join(".", "glyph_templates.npz")
+# Crops read with a lower worst-glyph match score are reported as OCR errors
+GLYPH_MIN_CONFIDENCE = 0.8
+
+# Streaming screenshot pipeline of ocr_read.ocr_reader (see includes/pipeline.py):
+# threads decoding and cropping screenshots, concurrent OCR calls (one
+# backend instance each), and screenshots in flight at once
+PIPELINE_DECODE_THREADS = 2
+PIPELINE_OCR_THREADS = 2
+PIPELINE_WINDOW = 8
+
+# Persistent OCR result cache (see includes/ocr_cache.py), disabled by --no-cache
+OCR_CACHE_PATH = os.path.join(".", "ocr_cache.sqlite")
+OCR_CACHE_MAX_ENTRIES = 200000
+OCR_CACHE_MAX_AGE_DAYS = 180
+
 def ensure_paths():
     """Optional helper to sanity-check paths."""
     if not os.path.isdir(ROOT_DIR):
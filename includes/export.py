@@ -0,0 +1,285 @@
+# export.py
+#
+# Site export for index.html: a compact, pre-aggregated summary of every
+# ISO (display values, Avg Benchmark score and the row order for every
+# sortable column), which includes/render.py prerenders the table from,
+# plus one detail file per ISO holding its sorted value grids, fetched
+# when a row is expanded. Every file gets a .gz sibling,
+# and a .br one when the brotli package is installed.
+# Rebuild from the benchmark JSON with: python -m includes.export
+
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import os
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it only the .gz siblings are written
+    brotli = None
+
+from includes.config import EXPORT_DIR, JSON_PATH
+from includes.records import Result, stored_results
+from includes.stats import leading_number, refresh_stats
+from includes.store import IsoStore, load_json, write_bytes_atomic
+
+EXPORT_VERSION = 1
+SUMMARY_NAME = "summary.json"
+DETAIL_DIR = "iso"
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+# The table's columns, in index.html order
+COLUMNS = (
+    "iso_file_name", "name", "version_shortcode", "version", "benchmark_score",
+    "motionmark", "jetstream", "speedometer", "passmark",
+    "used_space", "iso_file_size", "iso_file_lastmodified", "status",
+)
+
+# Metric columns: the sub-values shown (and sortable) in header order, as
+# (phase, JSON field)
+METRIC_PHASES = {
+    "motionmark": (("max", "highest"), ("avg", "average"), ("min", "lowest")),
+    "jetstream": (("max", "highest"), ("avg", "average"), ("min", "lowest")),
+    "speedometer": (("max", "highest"), ("avg", "average"), ("min", "lowest")),
+    "passmark": (("main", "main"), ("cpu", "cpu"), ("2d", "2d"), ("mem", "memory")),
+}
+
+# Shown as integers (the table's toInt), the others as stored
+INTEGER_METRICS = ("motionmark", "jetstream")
+
+# Benches whose raw values are shown in the expanded row
+GRID_BENCHES = ("motionmark", "jetstream", "speedometer")
+
+# ---------- Display values (what the table used to compute client-side) ----------
+
+def display(value: Any) -> Any:
+    """The value as shown, None for an empty cell."""
+    return None if value is None or value == "" else value
+
+
+def display_int(value: Any) -> Any:
+    """Integer part of a numeric field; non-numeric text is shown as is."""
+    if not value:
+        return None
+    number = leading_number(value)
+    return display(value) if math.isnan(number) else math.floor(number)
+
+
+def benchmark_score(entry: Dict[str, Any]) -> Any:
+    """The Avg Benchmark cell: benchmark_avg (see includes/stats.py), rounded like Math.round."""
+    number = leading_number(entry.get("benchmark_avg"))
+    # Math.round: halves go up
+    return None if math.isnan(number) else math.floor(number + 0.5)
+
+
+def summary_row(entry: Dict[str, Any]) -> List[Any]:
+    """One table row, one item per COLUMNS entry (metric columns are lists)."""
+    row = []
+    for column in COLUMNS:
+        if column == "benchmark_score":
+            row.append(benchmark_score(entry))
+        elif column in METRIC_PHASES:
+            bench = entry.get(column) or {}
+            shown = display_int if column in INTEGER_METRICS else display
+            row.append([shown(bench.get(field)) for _, field in METRIC_PHASES[column]])
+        else:
+            row.append(display(entry.get(column)))
+    return row
+
+
+# ---------- Sorting ----------
+
+def _natural_key(text: str) -> Tuple:
+    """Case-insensitive, with digit runs compared as numbers."""
+    return tuple(
+        (0, int(part)) if part.isdigit() else (1, part)
+        for part in re.split(r"(\d+)", text.lower()) if part
+    )
+
+
+def sort_key(value: Any) -> Tuple:
+    """Numbers (a leading number counts) before text, text in natural order."""
+    text = "" if value is None else str(value).strip()
+    number = leading_number(text)
+    if not math.isnan(number):
+        return (0, number, ())
+    return (1, 0.0, _natural_key(text))
+
+
+def sort_orders(rows: List[List[Any]]) -> Dict[str, List[int]]:
+    """
+    Ascending row order for every sortable slot: "0" .. "12" for plain
+    columns, "5:max", "8:cpu" etc. for the phases of metric columns.
+    Ties keep the summary order.
+    """
+    slots: Dict[str, List[Any]] = {}
+    for col, column in enumerate(COLUMNS):
+        if column in METRIC_PHASES:
+            for i, (phase, _) in enumerate(METRIC_PHASES[column]):
+                slots[f"{col}:{phase}"] = [row[col][i] for row in rows]
+        else:
+            slots[str(col)] = [row[col] for row in rows]
+    orders = {}
+    for slot, values in slots.items():
+        keys = [sort_key(v) for v in values]
+        orders[slot] = sorted(range(len(rows)), key=keys.__getitem__)
+    return orders
+
+
+# ---------- Detail files ----------
+
+def iso_slug(name: str) -> str:
+    """File name of an ISO's detail file: readable, and unique through a name hash."""
+    readable = re.sub(r"[^a-z0-9]+", "-", (name or "").lower()).strip("-")[:60] or "iso"
+    return f"{readable}-{hashlib.sha1((name or '').encode('utf-8')).hexdigest()[:8]}.json"
+
+
+# (iso name, bench key) -> the bench's result records, e.g. IsoStore.bench_results
+BenchResults = Callable[[str, str], List[Optional[Result]]]
+
+
+def _grid_cell(bench_key: str, value: str, result: Optional[Result]) -> Tuple[float, Any]:
+    """(sort number, display value) of one value, from its record when it parses."""
+    if result is None:
+        number = leading_number(value)
+        shown = display_int if bench_key in INTEGER_METRICS else display
+        return (0.0 if math.isnan(number) else number), shown(value)
+    if bench_key in INTEGER_METRICS:
+        return result.score, math.floor(result.score)
+    return result.score, value
+
+
+def detail_document(entry: Dict[str, Any], bench_results: Optional[BenchResults] = None) -> Dict[str, Any]:
+    """
+    The value grids of one ISO, sorted by score (missing values dropped),
+    in display form. The scores come from bench_results when given, else
+    from parsing the entry's values.
+    """
+    grids = {}
+    for bench_key in GRID_BENCHES:
+        bench = entry.get(bench_key) or {}
+        values = bench.get("values") or []
+        if bench_results is not None:
+            results = bench_results(entry.get("name"), bench_key)
+        else:
+            results = stored_results(bench_key, bench)
+        cells = [_grid_cell(bench_key, v, r) for v, r in zip(values, results) if v]
+        grids[bench_key] = [shown for _, shown in sorted(cells, key=lambda cell: cell[0])]
+    return {"version": EXPORT_VERSION, "name": entry.get("name", ""), "grids": grids}
+
+
+def _dumps(doc: Any) -> str:
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":"))
+
+
+def write_with_siblings(path: str, text: str) -> bool:
+    """
+    Write `path` and its compressed siblings. The siblings are only
+    recompressed when the file changed (or one is missing); gzip output
+    has no timestamp, so unchanged content stays byte-identical.
+    """
+    data = text.encode("utf-8")
+    changed = write_bytes_atomic(path, data)
+    siblings = [(".gz", lambda: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        siblings.append((".br", lambda: brotli.compress(data, quality=11)))
+    elif changed:
+        _remove(path + ".br")
+    for suffix, compress in siblings:
+        if changed or not os.path.exists(path + suffix):
+            write_bytes_atomic(path + suffix, compress())
+    return changed
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+# ---------- Export ----------
+
+def export_site(
+    entries: List[Dict[str, Any]],
+    out_dir: str = EXPORT_DIR,
+    changed: Optional[Iterable[str]] = None,
+    bench_results: Optional[BenchResults] = None,
+) -> Dict[str, int]:
+    """
+    Write out_dir/summary.json and out_dir/iso/<slug>.json for `entries`.
+
+    `changed` names the ISOs whose values may have changed (e.g. the
+    store's dirty set): only their detail files are written, plus any that
+    are missing. None considers every ISO; files whose content is the same
+    are not rewritten either way. Detail files of ISOs no longer in
+    `entries` are removed. bench_results supplies the already parsed
+    records of the value grids (see detail_document). Returns what was
+    written / removed.
+    """
+    detail_dir = os.path.join(out_dir, DETAIL_DIR)
+    os.makedirs(detail_dir, exist_ok=True)
+    wanted = None if changed is None else set(changed)
+
+    rows = [summary_row(entry) for entry in entries]
+    details = []
+    written = 0
+    seen = set()
+    for entry in entries:
+        slug = iso_slug(entry.get("name", ""))
+        # bench_results goes by name: it covers the first entry of a name
+        text = _dumps(detail_document(entry, bench_results if entry.get("name") not in seen else None))
+        seen.add(entry.get("name"))
+        path = os.path.join(detail_dir, slug)
+        if wanted is None or entry.get("name") in wanted or not os.path.exists(path):
+            written += write_with_siblings(path, text)
+        # The version query makes browsers refetch a detail file that changed
+        version = hashlib.sha1(text.encode("utf-8")).hexdigest()[:10]
+        details.append(f"{DETAIL_DIR}/{slug}?v={version}")
+
+    keep = {os.path.basename(d.split("?")[0]) for d in details}
+    removed = 0
+    for name in os.listdir(detail_dir):
+        base = name
+        for suffix in COMPRESSED_SUFFIXES:
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+        if base.endswith(".json") and base not in keep:
+            removed += _remove(os.path.join(detail_dir, name))
+
+    summary = {
+        "version": EXPORT_VERSION,
+        "columns": list(COLUMNS),
+        "rows": rows,
+        "details": details,
+        "order": sort_orders(rows),
+    }
+    summary_written = write_with_siblings(os.path.join(out_dir, SUMMARY_NAME), _dumps(summary))
+    return {"details_written": written, "details_removed": removed, "summary_written": int(summary_written)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the index.html data export from the benchmark JSON.")
+    parser.add_argument('--json', default=JSON_PATH, help='Benchmark JSON to export.')
+    parser.add_argument('--out', default=EXPORT_DIR, help='Export directory.')
+    args = parser.parse_args()
+
+    # benchmark_avg as a run would publish it (a hand-edited or older JSON
+    # may lack it); the benches' own stats are taken as stored
+    store = IsoStore(load_json(args.json))
+    refresh_stats(store)
+    result = export_site(store.entries, args.out)
+    print(
+        f"Export in {args.out}: summary {'written' if result['summary_written'] else 'unchanged'}, "
+        f"{result['details_written']} detail file(s) written, {result['details_removed']} removed"
+    )
+
+
+if __name__ == "__main__":
+    main()
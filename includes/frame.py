@@ -0,0 +1,142 @@
+# frame.py
+
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+
+@lru_cache(maxsize=None)
+def threshold_lut(threshold: int) -> np.ndarray:
+    """256-entry lookup table: 255 above threshold, else 0 (PIL .point() rule)."""
+    lut = np.where(np.arange(256) > threshold, 255, 0).astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
+
+
+def rgb_to_gray(rgb: np.ndarray) -> np.ndarray:
+    """RGB -> L with PIL's integer ITU-R 601-2 formula, bit-for-bit."""
+    r = rgb[..., 0].astype(np.uint32)
+    g = rgb[..., 1].astype(np.uint32)
+    b = rgb[..., 2].astype(np.uint32)
+    return ((r * 19595 + g * 38470 + b * 7471 + 0x8000) >> 16).astype(np.uint8)
+
+
+class Frame:
+    """
+    One decoded screenshot, shared by every pipeline stage.
+
+    Holds a single (h, w, 3) uint8 RGB array. Anchor detection reads it
+    directly and rectangle crops are views into it; only thresholded and
+    polygon crops allocate, and then just ROI-sized buffers. `copies`
+    counts every buffer allocated on behalf of this frame (the decode
+    included), for the --debug memory report.
+    """
+
+    def __init__(self, rgb: np.ndarray, name: str = "") -> None:
+        if rgb.ndim != 3 or rgb.shape[2] != 3 or rgb.dtype != np.uint8:
+            raise ValueError(f"Frame needs an (h, w, 3) uint8 array, got {rgb.shape} {rgb.dtype}")
+        self.rgb = rgb
+        self.name = name
+        self.copies = 1
+
+    @classmethod
+    def open(cls, path: str) -> "Frame":
+        """Decode a screenshot once; the PIL image is released right away."""
+        with Image.open(path) as img:
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+            return cls(np.asarray(img), name=path)
+
+    @classmethod
+    def from_image(cls, img: Image.Image, name: str = "") -> "Frame":
+        return cls(np.asarray(img.convert("RGB") if img.mode != "RGB" else img), name=name)
+
+    @property
+    def height(self) -> int:
+        return self.rgb.shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.rgb.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.rgb.nbytes
+
+    def crop(self, box: Sequence[int]) -> np.ndarray:
+        """
+        Rectangle (x1, y1, x2, y2) like Image.crop: a view when the box is
+        inside the frame, else a copy with the outside filled black.
+        """
+        x1, y1, x2, y2 = box
+        if 0 <= x1 <= x2 <= self.width and 0 <= y1 <= y2 <= self.height:
+            return self.rgb[y1:y2, x1:x2]
+
+        self.copies += 1
+        out = np.zeros((max(0, y2 - y1), max(0, x2 - x1), 3), dtype=np.uint8)
+        sx1, sy1 = max(x1, 0), max(y1, 0)
+        sx2, sy2 = min(x2, self.width), min(y2, self.height)
+        if sx1 < sx2 and sy1 < sy2:
+            out[sy1 - y1:sy2 - y1, sx1 - x1:sx2 - x1] = self.rgb[sy1:sy2, sx1:sx2]
+        return out
+
+    def crop_threshold(self, box: Sequence[int], threshold: int) -> np.ndarray:
+        """
+        Rectangle crop -> grayscale -> black/white, identical to
+        img.crop(box).convert('L').point(lambda x: 255 if x > threshold else 0)
+        but through a lookup table instead of a Python callback per level.
+        """
+        self.copies += 1
+        return threshold_lut(threshold)[rgb_to_gray(self.crop(box))]
+
+    def crop_polygon(self, points: Sequence[Tuple[int, int]]) -> np.ndarray:
+        """
+        Polygon crop, identical to pasting the frame through a full-size
+        polygon mask (outline=1, fill=255) onto black and cropping to the
+        mask's bbox, but rasterized only over the polygon's bounds.
+        """
+        origin, mask = polygon_mask(points)
+        return self.crop_with_mask(mask, origin)
+
+    def crop_with_mask(self, mask: np.ndarray, origin: Tuple[int, int]) -> np.ndarray:
+        """
+        Blend the frame through an 'L' mask placed at frame position `origin`
+        onto black (PIL paste arithmetic), cropped to the bbox of the mask
+        pixels that fall inside the frame.
+        """
+        x0, y0 = origin
+        # Clip the mask to the frame, as a full-size mask would be
+        mask = mask[max(0, -y0):max(0, self.height - y0), max(0, -x0):max(0, self.width - x0)]
+        x0, y0 = max(x0, 0), max(y0, 0)
+
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        if not rows.size:
+            raise ValueError(f"Polygon mask at {origin} is outside the frame")
+        top, bottom = rows[0], rows[-1] + 1
+        left, right = cols[0], cols[-1] + 1
+        m = mask[top:bottom, left:right].astype(np.uint32)[..., None]
+        region = self.crop((x0 + left, y0 + top, x0 + right, y0 + bottom))
+
+        self.copies += 1
+        v = region.astype(np.uint32) * m + 128
+        return ((v + (v >> 8)) >> 8).astype(np.uint8)
+
+
+def polygon_mask(points: Sequence[Tuple[int, int]]) -> Tuple[Tuple[int, int], np.ndarray]:
+    """
+    Rasterize a polygon (outline=1, fill=255) into an 'L' mask covering
+    just its bounds. Returns (origin, mask): the frame position of the
+    mask's top-left corner, and the read-only mask array.
+    """
+    ox = min(x for x, _ in points)
+    oy = min(y for _, y in points)
+    size = (max(x for x, _ in points) - ox + 1, max(y for _, y in points) - oy + 1)
+    local: List[Tuple[int, int]] = [(x - ox, y - oy) for x, y in points]
+    mask = Image.new('L', size, 0)
+    ImageDraw.Draw(mask).polygon(local, outline=1, fill=255)
+    arr = np.asarray(mask)
+    arr.flags.writeable = False
+    return (ox, oy), arr
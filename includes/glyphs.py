@@ -0,0 +1,438 @@
+# glyphs.py
+
+import argparse
+import hashlib
+import logging
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from includes.config import GLYPH_TEMPLATES_PATH, JSON_PATH, PROVENANCE_PATH, ROOT_DIR
+from includes.frame import rgb_to_gray
+
+# Every glyph is resampled to this many rows x columns before matching
+GLYPH_ROWS, GLYPH_COLS = 24, 16
+
+# Crops whose gray levels span less than this are blank
+MIN_CONTRAST = 32
+
+# Column spans with fewer ink pixels are noise, not glyphs
+MIN_GLYPH_PIXELS = 2
+
+# A row band shorter than this share of the tallest one (a dot, an accent)
+# belongs to its nearest band rather than being a line of its own
+FRAGMENT_HEIGHT = 0.4
+
+# A gap wider than this share of the line height is a space
+SPACE_GAP = 0.45
+
+# Score penalty per unit of |log(aspect ratio / template aspect ratio)|:
+# after resampling, '1' and '.' differ mostly in their width
+ASPECT_WEIGHT = 0.15
+
+# A glyph matching worse than this may be two touching ones (a kerned
+# "/A"): splitting it in two is tried, see GlyphRecognizer.read
+SPLIT_SCORE = 0.6
+
+# Neither part of a split glyph is narrower than this share of the line height
+MIN_SPLIT_WIDTH = 0.15
+
+# (ink pixels of the crop, one text label, the style it was seen in)
+Sample = Tuple[np.ndarray, str, str]
+
+
+# ---------- Binarization and segmentation ----------
+
+def _runs(flags: np.ndarray) -> List[Tuple[int, int]]:
+    """(start, end) of every run of True in a 1-D bool array."""
+    padded = np.concatenate(([False], flags, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(edges[0::2].tolist(), edges[1::2].tolist()))
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """Gray level that best splits the crop's histogram in two classes (Otsu)."""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = hist.sum()
+    w0 = np.cumsum(hist)
+    w1 = total - w0
+    m0 = np.cumsum(hist * np.arange(256))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        between = (m0[-1] * w0 - total * m0) ** 2 / (w0 * w1)
+    between[(w0 == 0) | (w1 == 0)] = -1
+    return int(np.argmax(between))
+
+
+def ink_mask(crop: np.ndarray) -> np.ndarray:
+    """
+    Bool mask of the text pixels of an 'L' or RGB crop. The text is the
+    minority class, so both dark-on-light and light-on-dark UIs work.
+    """
+    gray = crop if crop.ndim == 2 else rgb_to_gray(crop)
+    if not gray.size or int(gray.max()) - int(gray.min()) < MIN_CONTRAST:
+        return np.zeros(gray.shape, dtype=bool)
+    bright = gray > otsu_threshold(gray)
+    return bright if np.count_nonzero(bright) * 2 < bright.size else ~bright
+
+
+def _line_bands(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """Row ranges of the text lines, with dots and accents merged in."""
+    bands = _runs(mask.any(axis=1))
+    while len(bands) > 1:
+        tallest = max(b - a for a, b in bands)
+        small = [i for i, (a, b) in enumerate(bands) if b - a < FRAGMENT_HEIGHT * tallest]
+        if not small:
+            break
+        i = small[0]
+        gap_above = bands[i][0] - bands[i - 1][1] if i > 0 else None
+        gap_below = bands[i + 1][0] - bands[i][1] if i + 1 < len(bands) else None
+        j = i - 1 if gap_below is None or (gap_above is not None and gap_above <= gap_below) else i + 1
+        lo, hi = min(i, j), max(i, j)
+        bands[lo:hi + 1] = [(bands[lo][0], bands[hi][1])]
+    return bands
+
+
+def segment(mask: np.ndarray) -> List[Tuple[np.ndarray, List[Tuple[int, int]]]]:
+    """
+    Split an ink mask into lines, and each line into glyphs by connected
+    ink columns. Returns [(line band mask, [(x0, x1), ...]), ...], top to
+    bottom, glyphs left to right.
+    """
+    lines = []
+    for r0, r1 in _line_bands(mask):
+        band = mask[r0:r1]
+        spans = [
+            (c0, c1) for c0, c1 in _runs(band.any(axis=0))
+            if np.count_nonzero(band[:, c0:c1]) >= MIN_GLYPH_PIXELS
+        ]
+        if spans:
+            lines.append((band, spans))
+    return lines
+
+
+def glyph_vector(band: np.ndarray, span: Tuple[int, int]) -> Tuple[np.ndarray, float]:
+    """
+    Raw feature of one glyph: its columns over the full line height (so a
+    '.' stays at the bottom), resampled to GLYPH_ROWS x GLYPH_COLS, and its
+    width / line height.
+    """
+    c0, c1 = span
+    img = Image.fromarray(band[:, c0:c1].astype(np.uint8) * 255)
+    resized = img.resize((GLYPH_COLS, GLYPH_ROWS), Image.BILINEAR)
+    return np.asarray(resized, dtype=np.float32).ravel() / 255, (c1 - c0) / band.shape[0]
+
+
+def _trim(band: np.ndarray, span: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+    """span without its blank edge columns; None when no ink is left."""
+    cols = np.flatnonzero(band[:, span[0]:span[1]].any(axis=0))
+    if not cols.size:
+        return None
+    return span[0] + int(cols[0]), span[0] + int(cols[-1]) + 1
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Zero-mean, unit-length rows, so a dot product is a correlation."""
+    centered = vectors - vectors.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(centered, axis=1, keepdims=True)
+    return centered / np.where(norms > 0, norms, 1)
+
+
+# ---------- Templates ----------
+
+class GlyphTemplates:
+    """
+    One template per (character, style): the mean resampled bitmap of its
+    labeled samples and their mean aspect ratio. Styles are the benches
+    the samples came from, since each benchmark UI has its own font.
+    """
+
+    def __init__(
+        self,
+        chars: List[str],
+        styles: List[str],
+        vectors: np.ndarray,
+        aspects: np.ndarray,
+        counts: np.ndarray,
+    ) -> None:
+        self.chars = list(chars)
+        self.styles = list(styles)
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.aspects = np.asarray(aspects, dtype=np.float32)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self._unit = _normalize(self.vectors)
+        self._log_aspects = np.log(np.maximum(self.aspects, 1e-3))
+        h = hashlib.sha1()
+        h.update("\0".join(f"{c}|{s}" for c, s in zip(self.chars, self.styles)).encode("utf-8"))
+        h.update(self.vectors.tobytes())
+        h.update(self.aspects.tobytes())
+        self.digest = h.hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.chars)
+
+    @classmethod
+    def load(cls, path: str = GLYPH_TEMPLATES_PATH) -> "GlyphTemplates":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["chars"].tolist(), data["styles"].tolist(),
+                data["vectors"], data["aspects"], data["counts"],
+            )
+
+    def save(self, path: str = GLYPH_TEMPLATES_PATH) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                chars=np.array(self.chars), styles=np.array(self.styles),
+                vectors=self.vectors, aspects=self.aspects, counts=self.counts,
+            )
+        os.replace(tmp_path, path)
+
+    def match(self, vectors: np.ndarray, aspects: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Best template index and score per glyph, all glyphs at once."""
+        scores = _normalize(vectors) @ self._unit.T
+        scores -= ASPECT_WEIGHT * np.abs(
+            np.log(np.maximum(aspects, 1e-3))[:, None] - self._log_aspects[None, :]
+        )
+        best = np.argmax(scores, axis=1)
+        return best, scores[np.arange(len(best)), best]
+
+
+def build_templates(samples: Iterable[Sample]) -> Tuple[GlyphTemplates, Dict[str, int]]:
+    """
+    Learn templates from labeled crops. A sample is used only when the crop
+    segments into exactly as many glyphs as its label has characters
+    (spaces aside); the others are counted as skipped.
+    """
+    sums: Dict[Tuple[str, str], np.ndarray] = {}
+    aspect_sums: Dict[Tuple[str, str], float] = {}
+    counts: Dict[Tuple[str, str], int] = {}
+    report = {"used": 0, "skipped": 0}
+
+    for crop, label, style in samples:
+        chars = label.replace(" ", "")
+        glyphs = [
+            glyph_vector(band, span)
+            for band, spans in segment(ink_mask(crop))
+            for span in spans
+        ]
+        if not chars or len(glyphs) != len(chars):
+            report["skipped"] += 1
+            continue
+        report["used"] += 1
+        for char, (vector, aspect) in zip(chars, glyphs):
+            key = (char, style)
+            if key not in sums:
+                sums[key] = np.zeros(GLYPH_ROWS * GLYPH_COLS, dtype=np.float64)
+                aspect_sums[key] = 0.0
+                counts[key] = 0
+            sums[key] += vector
+            aspect_sums[key] += aspect
+            counts[key] += 1
+
+    keys = sorted(sums)
+    templates = GlyphTemplates(
+        [char for char, _ in keys],
+        [style for _, style in keys],
+        np.array([sums[k] / counts[k] for k in keys]).reshape(len(keys), GLYPH_ROWS * GLYPH_COLS),
+        np.array([aspect_sums[k] / counts[k] for k in keys]),
+        np.array([counts[k] for k in keys]),
+    )
+    return templates, report
+
+
+# ---------- Recognition ----------
+
+class GlyphRecognizer:
+    """Reads a crop as text by matching each glyph against the templates."""
+
+    def __init__(self, templates: GlyphTemplates) -> None:
+        if not len(templates):
+            raise ValueError("No glyph templates")
+        self.templates = templates
+
+    def _match(self, band: np.ndarray, spans: List[Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+        glyphs = [glyph_vector(band, span) for span in spans]
+        return self.templates.match(np.stack([v for v, _ in glyphs]), np.array([a for _, a in glyphs]))
+
+    def _split(
+        self, band: np.ndarray, span: Tuple[int, int], score: float,
+    ) -> List[Tuple[Tuple[int, int], int, float]]:
+        """
+        The best cut of a badly matching glyph into two, as [(span,
+        template, score)] x 2, when both parts match better than the
+        whole; else [].
+        """
+        c0, c1 = span
+        margin = max(1, int(round(MIN_SPLIT_WIDTH * band.shape[0])))
+        cuts = [
+            ((c0, left[1]), (right[0], c1))
+            for c in range(c0 + margin, c1 - margin + 1)
+            for left, right in [(_trim(band, (c0, c)), _trim(band, (c, c1)))]
+            if left is not None and right is not None
+        ]
+        if not cuts:
+            return []
+        best, scores = self._match(band, [part for cut in cuts for part in cut])
+        worst = np.minimum(scores[0::2], scores[1::2])
+        i = int(np.argmax(worst))
+        if worst[i] <= score:
+            return []
+        return [
+            (cuts[i][0], int(best[2 * i]), float(scores[2 * i])),
+            (cuts[i][1], int(best[2 * i + 1]), float(scores[2 * i + 1])),
+        ]
+
+    def read(self, crop: np.ndarray) -> Tuple[str, float]:
+        """
+        Returns (text, confidence). The confidence is the worst glyph's
+        match score, clipped to 0..1; a crop without any glyph gets 0.
+        Glyphs scoring below SPLIT_SCORE are cut in two when both parts
+        match better (glyphs whose columns touch).
+        """
+        lines = segment(ink_mask(crop))
+        if not lines:
+            return "", 0.0
+
+        words = []
+        worst = 1.0
+        for band, spans in lines:
+            best, scores = self._match(band, spans)
+            glyphs = []
+            for span, index, score in zip(spans, best.tolist(), scores.tolist()):
+                parts = self._split(band, span, score) if score < SPLIT_SCORE else []
+                glyphs.extend(parts or [(span, index, score)])
+            line = ""
+            for k, (span, index, score) in enumerate(glyphs):
+                if k and span[0] - glyphs[k - 1][0][1] > SPACE_GAP * band.shape[0]:
+                    line += " "
+                line += self.templates.chars[index]
+                worst = min(worst, score)
+            words.append(line)
+        return " ".join(words), float(np.clip(worst, 0.0, 1.0))
+
+
+# ---------- Ground truth from data_benchmarks.json ----------
+
+def _known_values(store, provenance, iso_name: str, bench_key: str, paths: List[str]) -> Dict[str, str]:
+    """
+    screenshot path -> stored value: from the provenance sidecar when it
+    matches the current ROI config, else by pairing the JSON values with
+    the (sorted) screenshots when the counts agree.
+    """
+    from ocr_read import roi_fingerprint
+    from includes.provenance import get_bench_provenance
+    from includes.store import get_bench_dict
+
+    recorded = get_bench_provenance(provenance, iso_name, bench_key)
+    if recorded and recorded["fingerprint"] == roi_fingerprint(iso_name, bench_key):
+        by_name = {name: info["value"] for name, info in recorded["files"].items()}
+        return {p: by_name[os.path.basename(p)] for p in paths if os.path.basename(p) in by_name}
+
+    entry = store.get(iso_name)
+    if entry is None:
+        return {}
+    bench = get_bench_dict(entry, bench_key)
+    if bench_key == "passmark":
+        if len(paths) != 1 or not bench.get("main"):
+            return {}
+        return {paths[0]: " ".join(bench.get(k, "") for k in ("main", "cpu", "2d", "3d", "memory", "disk"))}
+    values = bench.get("values") or []
+    return dict(zip(paths, values)) if len(values) == len(paths) else {}
+
+
+def labeled_crops(
+    json_path: str = JSON_PATH,
+    provenance_path: str = PROVENANCE_PATH,
+    root_dir: str = ROOT_DIR,
+) -> Iterator[Sample]:
+    """
+    Every ROI crop of every screenshot whose value is known, labeled with
+    its token of that value (values are the ROI texts joined by spaces).
+    """
+    from ocr_read import get_roi_plan, screenshot_offsets
+    from includes.frame import Frame
+    from includes.provenance import load_provenance
+    from includes.scan import scan_root
+    from includes.store import IsoStore
+
+    store = IsoStore.load(json_path)
+    provenance = load_provenance(provenance_path)
+    for iso_name, benches in scan_root(root_dir).items():
+        for bench_key, paths in benches.items():
+            plan = get_roi_plan(iso_name, bench_key)
+            for path, value in _known_values(store, provenance, iso_name, bench_key, paths).items():
+                tokens = value.split(" ")
+                if len(tokens) != len(plan):
+                    continue
+                frame = Frame.open(path)
+                offsets = screenshot_offsets(frame, bench_key)
+                if offsets is None:
+                    continue
+                for roi, token in zip(plan, tokens):
+                    try:
+                        crop = roi.crop(frame, offsets)
+                    except ValueError:
+                        continue
+                    yield crop, token, bench_key
+
+
+def evaluate(recognizer: GlyphRecognizer, samples: Iterable[Sample]) -> Dict[str, float]:
+    """Exact-match accuracy (spaces ignored), confidence and speed on labeled crops."""
+    total = correct = 0
+    confidences = []
+    elapsed = 0.0
+    for crop, label, _ in samples:
+        start = time.perf_counter()
+        text, confidence = recognizer.read(crop)
+        elapsed += time.perf_counter() - start
+        total += 1
+        correct += text.replace(" ", "") == label.replace(" ", "")
+        confidences.append(confidence)
+    return {
+        "crops": total,
+        "accuracy": correct / total if total else 0.0,
+        "min_confidence": min(confidences, default=0.0),
+        "mean_confidence": float(np.mean(confidences)) if confidences else 0.0,
+        "us_per_crop": elapsed / total * 1e6 if total else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(
+        description="Build or check the glyph templates of the 'glyphs' OCR backend."
+    )
+    parser.add_argument('--build', action='store_true', help='Learn templates from the values in the JSON file.')
+    parser.add_argument('--evaluate', action='store_true', help='Read every labeled crop back and report accuracy.')
+    parser.add_argument('--json', default=JSON_PATH, help='Benchmark JSON with the ground truth values.')
+    parser.add_argument('--provenance', default=PROVENANCE_PATH, help='Per-screenshot provenance sidecar.')
+    parser.add_argument('--root', default=ROOT_DIR, help='Folder with the ISO screenshot folders.')
+    parser.add_argument('--templates', default=GLYPH_TEMPLATES_PATH, help='Template file to write or read.')
+    args = parser.parse_args()
+    if not (args.build or args.evaluate):
+        parser.error("nothing to do: pass --build and/or --evaluate")
+
+    def samples() -> Iterator[Sample]:
+        return labeled_crops(args.json, args.provenance, args.root)
+
+    if args.build:
+        templates, report = build_templates(samples())
+        if not len(templates):
+            raise SystemExit("No usable labeled crops: nothing to learn from")
+        templates.save(args.templates)
+        chars = "".join(sorted(set(templates.chars)))
+        logging.info(
+            f"Wrote {len(templates)} templates for {chars!r} to {args.templates} "
+            f"({report['used']} crops used, {report['skipped']} skipped: glyph count != label length)"
+        )
+    if args.evaluate:
+        result = evaluate(GlyphRecognizer(GlyphTemplates.load(args.templates)), samples())
+        logging.info(
+            f"{result['crops']} crops: {result['accuracy'] * 100:.1f}% exact, "
+            f"confidence min {result['min_confidence']:.2f} / mean {result['mean_confidence']:.2f}, "
+            f"{result['us_per_crop']:.0f} us/crop"
+        )
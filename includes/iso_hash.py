@@ -0,0 +1,270 @@
+# iso_hash.py
+#
+# ISO image metadata of the entries: iso_file_name, iso_file_size,
+# iso_file_lastmodified and iso_sha1. Files are streamed through hashlib
+# ISO_HASH_CHUNK_BYTES at a time into one reused buffer per thread, and
+# ISO_HASH_THREADS of them are hashed at once (file reads and hashlib
+# both release the GIL). SHA-1s are cached by (path, size, mtime_ns), so
+# an unchanged multi-GB image is hashed once.
+# Hash files by hand with: python -m includes.iso_hash FILE... (or --generate MB)
+
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from includes.config import ISO_DIR, ISO_HASH_CACHE_PATH, ISO_HASH_CHUNK_BYTES, ISO_HASH_THREADS
+from includes.profiling import count, span
+from includes.store import IsoStore, write_text_atomic
+
+ISO_EXTENSIONS = (".iso",)
+
+HASH_CACHE_VERSION = 1
+
+# (size, mtime_ns)
+FileSignature = Tuple[int, int]
+
+
+# ---------- Finding the images ----------
+
+def list_iso_files(iso_dir: str = ISO_DIR) -> Dict[str, str]:
+    """Lower-cased file name -> path of the ISO images in iso_dir (listed once)."""
+    try:
+        with os.scandir(iso_dir) as entries:
+            return {
+                e.name.lower(): e.path for e in entries
+                if e.name.lower().endswith(ISO_EXTENSIONS) and e.is_file()
+            }
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
+
+
+def find_iso_file(entry: Dict[str, Any], iso_files: Dict[str, str]) -> Optional[str]:
+    """The ISO image of an entry (see list_iso_files): its iso_file_name, else "<name>.iso"."""
+    for file_name in (entry.get("iso_file_name"), (entry.get("name") or "") + ".iso"):
+        if file_name and file_name.lower() in iso_files:
+            return iso_files[file_name.lower()]
+    return None
+
+
+# ---------- Hashing ----------
+
+_buffers = threading.local()
+
+
+def hash_file(path: str, chunk_bytes: int = ISO_HASH_CHUNK_BYTES) -> str:
+    """SHA-1 of a file, read with readinto into this thread's reused buffer."""
+    buffer = getattr(_buffers, "buffer", None)
+    if buffer is None or len(buffer) != chunk_bytes:
+        buffer = _buffers.buffer = bytearray(chunk_bytes)
+    view = memoryview(buffer)
+    digest = hashlib.sha1()
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+
+def hash_files(
+    paths: Iterable[str],
+    threads: int = ISO_HASH_THREADS,
+    chunk_bytes: int = ISO_HASH_CHUNK_BYTES,
+) -> Dict[str, Any]:
+    """
+    Hash `paths` on a pool of `threads`. Returns {"hashes": {path: sha1},
+    "errors": {path: message}, "bytes": bytes read, "seconds": wall time}.
+    """
+    paths = list(paths)
+    hashes: Dict[str, str] = {}
+    errors: Dict[str, str] = {}
+    total = 0
+    started = time.perf_counter()
+
+    def one(path: str) -> Tuple[str, Optional[str], Optional[str], int]:
+        with span("iso_hash", file=os.path.basename(path)):
+            try:
+                size = os.path.getsize(path)
+                return path, hash_file(path, chunk_bytes), None, size
+            except OSError as e:
+                return path, None, f"{type(e).__name__}: {e}", 0
+
+    with ThreadPoolExecutor(max_workers=max(1, min(threads, len(paths) or 1))) as pool:
+        for path, sha1, error, size in pool.map(one, paths):
+            if error is not None:
+                errors[path] = error
+            else:
+                hashes[path] = sha1
+                total += size
+    count("iso_bytes", total)
+    return {"hashes": hashes, "errors": errors, "bytes": total, "seconds": time.perf_counter() - started}
+
+
+def throughput(n_bytes: int, seconds: float) -> str:
+    mb = n_bytes / 1e6
+    return f"{mb:.0f} MB in {seconds:.2f} s ({mb / seconds if seconds else 0:.0f} MB/s)"
+
+
+# ---------- Cache ----------
+
+class HashCache:
+    """SHA-1s of files by absolute path, valid while size and mtime_ns match."""
+
+    def __init__(self, files: Optional[Dict[str, List[Any]]] = None) -> None:
+        # path -> [size, mtime_ns, sha1]
+        self.files: Dict[str, List[Any]] = files or {}
+        self.used: Dict[str, List[Any]] = {}
+
+    @classmethod
+    def load(cls, path: str = ISO_HASH_CACHE_PATH) -> "HashCache":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls()
+        if not isinstance(data, dict) or data.get("version") != HASH_CACHE_VERSION:
+            return cls()
+        return cls(data.get("files") or {})
+
+    def get(self, path: str, signature: FileSignature) -> Optional[str]:
+        key = os.path.abspath(path)
+        known = self.files.get(key)
+        if known is None or (known[0], known[1]) != signature:
+            return None
+        self.used[key] = known
+        return known[2]
+
+    def put(self, path: str, signature: FileSignature, sha1: str) -> None:
+        key = os.path.abspath(path)
+        self.files[key] = self.used[key] = [signature[0], signature[1], sha1]
+
+    def save(self, path: str = ISO_HASH_CACHE_PATH) -> bool:
+        """Write the entries looked up or added since load (others are dropped)."""
+        doc = {"version": HASH_CACHE_VERSION, "files": dict(sorted(self.used.items()))}
+        return write_text_atomic(path, json.dumps(doc, indent=1))
+
+
+# ---------- Entry fields ----------
+
+def format_size(size: int) -> str:
+    """iso_file_size: always in GB (GiB, like Windows shows it), so the column sorts."""
+    return f"{size / 2**30:.2f} GB"
+
+
+def format_mtime(mtime_ns: int) -> str:
+    """iso_file_lastmodified, in UTC so it does not depend on the machine."""
+    moment = datetime.datetime.fromtimestamp(mtime_ns / 1e9, tz=datetime.timezone.utc)
+    return moment.strftime("%Y-%m-%d %H:%M")
+
+
+def iso_fields(path: str, signature: FileSignature, sha1: str) -> Dict[str, str]:
+    size, mtime_ns = signature
+    return {
+        "iso_file_name": os.path.basename(path),
+        "iso_file_size": format_size(size),
+        "iso_file_lastmodified": format_mtime(mtime_ns),
+        "iso_sha1": sha1,
+    }
+
+
+def update_iso_metadata(
+    store: IsoStore,
+    iso_dir: str = ISO_DIR,
+    cache_path: str = ISO_HASH_CACHE_PATH,
+    threads: int = ISO_HASH_THREADS,
+) -> Dict[str, int]:
+    """
+    Fill the ISO fields of every entry whose image is found (see
+    find_iso_file). Only images missing from the hash cache are read;
+    entries whose fields change are marked dirty. An unreadable image is
+    logged and its entry left as is. Returns what was found / hashed.
+    """
+    iso_files = list_iso_files(iso_dir)
+    found: Dict[str, Tuple[str, FileSignature]] = {}
+    for entry in store.entries:
+        name = entry.get("name")
+        if name in found or store.get(name) is not entry:
+            continue
+        path = find_iso_file(entry, iso_files)
+        if path is None:
+            continue
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            logging.warning(f"ISO image of {name} not readable: {e}")
+            continue
+        found[name] = (path, (st.st_size, st.st_mtime_ns))
+    if not found:
+        return {"isos": 0, "hashed": 0, "bytes": 0}
+
+    cache = HashCache.load(cache_path)
+    sha1s = {path: cache.get(path, signature) for path, signature in found.values()}
+    todo = sorted(path for path, sha1 in sha1s.items() if sha1 is None)
+    result = {"hashes": {}, "errors": {}, "bytes": 0}
+    if todo:
+        result = hash_files(todo, threads)
+        logging.info(f"ISO hashes: {len(result['hashes'])} image(s), {throughput(result['bytes'], result['seconds'])}")
+        for path, error in result["errors"].items():
+            logging.warning(f"ISO image {path} not hashed: {error}")
+    signatures = {path: signature for path, signature in found.values()}
+    for path, sha1 in result["hashes"].items():
+        cache.put(path, signatures[path], sha1)
+        sha1s[path] = sha1
+
+    for name, (path, signature) in found.items():
+        if sha1s[path] is None:
+            continue
+        entry = store.get(name)
+        fields = iso_fields(path, signature, sha1s[path])
+        if any(entry.get(key) != value for key, value in fields.items()):
+            entry.update(fields)
+            store.mark_dirty(name)
+    cache.save(cache_path)
+    return {"isos": len(found), "hashed": len(result["hashes"]), "bytes": result["bytes"]}
+
+
+# ---------- Command line ----------
+
+def generate_file(path: str, size_mb: int) -> None:
+    """A size_mb MB file of pseudo-random bytes, for throughput checks."""
+    block = os.urandom(2**20)
+    with open(path, "wb") as f:
+        for i in range(size_mb):
+            # Vary each block a little so no two are alike
+            f.write(i.to_bytes(8, "little") + block[8:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SHA-1 of ISO images, with the throughput.")
+    parser.add_argument('files', nargs='*', help='Files to hash.')
+    parser.add_argument('--generate', type=int, metavar='MB', help='Hash generated MB-sized temp files instead.')
+    parser.add_argument('--copies', type=int, default=1, help='With --generate, number of files.')
+    parser.add_argument('--threads', type=int, default=ISO_HASH_THREADS, help='Files hashed at once.')
+    parser.add_argument('--chunk-mb', type=int, default=ISO_HASH_CHUNK_BYTES // 2**20, help='Read size.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="iso_hash_") as tmp:
+        files = args.files
+        if args.generate:
+            files = [os.path.join(tmp, f"generated-{i}.iso") for i in range(args.copies)]
+            for path in files:
+                generate_file(path, args.generate)
+        if not files:
+            parser.error("no files to hash (give FILE... or --generate MB)")
+        result = hash_files(files, args.threads, args.chunk_mb * 2**20)
+        for path in files:
+            print(f"{result['hashes'].get(path) or result['errors'][path]}  {path}")
+    print(f"{len(result['hashes'])} file(s), {throughput(result['bytes'], result['seconds'])} with {args.threads} thread(s)")
+
+
+if __name__ == "__main__":
+    main()
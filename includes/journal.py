@@ -0,0 +1,164 @@
+# journal.py
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Tuple
+
+from includes.store import write_text_atomic
+
+# (iso_name, bench_key, filename) -> one journal record:
+# {"iso", "bench", "file", "size", "mtime_ns", "fingerprint", "value"}
+JournalIndex = Dict[Tuple[str, str, str], Dict[str, Any]]
+
+# One {"iso", "bench", "file", "error"} per failure; "file" is None when
+# the bench failed as a whole (e.g. a value count mismatch)
+Failure = Dict[str, Any]
+
+# A run without --resume moves an unfinished journal here instead of
+# truncating it (one generation is kept)
+ROTATED_SUFFIX = ".1"
+
+
+class RunJournal:
+    """
+    Append-only JSONL log of every screenshot value read during a run.
+
+    Each record is flushed and fsynced as soon as the screenshot is done,
+    so a crash or an interrupted run loses at most the screenshot in
+    flight. With resume=True the records of the previous run are replayed
+    (see resumed_values); without it, an unfinished journal is moved to
+    `path` + ROTATED_SUFFIX rather than truncated. Once the run's results
+    are saved, discard() removes the file.
+    """
+
+    def __init__(self, path: str, resume: bool = False) -> None:
+        self.path = path
+        self.replayed: JournalIndex = load_journal(path) if resume else {}
+        if not resume:
+            rotate_journal(path)
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+        if resume and not _ends_with_newline(path):
+            # Terminate a torn last line, so the next record stays readable
+            self._file.write("\n")
+
+    def record(
+        self,
+        iso_name: str,
+        bench_key: str,
+        path: str,
+        signature: Dict[str, int],
+        fingerprint: str,
+        value: str,
+    ) -> None:
+        line = json.dumps({
+            "iso": iso_name,
+            "bench": bench_key,
+            "file": os.path.basename(path),
+            "size": signature["size"],
+            "mtime_ns": signature["mtime_ns"],
+            "fingerprint": fingerprint,
+            "value": value,
+        }, sort_keys=True)
+        self._file.write(line + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def resumed_values(
+        self,
+        iso_name: str,
+        bench_key: str,
+        fingerprint: str,
+        signatures: Dict[str, Dict[str, int]],
+        paths: List[str],
+    ) -> Dict[str, str]:
+        """
+        path -> value for the screenshots the replayed journal already
+        read, from the same file (size, mtime) under the same ROI/parser
+        fingerprint.
+        """
+        values = {}
+        for path in paths:
+            known = self.replayed.get((iso_name, bench_key, os.path.basename(path)))
+            if (
+                known is not None
+                and known["fingerprint"] == fingerprint
+                and known["size"] == signatures[path]["size"]
+                and known["mtime_ns"] == signatures[path]["mtime_ns"]
+            ):
+                values[path] = known["value"]
+        return values
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def discard(self) -> None:
+        """Close and delete the journal: its results are saved elsewhere now."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def rotate_journal(path: str) -> None:
+    """Move a non-empty journal left by an unfinished run out of the way."""
+    try:
+        if os.path.getsize(path) == 0:
+            return
+    except FileNotFoundError:
+        return
+    rotated = path + ROTATED_SUFFIX
+    os.replace(path, rotated)
+    logging.warning(
+        f"Unfinished run journal moved to {rotated}; to reuse it, move it back to {path} "
+        f"and run with --resume"
+    )
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def load_journal(path: str) -> JournalIndex:
+    """
+    Replay a journal; later records win. A torn last line (the run died
+    mid-write) is skipped.
+    """
+    index: JournalIndex = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    index[(record["iso"], record["bench"], record["file"])] = record
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    logging.warning(f"Skipping unreadable journal line {line_no} in {path}")
+    except FileNotFoundError:
+        pass
+    return index
+
+
+def save_failure_report(path: str, failures: List[Failure]) -> None:
+    """
+    Write the run's failures as JSON, sorted by ISO / bench / file, or
+    remove a previous report when the run had none.
+    """
+    if not failures:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return
+    ordered = sorted(failures, key=lambda f: (f["iso"], f["bench"], f["file"] or ""))
+    write_text_atomic(path, json.dumps(ordered, indent=1))
+
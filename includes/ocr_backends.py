@@ -0,0 +1,489 @@
+# ocr_backends.py
+
+import argparse
+import base64
+import copy
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Type
+
+import numpy as np
+from PIL import Image
+
+from includes.config import (
+    GLYPH_MIN_CONFIDENCE, GLYPH_TEMPLATES_PATH, OCR_BACKEND, OCR_EXECUTABLE, OCR_WORKER_COMMAND,
+)
+from includes.glyphs import GlyphRecognizer, GlyphTemplates
+
+# Repo root, so a worker started from any cwd can import `includes`
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class OcrError(Exception):
+    """Raised when a backend cannot recognize one of the images in a batch."""
+
+
+# ---------- Backend interface ----------
+
+class OcrBackend:
+    """
+    Base class for OCR backends.
+
+    Callers pass in-memory ROI crops (PIL images) to recognize_many(), which
+    records per-call latency so backends can be compared (see stats()).
+    Subclasses implement _recognize_many(images) -> list[str]. Backends that
+    can only read files set needs_path = True and receive PNG paths instead,
+    written to a private per-backend temp directory (tmpfs when available).
+    """
+    name = "base"
+    version = "1"
+    needs_path = False
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.images = 0
+        self.latencies: List[float] = []
+        self._tmp_dir: Optional[str] = None
+        self._tmp_count = 0
+
+    def identity(self) -> str:
+        """Backend name + version, e.g. for keying cached results."""
+        return f"{self.name}:{self.version}"
+
+    def recognize_many(self, images: List[Image.Image]) -> List[str]:
+        if not images:
+            return []
+        start = time.perf_counter()
+        if self.needs_path:
+            paths = [self._write_temp(image) for image in images]
+            try:
+                texts = self._recognize_many(paths)
+            finally:
+                for path in paths:
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+        else:
+            texts = self._recognize_many(images)
+        elapsed = time.perf_counter() - start
+        if len(texts) != len(images):
+            raise OcrError(
+                f"{self.name} returned {len(texts)} results for {len(images)} images"
+            )
+        self.calls += 1
+        self.images += len(images)
+        self.latencies.append(elapsed)
+        return texts
+
+    def recognize(self, image: Image.Image) -> str:
+        return self.recognize_many([image])[0]
+
+    def clone(self) -> "OcrBackend":
+        """
+        Another instance with the same settings and fresh stats, for a
+        concurrent OCR thread: one instance is never shared between threads.
+        """
+        twin = copy.copy(self)
+        OcrBackend.__init__(twin)
+        return twin
+
+    def merge_stats(self, other: "OcrBackend") -> None:
+        """Add a clone's call stats to this backend's, for one report per run."""
+        self.calls += other.calls
+        self.images += other.images
+        self.latencies.extend(other.latencies)
+        other.calls = other.images = 0
+        other.latencies = []
+
+    def _recognize_many(self, images: list) -> List[str]:
+        raise NotImplementedError
+
+    def _write_temp(self, image: Image.Image) -> str:
+        if self._tmp_dir is None:
+            self._tmp_dir = tempfile.mkdtemp(prefix="ocr_crops_", dir=_tmpfs_dir())
+        self._tmp_count += 1
+        path = os.path.join(self._tmp_dir, f"crop_{self._tmp_count}.png")
+        # The file only lives until the OCR call returns: skip zlib work
+        image.save(path, compress_level=0)
+        return path
+
+    def close(self) -> None:
+        if self._tmp_dir is not None:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+
+    def stats(self) -> Dict[str, float]:
+        lat = sorted(self.latencies)
+        total = sum(lat)
+
+        def pct(p: float) -> float:
+            return lat[min(len(lat) - 1, int(p * len(lat)))] * 1000 if lat else 0.0
+
+        return {
+            "calls": self.calls,
+            "images": self.images,
+            "total_s": total,
+            "ms_per_image": (total / self.images * 1000) if self.images else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+        }
+
+    def report(self) -> None:
+        s = self.stats()
+        if not s["calls"]:
+            return
+        logging.info(
+            f"OCR backend {self.identity()}: {s['calls']} calls, {s['images']} images, "
+            f"{s['total_s']:.2f}s total, {s['ms_per_image']:.1f} ms/image, "
+            f"p50 {s['p50_ms']:.1f} ms/call, p95 {s['p95_ms']:.1f} ms/call"
+        )
+
+
+def _tmpfs_dir() -> Optional[str]:
+    """/dev/shm when it is a writable directory, else the default temp dir."""
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return shm
+    return None
+
+
+# ---------- Registry ----------
+
+BACKENDS: Dict[str, Type[OcrBackend]] = {}
+
+
+def register_backend(name: str) -> Callable[[Type[OcrBackend]], Type[OcrBackend]]:
+    def decorator(cls: Type[OcrBackend]) -> Type[OcrBackend]:
+        cls.name = name
+        BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def create_backend(name: str, **kwargs) -> OcrBackend:
+    try:
+        cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown OCR backend `{name}`, expected one of: {', '.join(sorted(BACKENDS))}"
+        )
+    return cls(**kwargs)
+
+
+_active_backend: Optional[OcrBackend] = None
+# Clones of _active_backend for concurrent OCR threads (see get_backends)
+_thread_backends: List[OcrBackend] = []
+
+
+def get_backend() -> OcrBackend:
+    """Return the process-wide backend, creating it from OCR_BACKEND on first use."""
+    global _active_backend
+    if _active_backend is None:
+        _active_backend = create_backend(OCR_BACKEND)
+    return _active_backend
+
+
+def get_backends(n: int) -> List[OcrBackend]:
+    """
+    n backends for n concurrent OCR threads: the process-wide one plus
+    n - 1 clones, kept warm for the whole run and closed with it.
+    """
+    backend = get_backend()
+    while len(_thread_backends) < n - 1:
+        _thread_backends.append(backend.clone())
+    return [backend] + _thread_backends[:n - 1]
+
+
+def _close_thread_backends() -> None:
+    for clone in _thread_backends:
+        if _active_backend is not None:
+            _active_backend.merge_stats(clone)
+        clone.close()
+    _thread_backends.clear()
+
+
+def set_backend(backend: OcrBackend) -> None:
+    """Replace the process-wide backend (the previous one and its clones are closed)."""
+    global _active_backend
+    if _active_backend is not None and _active_backend is not backend:
+        _close_thread_backends()
+        _active_backend.close()
+    _active_backend = backend
+
+
+def close_backend(report: bool = True) -> None:
+    """Close the process-wide backend (and its clones) at the end of a run."""
+    global _active_backend
+    if _active_backend is None:
+        return
+    _close_thread_backends()
+    if report:
+        _active_backend.report()
+    _active_backend.close()
+    _active_backend = None
+
+
+# ---------- Built-in backends ----------
+
+@register_backend("capture2text")
+class Capture2TextCliBackend(OcrBackend):
+    """One Capture2Text_CLI process per image (the original behavior)."""
+    needs_path = True
+
+    def __init__(self, executable: str = OCR_EXECUTABLE) -> None:
+        super().__init__()
+        self.executable = executable
+
+    def _recognize_many(self, images: List[str]) -> List[str]:
+        texts = []
+        for path in images:
+            try:
+                result = subprocess.run(
+                    [self.executable, '-i', path],
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
+            except (OSError, subprocess.CalledProcessError) as e:
+                raise OcrError(f"OCR failed for {path}: {e}")
+            texts.append(result.stdout.strip())
+        return texts
+
+
+@register_backend("worker")
+class WorkerBackend(OcrBackend):
+    """
+    Long-lived worker process, kept warm for the whole run.
+
+    Line protocol on the worker's stdin/stdout: one JSON object per line,
+    request {"mode": "L", "size": [w, h], "pixels": "<base64 raw bytes>"}
+    -> response {"text": "..."} or {"error": "..."}. Crops are sent as raw
+    pixels, so nothing is PNG-encoded or written to disk on the way.
+    Requests of a batch are written before the responses are read.
+    See serve_worker() for the worker side.
+
+    Opt-in: the command (OCR_WORKER_COMMAND) must be given, and it only
+    pays off when the worker keeps its engine loaded, e.g.
+    `python -m includes.ocr_backends --serve glyphs`. Serving
+    "capture2text" this way still starts Capture2Text once per crop.
+    """
+
+    def __init__(self, command: Optional[List[str]] = None) -> None:
+        super().__init__()
+        command = command or OCR_WORKER_COMMAND
+        if not command:
+            raise ValueError(
+                "The worker OCR backend needs a worker command: set OCR_WORKER_COMMAND in "
+                "includes/config.py, e.g. [sys.executable, '-m', 'includes.ocr_backends', '--serve', 'glyphs']"
+            )
+        self.command = list(command)
+        self.proc: Optional[subprocess.Popen] = None
+
+    def identity(self) -> str:
+        return f"{self.name}:{self.version}:{' '.join(self.command)}"
+
+    def clone(self) -> "WorkerBackend":
+        # Each clone starts its own worker process on first use
+        twin = super().clone()
+        twin.proc = None
+        return twin
+
+    def _ensure_started(self) -> subprocess.Popen:
+        if self.proc is None or self.proc.poll() is not None:
+            env = dict(os.environ)
+            env["PYTHONPATH"] = os.pathsep.join(
+                p for p in (REPO_DIR, env.get("PYTHONPATH")) if p
+            )
+            self.proc = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+                env=env,
+            )
+        return self.proc
+
+    def _recognize_many(self, images: List[Image.Image]) -> List[str]:
+        proc = self._ensure_started()
+        try:
+            for image in images:
+                proc.stdin.write(json.dumps(encode_image(image)) + "\n")
+            proc.stdin.flush()
+
+            # Read every reply before raising, so the stream stays in sync
+            texts = []
+            errors = []
+            for idx in range(len(images)):
+                line = proc.stdout.readline()
+                if not line:
+                    raise OcrError(f"OCR worker exited while processing image {idx + 1}/{len(images)}")
+                reply = json.loads(line)
+                if "error" in reply:
+                    errors.append(f"OCR failed for image {idx + 1}/{len(images)}: {reply['error']}")
+                    texts.append("")
+                else:
+                    texts.append(reply["text"])
+            if errors:
+                raise OcrError("; ".join(errors))
+            return texts
+        except (OSError, ValueError) as e:
+            self.close()
+            raise OcrError(f"OCR worker failed: {e}")
+
+    def close(self) -> None:
+        super().close()
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except Exception:
+            self.proc.kill()
+        self.proc = None
+
+
+@register_backend("glyphs")
+class GlyphTemplateBackend(OcrBackend):
+    """
+    In-process NumPy glyph-template matcher (see includes/glyphs.py): no
+    external OCR program, so it runs anywhere. Crops whose worst glyph
+    scores below min_confidence raise OcrError instead of returning a
+    guess. The template digest is part of identity(), so rebuilding the
+    templates invalidates cached results.
+    """
+
+    def __init__(
+        self,
+        templates_path: str = GLYPH_TEMPLATES_PATH,
+        min_confidence: float = GLYPH_MIN_CONFIDENCE,
+    ) -> None:
+        super().__init__()
+        if not os.path.isfile(templates_path):
+            raise FileNotFoundError(
+                f"Glyph templates not found: {templates_path} "
+                f"(build them with: python -m includes.glyphs --build)"
+            )
+        self.recognizer = GlyphRecognizer(GlyphTemplates.load(templates_path))
+        self.min_confidence = min_confidence
+        self.confidences: List[float] = []
+
+    def identity(self) -> str:
+        return f"{self.name}:{self.version}:{self.recognizer.templates.digest[:12]}"
+
+    def clone(self) -> "GlyphTemplateBackend":
+        # The templates are read-only and shared
+        twin = super().clone()
+        twin.confidences = []
+        return twin
+
+    def merge_stats(self, other: OcrBackend) -> None:
+        super().merge_stats(other)
+        self.confidences.extend(other.confidences)
+        other.confidences = []
+
+    def _recognize_many(self, images: List[Image.Image]) -> List[str]:
+        texts = []
+        low = []
+        for idx, image in enumerate(images):
+            text, confidence = self.recognizer.read(np.asarray(image))
+            self.confidences.append(confidence)
+            if confidence < self.min_confidence:
+                low.append(f"image {idx + 1}/{len(images)} read `{text}` at confidence {confidence:.2f}")
+            texts.append(text)
+        if low:
+            raise OcrError("Low-confidence glyph match: " + "; ".join(low))
+        return texts
+
+    def report(self) -> None:
+        super().report()
+        if self.confidences:
+            logging.info(
+                f"Glyph confidence: min {min(self.confidences):.2f}, "
+                f"mean {sum(self.confidences) / len(self.confidences):.2f}"
+            )
+
+
+@register_backend("fake")
+class FakeOcrBackend(OcrBackend):
+    """
+    Deterministic in-process backend for tests on Linux.
+
+    `recognizer(image)` produces the text; by default the answer is looked
+    up in `answers` by the sha1 of the image's raw pixels, falling back to
+    `default`.
+    """
+
+    def __init__(
+        self,
+        recognizer: Optional[Callable[[Image.Image], str]] = None,
+        answers: Optional[Dict[str, str]] = None,
+        default: str = "0",
+    ) -> None:
+        super().__init__()
+        self.answers = answers or {}
+        self.default = default
+        self.recognizer = recognizer or self._lookup
+
+    def _lookup(self, image: Image.Image) -> str:
+        digest = hashlib.sha1(image.tobytes()).hexdigest()
+        return self.answers.get(digest, self.default)
+
+    def _recognize_many(self, images: List[Image.Image]) -> List[str]:
+        return [self.recognizer(image) for image in images]
+
+
+# ---------- Worker side ----------
+
+def encode_image(image: Image.Image) -> Dict[str, object]:
+    return {
+        "mode": image.mode,
+        "size": list(image.size),
+        "pixels": base64.b64encode(image.tobytes()).decode("ascii"),
+    }
+
+
+def decode_image(request: Dict[str, object]) -> Image.Image:
+    return Image.frombytes(
+        request["mode"], tuple(request["size"]), base64.b64decode(request["pixels"])
+    )
+
+
+def serve_worker(backend: OcrBackend, stdin=None, stdout=None) -> None:
+    """Serve the WorkerBackend line protocol with an in-process backend."""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    for line in stdin:
+        if not line.strip():
+            continue
+        try:
+            image = decode_image(json.loads(line))
+            reply = {"text": backend.recognize(image)}
+        except Exception as e:
+            reply = {"error": str(e)}
+        stdout.write(json.dumps(reply) + "\n")
+        stdout.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run an OCR backend as a stdin/stdout worker.")
+    parser.add_argument(
+        '--serve',
+        required=True,
+        choices=sorted(name for name in BACKENDS if name != 'worker'),
+        help='Backend to serve over the worker line protocol (capture2text still starts one process per crop).'
+    )
+    args = parser.parse_args()
+    backend = create_backend(args.serve)
+    try:
+        serve_worker(backend)
+    finally:
+        backend.close()
@@ -0,0 +1,163 @@
+# ocr_cache.py
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from PIL import Image
+
+from includes.config import OCR_CACHE_PATH, OCR_CACHE_MAX_ENTRIES, OCR_CACHE_MAX_AGE_DAYS
+
+
+def cache_key(image: Image.Image, settings: str, backend_identity: str) -> str:
+    """
+    Content address of one OCR request: the cropped pixels, the
+    preprocessing settings that produced them and the backend identity.
+    """
+    h = hashlib.sha1()
+    h.update(f"{image.mode}|{image.size}|{settings}|{backend_identity}\0".encode("utf-8"))
+    h.update(image.tobytes())
+    return h.hexdigest()
+
+
+class OcrCache:
+    """
+    SQLite-backed OCR result cache, keyed by cache_key().
+
+    Entries not used for max_age_days are dropped, and the least recently
+    used ones are dropped beyond max_entries; both happen on close().
+    Several processes may share the file (--jobs): SQLite does the locking.
+    Within a process, the OCR threads of ocr_read's pipeline share one
+    connection, serialized by `lock`.
+    """
+
+    def __init__(
+        self,
+        path: str = OCR_CACHE_PATH,
+        max_entries: int = OCR_CACHE_MAX_ENTRIES,
+        max_age_days: float = OCR_CACHE_MAX_AGE_DAYS,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_results ("
+            " key TEXT PRIMARY KEY,"
+            " text TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS ocr_results_last_used ON ocr_results (last_used)"
+        )
+        self.conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        if not keys:
+            return {}
+        marks = ",".join("?" * len(keys))
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT key, text FROM ocr_results WHERE key IN ({marks})", keys
+            ).fetchall()
+            found = dict(rows)
+            if found:
+                self.conn.execute(
+                    f"UPDATE ocr_results SET last_used = ? WHERE key IN ({','.join('?' * len(found))})",
+                    [time.time(), *found],
+                )
+                self.conn.commit()
+            self.hits += sum(1 for k in keys if k in found)
+            self.misses += sum(1 for k in keys if k not in found)
+        return found
+
+    def put_many(self, results: Dict[str, str]) -> None:
+        if not results:
+            return
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO ocr_results (key, text, created, last_used) VALUES (?, ?, ?, ?)",
+                [(k, text, now, now) for k, text in results.items()],
+            )
+            self.conn.commit()
+
+    def evict(self) -> int:
+        """Apply the age and size limits; returns the number of dropped entries."""
+        before = self.conn.total_changes
+        if self.max_age_days:
+            cutoff = time.time() - self.max_age_days * 86400
+            self.conn.execute("DELETE FROM ocr_results WHERE last_used < ?", (cutoff,))
+        if self.max_entries:
+            self.conn.execute(
+                "DELETE FROM ocr_results WHERE key IN ("
+                " SELECT key FROM ocr_results ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        self.conn.commit()
+        return self.conn.total_changes - before
+
+    def export(self) -> Dict[str, int]:
+        """Hits and misses since the last export, then reset: a pool worker's share of the run."""
+        with self.lock:
+            stats = {"hits": self.hits, "misses": self.misses}
+            self.hits = self.misses = 0
+        return stats
+
+    def report(self) -> None:
+        report_cache_stats(self.path, {"hits": self.hits, "misses": self.misses})
+
+    def close(self) -> None:
+        if self.conn is None:
+            return
+        evicted = self.evict()
+        if evicted:
+            logging.info(f"OCR cache: evicted {evicted} entries")
+        self.conn.close()
+        self.conn = None
+
+
+def report_cache_stats(path: str, stats: Dict[str, int]) -> None:
+    """Log a hits / misses summary (e.g. the total of a --jobs run's workers)."""
+    total = stats["hits"] + stats["misses"]
+    if not total:
+        return
+    logging.info(
+        f"OCR cache {path}: {stats['hits']} hits, {stats['misses']} misses "
+        f"({stats['hits'] / total * 100:.1f}% hit rate)"
+    )
+
+
+# ---------- Process-wide cache ----------
+
+_active_cache: Optional[OcrCache] = None
+
+
+def get_cache() -> Optional[OcrCache]:
+    """Return the process-wide cache, or None when caching is off (--no-cache)."""
+    return _active_cache
+
+
+def open_cache(path: str = OCR_CACHE_PATH) -> OcrCache:
+    global _active_cache
+    close_cache(report=False)
+    _active_cache = OcrCache(path)
+    return _active_cache
+
+
+def close_cache(report: bool = True) -> None:
+    global _active_cache
+    if _active_cache is None:
+        return
+    if report:
+        _active_cache.report()
+    _active_cache.close()
+    _active_cache = None
@@ -0,0 +1,97 @@
+# parallel.py
+
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import util as mp_util
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from includes.bench_update import compute_bench_unit
+from includes.ocr_backends import close_backend, create_backend, set_backend
+from includes.ocr_cache import close_cache, open_cache
+from includes.profiling import enable_profiling
+
+# (iso_name, bench_key, screenshot paths to OCR)
+WorkUnit = Tuple[str, str, List[str]]
+
+
+def _init_worker(backend_name: str, use_cache: bool, profile: bool = False) -> None:
+    """
+    Give each pool process its own warm OCR backend (and cache connection,
+    and profiler) for the whole run.
+    """
+    if profile:
+        enable_profiling()
+    set_backend(create_backend(backend_name))
+    # Pool processes exit through os._exit(), which skips atexit handlers
+    mp_util.Finalize(None, close_backend, exitpriority=10)
+    if use_cache:
+        open_cache()
+        # Its hits / misses go back with each unit record, for one total
+        mp_util.Finalize(None, close_cache, args=(False,), exitpriority=10)
+
+
+def run_units(
+    units: List[WorkUnit],
+    jobs: int,
+    backend_name: str,
+    use_cache: bool = True,
+    on_record: Optional[Callable[[Dict[str, Any]], None]] = None,
+    profile: bool = False,
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    OCR every (ISO, bench) unit on a pool of `jobs` processes.
+
+    Each unit only ships its own screenshot paths. Results come
+    back as plain records (see compute_bench_unit) in the same order as
+    `units`, whatever order the workers finish in, so the caller can merge
+    them exactly as a serial run would. on_record is called with each
+    record as soon as its unit finishes (e.g. to journal it). With
+    profile=True the workers profile too, and each record carries its
+    unit's spans in "profile". Returns the records and the OCR cache
+    hits / misses summed over the workers.
+    """
+    cache_stats = {"hits": 0, "misses": 0}
+    if not units:
+        return [], cache_stats
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(backend_name, use_cache, profile),
+    ) as pool:
+        futures = [
+            pool.submit(
+                compute_bench_unit,
+                iso_name,
+                bench_key,
+                {iso_name: {bench_key: paths}},
+            )
+            for iso_name, bench_key, paths in units
+        ]
+
+        position = {future: i for i, future in enumerate(futures)}
+        records: List[Dict[str, Any]] = [{} for _ in units]
+        for future in as_completed(futures):
+            i = position[future]
+            iso_name, bench_key, _ = units[i]
+            try:
+                record = future.result()
+            except Exception as e:
+                # e.g. a worker process died; the other units are unaffected
+                logging.error(f"Worker failed for {iso_name} / {bench_key}: {e}")
+                record = {
+                    "iso": iso_name,
+                    "bench": bench_key,
+                    "values": None,
+                    "files": {},
+                    "error": f"{type(e).__name__}: {e}",
+                    "errors": [],
+                    "profile": None,
+                    "cache": None,
+                }
+            for key, n in (record.get("cache") or {}).items():
+                cache_stats[key] += n
+            records[i] = record
+            if on_record:
+                on_record(record)
+    return records, cache_stats
@@ -0,0 +1,176 @@
+# pipeline.py
+
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+# End-of-stream marker passed down the stage queues
+_DONE = object()
+
+# (item, result, error): error is the exception a stage raised, else None
+PipelineResult = Tuple[Any, Any, Optional[BaseException]]
+
+
+class StreamingPipeline:
+    """
+    Streams items through two overlapping stages and hands the results
+    back in input order:
+
+        items -> prepare (prepare_threads) -> finish (one thread per worker) -> in order
+
+    prepare(item) runs on a pool of threads (for screenshots: decode,
+    anchor search and crops; PIL and NumPy release the GIL for the heavy
+    parts). finish(worker, prepared) runs on one thread per entry of
+    `workers`, each thread owning its worker (an OCR backend), so workers
+    are never shared between threads. Items are pulled lazily from the
+    input iterable.
+
+    The queues between stages are bounded and at most `window` items are
+    in flight (pulled but not yet handed back), so memory stays flat
+    however many items there are, and a slow item holds back at most
+    `window` finished ones. An exception raised by either stage becomes
+    that item's error; the other items go on. A BaseException that is not
+    an Exception (KeyboardInterrupt, SystemExit) stops the run instead and
+    is re-raised by run().
+    """
+
+    def __init__(
+        self,
+        prepare: Callable[[Any], Any],
+        finish: Callable[[Any, Any], Any],
+        workers: List[Any],
+        prepare_threads: int = 2,
+        window: int = 8,
+    ) -> None:
+        if not workers:
+            raise ValueError("StreamingPipeline needs at least one worker")
+        self.prepare = prepare
+        self.finish = finish
+        self.workers = workers
+        self.prepare_threads = max(1, prepare_threads)
+        self.window = max(1, window)
+
+    def run(self, items: Iterable[Any]) -> Iterator[PipelineResult]:
+        stop = threading.Event()
+        slots = threading.Semaphore(self.window)
+        prepare_q: "queue.Queue" = queue.Queue(maxsize=self.window)
+        finish_q: "queue.Queue" = queue.Queue(maxsize=self.window)
+        # Never holds more than `window` results, thanks to `slots`
+        done_q: "queue.Queue" = queue.Queue()
+        prepare_left = [self.prepare_threads]
+        prepare_lock = threading.Lock()
+
+        def put(q: "queue.Queue", value: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(value, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def get(q: "queue.Queue") -> Any:
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            return _DONE
+
+        def feed() -> None:
+            total = 0
+            try:
+                for item in items:
+                    while not slots.acquire(timeout=0.1):
+                        if stop.is_set():
+                            return
+                    if not put(prepare_q, (total, item)):
+                        return
+                    total += 1
+            except BaseException as e:
+                done_q.put(("fatal", e))
+                return
+            finally:
+                for _ in range(self.prepare_threads):
+                    put(prepare_q, _DONE)
+            done_q.put(("end", total))
+
+        def prepare_loop() -> None:
+            try:
+                while True:
+                    job = get(prepare_q)
+                    if job is _DONE:
+                        break
+                    seq, item = job
+                    try:
+                        prepared, error = self.prepare(item), None
+                    except Exception as e:
+                        prepared, error = None, e
+                    if not put(finish_q, (seq, item, prepared, error)):
+                        break
+            except BaseException as e:
+                done_q.put(("fatal", e))
+            finally:
+                with prepare_lock:
+                    prepare_left[0] -= 1
+                    last = prepare_left[0] == 0
+                if last:
+                    for _ in self.workers:
+                        put(finish_q, _DONE)
+
+        def finish_loop(worker: Any) -> None:
+            try:
+                while True:
+                    job = get(finish_q)
+                    if job is _DONE:
+                        break
+                    seq, item, prepared, error = job
+                    result = None
+                    if error is None:
+                        try:
+                            result = self.finish(worker, prepared)
+                        except Exception as e:
+                            error = e
+                    done_q.put(("result", seq, item, result, error))
+            except BaseException as e:
+                # Not an item's error: run() re-raises it and stops the others
+                done_q.put(("fatal", e))
+
+        threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+        threads += [
+            threading.Thread(target=prepare_loop, name=f"pipeline-prepare-{i}", daemon=True)
+            for i in range(self.prepare_threads)
+        ]
+        threads += [
+            threading.Thread(target=finish_loop, args=(worker,), name=f"pipeline-finish-{i}", daemon=True)
+            for i, worker in enumerate(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        pending = {}
+        next_seq = 0
+        total = None
+        completed = False
+        try:
+            while total is None or next_seq < total:
+                message = done_q.get()
+                if message[0] == "fatal":
+                    raise message[1]
+                if message[0] == "end":
+                    total = message[1]
+                    continue
+                _, seq, item, result, error = message
+                pending[seq] = (item, result, error)
+                while next_seq in pending:
+                    yield pending.pop(next_seq)
+                    next_seq += 1
+                    slots.release()
+            completed = True
+        finally:
+            # After a complete run the end markers stop every thread; after
+            # an error or an abandoned iteration, `stop` does
+            if not completed:
+                stop.set()
+            for thread in threads:
+                thread.join()
@@ -0,0 +1,214 @@
+# profiling.py
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from includes.store import write_text_atomic
+
+
+class _NullSpan:
+    """What span() returns while profiling is off: enter/exit do nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "args", "start")
+
+    def __init__(self, profiler: "Profiler", name: str, args: Dict[str, Any]) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.profiler.add_span(self.name, self.start, time.perf_counter_ns() - self.start, self.args)
+        return False
+
+
+class Profiler:
+    """
+    Collects timed spans and counters for one process.
+
+    Span timestamps are perf_counter_ns shifted onto the wall clock once at
+    start, so the events of pool worker processes (see export/merge) line
+    up with the parent's on one Chrome trace timeline. Spans and counters
+    are added from the pipeline's threads, under one lock.
+    """
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+        self.epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+        self.started_ns = time.perf_counter_ns()
+        # (name, start_ns on the wall clock, dur_ns, pid, tid, args)
+        self.events: List[tuple] = []
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def add_span(self, name: str, start_ns: int, dur_ns: int, args: Dict[str, Any]) -> None:
+        event = (name, start_ns + self.epoch_offset_ns, dur_ns, self.pid, threading.get_ident(), args)
+        with self.lock:
+            self.events.append(event)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self.lock:
+            self.counters[name] += n
+
+    def export(self) -> Dict[str, Any]:
+        """Plain, picklable snapshot of this process's events, then cleared."""
+        with self.lock:
+            snapshot = {"events": self.events, "counters": dict(self.counters)}
+            self.events = []
+            self.counters = defaultdict(int)
+        return snapshot
+
+    def merge(self, snapshot: Optional[Dict[str, Any]]) -> None:
+        """Add a worker process's export() to this profiler."""
+        if not snapshot:
+            return
+        with self.lock:
+            self.events.extend(tuple(event) for event in snapshot["events"])
+            for name, n in snapshot["counters"].items():
+                self.counters[name] += n
+
+    def wall_seconds(self) -> float:
+        return (time.perf_counter_ns() - self.started_ns) / 1e9
+
+    # ---------- Output ----------
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Trace-event JSON for chrome://tracing / Perfetto: one "X" event per span."""
+        trace_events = []
+        tids: Dict[tuple, int] = {}
+        for name, start_ns, dur_ns, pid, tid, args in self.events:
+            # Small per-process thread ids read better than raw idents
+            short_tid = tids.setdefault((pid, tid), len(tids) + 1)
+            trace_events.append({
+                "name": name,
+                "cat": args.get("bench", "run"),
+                "ph": "X",
+                "ts": start_ns / 1000,
+                "dur": dur_ns / 1000,
+                "pid": pid,
+                "tid": short_tid,
+                "args": args,
+            })
+        end_us = max((e["ts"] + e["dur"] for e in trace_events), default=0)
+        for name, n in sorted(self.counters.items()):
+            trace_events.append({"name": name, "ph": "C", "ts": end_us, "pid": self.pid, "args": {name: n}})
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def write_trace(self, path: str) -> None:
+        write_text_atomic(path, json.dumps(self.chrome_trace()))
+
+    def summary(self) -> str:
+        """
+        Text table: p50 / p95 latency per stage, per bench type and per ISO
+        (from the "image" spans), then images/sec and OCR calls/sec over
+        the whole run.
+        """
+        by_stage: Dict[str, List[int]] = defaultdict(list)
+        by_bench: Dict[str, List[int]] = defaultdict(list)
+        by_iso: Dict[str, List[int]] = defaultdict(list)
+        for name, _, dur_ns, _, _, args in self.events:
+            by_stage[name].append(dur_ns)
+            if name == "image":
+                by_bench[args.get("bench", "?")].append(dur_ns)
+                by_iso[args.get("iso", "?")].append(dur_ns)
+
+        lines = []
+        for title, groups in (("Stage", by_stage), ("Bench (per image)", by_bench), ("ISO (per image)", by_iso)):
+            if not groups:
+                continue
+            width = max(len(title), max(len(k) for k in groups))
+            lines.append(f"{title:<{width}}  {'count':>7}  {'total s':>9}  {'p50 ms':>9}  {'p95 ms':>9}")
+            for key, durations in sorted(groups.items(), key=lambda kv: -sum(kv[1])):
+                p50, p95 = percentiles(durations, (0.50, 0.95))
+                lines.append(
+                    f"{key:<{width}}  {len(durations):>7}  {sum(durations) / 1e9:>9.3f}  "
+                    f"{p50 / 1e6:>9.2f}  {p95 / 1e6:>9.2f}"
+                )
+            lines.append("")
+
+        wall = self.wall_seconds()
+        images = self.counters.get("images", 0)
+        ocr_calls = self.counters.get("ocr_calls", 0)
+        lines.append(
+            f"{images} images in {wall:.2f} s: {images / wall if wall else 0:.1f} images/s, "
+            f"{ocr_calls} OCR calls ({ocr_calls / wall if wall else 0:.1f}/s)"
+        )
+        others = {k: v for k, v in sorted(self.counters.items()) if k not in ("images", "ocr_calls")}
+        if others:
+            lines.append("Counters: " + ", ".join(f"{k}={v}" for k, v in others.items()))
+        return "\n".join(lines)
+
+
+def percentiles(values: Iterable[int], points: Iterable[float]) -> List[float]:
+    """Nearest-rank percentiles, like OcrBackend.stats()."""
+    ordered = sorted(values)
+    if not ordered:
+        return [0.0 for _ in points]
+    return [ordered[min(len(ordered) - 1, int(p * len(ordered)))] for p in points]
+
+
+# ---------- Process-wide profiler ----------
+
+_active_profiler: Optional[Profiler] = None
+
+
+def get_profiler() -> Optional[Profiler]:
+    """Return the process-wide profiler, or None when profiling is off."""
+    return _active_profiler
+
+
+def enable_profiling() -> Profiler:
+    global _active_profiler
+    _active_profiler = Profiler()
+    return _active_profiler
+
+
+def disable_profiling() -> None:
+    global _active_profiler
+    _active_profiler = None
+
+
+def span(name: str, **args: Any):
+    """
+    Context manager timing one stage, e.g. with span("decode", iso=..., bench=...).
+    While profiling is off this is a global lookup returning a shared no-op.
+    """
+    if _active_profiler is None:
+        return _NULL_SPAN
+    return _Span(_active_profiler, name, args)
+
+
+def span_since(name: str, start_ns: int, **args: Any) -> None:
+    """
+    Record a span from start_ns (time.perf_counter_ns()) to now, for a
+    stage whose start and end are seen by different threads.
+    """
+    if _active_profiler is not None:
+        _active_profiler.add_span(name, start_ns, time.perf_counter_ns() - start_ns, args)
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add n to a run counter (e.g. "images", "ocr_calls"); no-op while profiling is off."""
+    if _active_profiler is not None:
+        _active_profiler.count(name, n)
@@ -0,0 +1,78 @@
+# provenance.py
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from includes.store import write_text_atomic
+
+class Provenance(Dict[str, Dict[str, Dict[str, Any]]]):
+    """
+    {iso_name: {bench_key: {"fingerprint": str,
+                            "files": {filename: {"size": int, "mtime_ns": int, "value": str}}}}}
+
+    `changed` is set by set_bench_provenance when a record differs from
+    what was loaded, so an unchanged run does not re-serialize it all.
+    """
+    changed = False
+
+
+def load_provenance(path: str) -> Provenance:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read().strip()
+            return Provenance(json.loads(content)) if content else Provenance()
+    except FileNotFoundError:
+        return Provenance()
+    except json.JSONDecodeError:
+        # Provenance is only an optimization: without it, benches fall
+        # back to the newest-timestamp rule and get re-recorded
+        return Provenance()
+
+
+def save_provenance(path: str, provenance: Provenance) -> bool:
+    """Write the provenance; skipped (returns False) when nothing changed since load."""
+    if isinstance(provenance, Provenance) and not provenance.changed and os.path.exists(path):
+        return False
+    saved = write_text_atomic(path, json.dumps(provenance, indent=1, sort_keys=True))
+    if isinstance(provenance, Provenance):
+        provenance.changed = False
+    return saved
+
+
+def file_signature(path: str) -> Dict[str, int]:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def get_bench_provenance(provenance: Provenance, iso_name: str, bench_key: str) -> Optional[Dict[str, Any]]:
+    return provenance.get(iso_name, {}).get(bench_key)
+
+
+def recorded_values(record: Dict[str, Any]) -> List[str]:
+    """The values of a bench record, in screenshot (file name) order."""
+    return [known["value"] for _, known in sorted(record["files"].items())]
+
+
+def set_bench_provenance(
+    provenance: Provenance,
+    iso_name: str,
+    bench_key: str,
+    fingerprint: str,
+    screenshots: List[str],
+    signatures: Dict[str, Dict[str, int]],
+    values: List[str],
+) -> None:
+    """Record which file produced which value, under the given ROI/parser fingerprint."""
+    record = {
+        "fingerprint": fingerprint,
+        "files": {
+            os.path.basename(path): dict(signatures[path], value=value)
+            for path, value in zip(screenshots, values)
+        },
+    }
+    benches = provenance.setdefault(iso_name, {})
+    if benches.get(bench_key) != record:
+        benches[bench_key] = record
+        if isinstance(provenance, Provenance):
+            provenance.changed = True
@@ -0,0 +1,182 @@
+# records.py
+#
+# Typed benchmark results. The OCR text of a screenshot is parsed exactly
+# once, by its bench's precompiled parser (parse_result), into a frozen
+# record holding the numbers next to the text the JSON keeps. Stats, the
+# JSON fields, the result store and the site export all read the records;
+# records_array turns a batch of them into one contiguous float array.
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+# Passmark subscores in the order of its OCR value ("main cpu 2d 3d memory disk")
+PASSMARK_FIELDS = ("main", "cpu", "2d", "3d", "memory", "disk")
+
+# What Passmark shows for a subscore that was not run
+NOT_AVAILABLE = "N/A"
+
+
+class ResultParseError(ValueError):
+    """A text that is not a valid result of its bench."""
+
+
+@dataclass(frozen=True, slots=True)
+class JetStreamResult:
+    score: float
+    text: str
+
+
+@dataclass(frozen=True, slots=True)
+class SpeedometerResult:
+    score: float
+    text: str
+
+
+@dataclass(frozen=True, slots=True)
+class MotionMarkResult:
+    score: float
+    fps: float
+    percent: float
+    text: str
+
+
+@dataclass(frozen=True, slots=True)
+class PassmarkResult:
+    """The six subscores of one Passmark run, None where it shows N/A."""
+    main: Optional[float]
+    cpu: Optional[float]
+    d2: Optional[float]
+    d3: Optional[float]
+    memory: Optional[float]
+    disk: Optional[float]
+    text: str
+
+    @property
+    def score(self) -> Optional[float]:
+        return self.main
+
+    def fields(self) -> Dict[str, str]:
+        """The entry fields (PASSMARK_FIELDS), as shown."""
+        return dict(zip(PASSMARK_FIELDS, self.text.split(" ")))
+
+
+Result = Union[JetStreamResult, SpeedometerResult, MotionMarkResult, PassmarkResult]
+
+# Numeric fields of each bench's record, in records_array column order
+ARRAY_FIELDS = {
+    "jetstream": ("score",),
+    "speedometer": ("score",),
+    "motionmark": ("score", "fps", "percent"),
+    "passmark": ("main", "cpu", "d2", "d3", "memory", "disk"),
+}
+
+
+# ---------- Parsers (one precompiled pattern per bench) ----------
+
+JETSTREAM_RE = re.compile(r"^([\d.]+)$")
+SPEEDOMETER_RE = re.compile(r"^([\d]+(?:\.\d+)?)$")
+MOTIONMARK_RE = re.compile(r"^([\d.]+)\s+@(\d+)fps\s+([\d.]+)%$")
+PASSMARK_RE = re.compile(r"^([\d\w\s\.\/]+)$")
+
+
+def _match(pattern: "re.Pattern", bench_key: str, text: str) -> "re.Match":
+    match = pattern.match(text)
+    if not match:
+        raise ResultParseError(f"`{text}` is not a {bench_key} result")
+    return match
+
+
+def _float(bench_key: str, text: str, token: str) -> float:
+    try:
+        return float(token)
+    except ValueError:
+        raise ResultParseError(f"`{token}` in `{text}` is not a {bench_key} number") from None
+
+
+def _parse_jetstream(text: str) -> JetStreamResult:
+    match = _match(JETSTREAM_RE, "jetstream", text)
+    return JetStreamResult(_float("jetstream", text, match.group(1)), text)
+
+
+def _parse_speedometer(text: str) -> SpeedometerResult:
+    match = _match(SPEEDOMETER_RE, "speedometer", text)
+    return SpeedometerResult(float(match.group(1)), text)
+
+
+def _parse_motionmark(text: str) -> MotionMarkResult:
+    match = _match(MOTIONMARK_RE, "motionmark", text)
+    score, fps, percent = (_float("motionmark", text, g) for g in match.groups())
+    return MotionMarkResult(score, fps, percent, text)
+
+
+def _parse_passmark(text: str) -> PassmarkResult:
+    _match(PASSMARK_RE, "passmark", text)
+    tokens = text.split(" ")
+    if len(tokens) != len(PASSMARK_FIELDS):
+        raise ResultParseError(f"`{text}` has {len(tokens)} passmark fields, expected {len(PASSMARK_FIELDS)}")
+    subscores = [None if t == NOT_AVAILABLE else _float("passmark", text, t) for t in tokens]
+    return PassmarkResult(*subscores, text)
+
+
+PARSERS: Dict[str, Callable[[str], Result]] = {
+    "jetstream": _parse_jetstream,
+    "speedometer": _parse_speedometer,
+    "motionmark": _parse_motionmark,
+    "passmark": _parse_passmark,
+}
+
+
+def parse_result(bench_key: str, text: str) -> Result:
+    """The record of one screenshot's (fixed-up) OCR text. Raises ResultParseError."""
+    return PARSERS[bench_key](text)
+
+
+def parse_stored(bench_key: str, text: Any) -> Optional[Result]:
+    """parse_result for a value read back from the JSON, provenance or journal: None when invalid."""
+    if not isinstance(text, str):
+        return None
+    try:
+        return PARSERS[bench_key](text)
+    except ResultParseError:
+        return None
+
+
+def passmark_text(bench: Dict[str, Any]) -> str:
+    """The OCR value a Passmark entry was stored from."""
+    return " ".join(str(bench.get(field, "")) for field in PASSMARK_FIELDS)
+
+
+def stored_results(bench_key: str, bench: Any) -> List[Optional[Result]]:
+    """The records of a bench dict of an entry, in value order (None for an invalid value)."""
+    if not isinstance(bench, dict):
+        return []
+    if bench_key == "passmark":
+        return [parse_stored(bench_key, passmark_text(bench))] if bench.get("main") else []
+    return [parse_stored(bench_key, value) for value in bench.get("values") or []]
+
+
+# ---------- Arrays ----------
+
+def records_array(bench_key: str, records: Sequence[Optional[Result]]) -> np.ndarray:
+    """
+    A batch of one bench's records as one contiguous float64 array: shape
+    (n,) for JetStream and Speedometer, (n, fields) for MotionMark (score,
+    fps, percent) and Passmark (ARRAY_FIELDS). None records and N/A
+    subscores are NaN.
+    """
+    fields = ARRAY_FIELDS[bench_key]
+    nan = math.nan
+    flat = np.fromiter(
+        (
+            nan if record is None or (value := getattr(record, field)) is None else value
+            for record in records
+            for field in fields
+        ),
+        dtype=np.float64,
+        count=len(records) * len(fields),
+    )
+    return flat if len(fields) == 1 else flat.reshape(len(records), len(fields))
@@ -0,0 +1,313 @@
+# render.py
+#
+# Static render of the table from the export summary (see
+# includes/export.py): the table body of index.html, spliced in between
+# the ROWS_BEGIN / ROWS_END markers, and the README's table.svg. Each ISO's
+# row fragments are cached under a hash of its row, so a run that changes
+# one ISO re-renders one row.
+# Rebuild with: python -m includes.render
+
+import argparse
+import hashlib
+import html
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from includes.config import EXPORT_DIR, INDEX_PATH, RENDER_CACHE_PATH, TABLE_SVG_PATH
+from includes.export import COLUMNS, METRIC_PHASES, SUMMARY_NAME
+from includes.store import write_text_atomic
+
+# Bump when a template below changes: cached fragments are then dropped
+RENDER_VERSION = 2
+
+ROWS_BEGIN = "<!-- rows:begin (generated by includes/render.py) -->"
+ROWS_END = "<!-- rows:end -->"
+
+# Metric phases shown before the user picks one (metricPhaseByCol in index.html)
+DEFAULT_PHASES = {"motionmark": "avg", "jetstream": "avg", "speedometer": "avg", "passmark": "main"}
+
+# Row class of each known status (index.html styles these); others get none
+STATUS_CLASSES = {"success": "status-success", "warning": "status-warning", "error": "status-error"}
+
+# Benches whose value grids the expanded row shows, with their titles
+GRID_TITLES = (("motionmark", "Motionmark"), ("jetstream", "Jetstream"), ("speedometer", "Speedometer"))
+
+# table.svg: (title, column, metric phase or None)
+SVG_COLUMNS = (
+    ("Status", "status", None),
+    ("ISO Name", "name", None),
+    ("Version", "version", None),
+    ("Avg Benchmark", "benchmark_score", None),
+    ("MotionMark", "motionmark", "avg"),
+    ("JetStream", "jetstream", "avg"),
+    ("Speedometer", "speedometer", "avg"),
+    ("Passmark", "passmark", "main"),
+    ("Used Space", "used_space", None),
+    ("Size", "iso_file_size", None),
+    ("Modified", "iso_file_lastmodified", None),
+)
+SVG_WIDTH = 1200
+SVG_HEADER_HEIGHT = 40
+SVG_ROW_HEIGHT = 32
+
+SVG_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}">
+  <foreignObject x="0" y="0" width="{width}" height="{height}">
+    <body xmlns="http://www.w3.org/1999/xhtml">
+      <style>
+        table {{
+          font-family: Arial, sans-serif;
+          font-size: 16px;
+          border-collapse: collapse;
+          width: 100%;
+        }}
+        th, td {{
+          border: 1px solid #ccc;
+          padding: 6px 10px;
+        }}
+        th {{
+          background: #eee;
+          font-weight: bold;
+        }}
+        .status-success {{
+          background-color: #406c40;
+          color: white;
+        }}
+        .status-warning {{
+          background-color: #736b39;
+          color: white;
+        }}
+        .status-error {{
+          background-color: #6e3c3c;
+          color: white;
+        }}
+      </style>
+      <table>
+        <thead>
+          <tr>
+{header}
+          </tr>
+        </thead>
+        <tbody>
+{rows}
+        </tbody>
+      </table>
+    </body>
+  </foreignObject>
+</svg>
+"""
+
+
+# ---------- Fragments ----------
+
+def cell(value: Any) -> str:
+    """A display value as HTML (the table's safe()): &nbsp; when empty."""
+    return "&nbsp;" if value is None or value == "" else html.escape(str(value))
+
+
+def status_class(status: Any) -> str:
+    return STATUS_CLASSES.get(str(status or "").strip().lower(), "")
+
+
+def row_key(row: List[Any]) -> str:
+    """Content hash of one summary row: its fragments are re-rendered when it changes."""
+    text = json.dumps([RENDER_VERSION, row], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _metric_cell(metric: str, values: List[Any]) -> str:
+    lines = []
+    for (phase, _), value in zip(METRIC_PHASES[metric], values):
+        hidden = "" if phase == DEFAULT_PHASES[metric] else ' style="display: none"'
+        lines.append(f'<div class="metric-row" data-role="{phase}"{hidden}>{cell(value)}</div>')
+    return (
+        f'<span class="bubble-cell">\n'
+        f'                      <div class="metric-stack" data-metric="{metric}">\n'
+        f'                        ' + "\n                        ".join(lines) + "\n"
+        f'                      </div>\n'
+        f'                    </span>'
+    )
+
+
+def row_fragment(row: List[Any]) -> str:
+    """Everything inside one row's <tr> of index.html."""
+    values = dict(zip(COLUMNS, row))
+    cells = []
+    for column in COLUMNS:
+        if column in METRIC_PHASES:
+            cells.append(_metric_cell(column, values[column]))
+        elif column == "status":
+            cells.append(
+                '<span class="bubble-cell">\n'
+                '                      <span class="status-pill">\n'
+                '                        <span class="status-dot"></span>\n'
+                f'                        <span class="status-text">{cell(values[column])}</span>\n'
+                '                      </span>\n'
+                '                    </span>'
+            )
+        else:
+            cells.append(f'<span class="bubble-cell">{cell(values[column])}</span>')
+    grids = "\n".join(
+        '                      <div class="child-col">\n'
+        f'                        <div class="child-col-heading">&nbsp;&nbsp;{title} Data&nbsp;&nbsp;</div>\n'
+        f'                        <div class="child-col-grid" data-metric="{metric}"></div>\n'
+        '                      </div>'
+        for metric, title in GRID_TITLES
+    )
+    return (
+        '<td colspan="13">\n'
+        f'                <div class="bubble-row {status_class(values["status"])}">\n'
+        '                  <div class="bubble-main">\n'
+        '                    ' + "\n                    ".join(cells) + "\n"
+        '                  </div>\n'
+        '                  <div class="bubble-extra">\n'
+        '                    <div class="child-columns">\n'
+        f'{grids}\n'
+        '                    </div>\n'
+        '                  </div>\n'
+        '                </div>\n'
+        '              </td>'
+    )
+
+
+def svg_fragment(row: List[Any]) -> str:
+    """One <tr> of table.svg."""
+    values = dict(zip(COLUMNS, row))
+    cells = []
+    for _, column, phase in SVG_COLUMNS:
+        value = values[column]
+        if phase is not None:
+            value = value[[p for p, _ in METRIC_PHASES[column]].index(phase)]
+        css = status_class(value) if column == "status" else ""
+        cells.append(f'<td class="{css}">{cell(value)}</td>' if css else f"<td>{cell(value)}</td>")
+    return "          <tr>\n" + "".join(f"            {c}\n" for c in cells) + "          </tr>"
+
+
+# ---------- Cache ----------
+
+# row key -> (index.html fragment, table.svg fragment)
+Fragments = Dict[str, Tuple[str, str]]
+
+
+def load_fragments(path: str) -> Fragments:
+    """Cached fragments of the last render; empty when missing, unreadable or stale."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(doc, dict) or doc.get("version") != RENDER_VERSION:
+        return {}
+    return {key: tuple(item) for key, item in (doc.get("rows") or {}).items()}
+
+
+def save_fragments(path: str, fragments: Fragments) -> bool:
+    doc = {"version": RENDER_VERSION, "rows": {key: list(item) for key, item in fragments.items()}}
+    return write_text_atomic(path, json.dumps(doc, ensure_ascii=False, separators=(",", ":")))
+
+
+# ---------- Pages ----------
+
+def sort_ranks(summary: Dict[str, Any]) -> Tuple[List[str], List[List[int]]]:
+    """
+    The sort slots and, per row, its rank in every slot's ascending order:
+    what the rows' data-sort attributes hold, so a header click sorts on
+    plain integers.
+    """
+    slots = list(summary["order"])
+    ranks = [[0] * len(slots) for _ in summary["rows"]]
+    for s, slot in enumerate(slots):
+        for rank, index in enumerate(summary["order"][slot]):
+            ranks[index][s] = rank
+    return slots, ranks
+
+
+def splice_rows(page: str, rows_html: str) -> str:
+    """page with everything between the row markers replaced by rows_html."""
+    begin = page.find(ROWS_BEGIN)
+    end = page.find(ROWS_END, begin + 1)
+    if begin < 0 or end < 0:
+        raise ValueError(f"Row markers not found, expected `{ROWS_BEGIN}` ... `{ROWS_END}`")
+    indent = page[page.rfind("\n", 0, end) + 1:end]
+    return page[:begin + len(ROWS_BEGIN)] + "\n" + rows_html + "\n" + indent + page[end:]
+
+
+def render_site(
+    summary_path: str = os.path.join(EXPORT_DIR, SUMMARY_NAME),
+    index_path: str = INDEX_PATH,
+    svg_path: Optional[str] = TABLE_SVG_PATH,
+    cache_path: str = RENDER_CACHE_PATH,
+) -> Dict[str, int]:
+    """
+    Render the summary's rows into index_path and svg_path (skipped when
+    None). Only rows whose content changed since the cached render are
+    rendered again. Returns what was rendered / written.
+    """
+    with open(summary_path, "r", encoding="utf-8") as f:
+        summary = json.load(f)
+    cached = load_fragments(cache_path)
+    fragments: Fragments = {}
+    keys = [row_key(row) for row in summary["rows"]]
+    rendered = 0
+    for row, key in zip(summary["rows"], keys):
+        if key in fragments:
+            continue
+        item = cached.get(key)
+        if item is None:
+            item = (row_fragment(row), svg_fragment(row))
+            rendered += 1
+        fragments[key] = item
+
+    slots, ranks = sort_ranks(summary)
+    trs = [f'          <tbody id="benchmarks-table" data-sort-slots="{" ".join(slots)}">']
+    for index, (key, detail, row_ranks) in enumerate(zip(keys, summary["details"], ranks)):
+        fragment = fragments[key][0]
+        trs.append(
+            f'            <tr class="parent-row row-band-{index % 3 + 1}" data-detail="{html.escape(detail)}" '
+            f'data-sort="{" ".join(map(str, row_ranks))}">\n'
+            f'              {fragment}\n'
+            '            </tr>'
+        )
+    trs.append("          </tbody>")
+    with open(index_path, "r", encoding="utf-8") as f:
+        page = f.read()
+    index_written = write_text_atomic(index_path, splice_rows(page, "\n".join(trs)))
+
+    svg_written = False
+    if svg_path:
+        header = "\n".join(f"            <th>{html.escape(title)}</th>" for title, _, _ in SVG_COLUMNS)
+        svg_rows = [fragments[key][1] for key in keys]
+        svg = SVG_TEMPLATE.format(
+            width=SVG_WIDTH,
+            height=SVG_HEADER_HEIGHT + SVG_ROW_HEIGHT * len(svg_rows),
+            header=header,
+            rows="\n".join(svg_rows),
+        )
+        svg_written = write_text_atomic(svg_path, svg)
+
+    if fragments != cached:
+        save_fragments(cache_path, fragments)
+    return {"rows_rendered": rendered, "index_written": int(index_written), "svg_written": int(svg_written)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the index.html rows and table.svg from the data export.")
+    parser.add_argument('--summary', default=os.path.join(EXPORT_DIR, SUMMARY_NAME), help='Export summary to render.')
+    parser.add_argument('--index', default=INDEX_PATH, help='Page whose row markers are filled in.')
+    parser.add_argument('--svg', default=TABLE_SVG_PATH, help='README table image ("" to skip).')
+    parser.add_argument('--full', action='store_true', help='Ignore cached rows and render every row.')
+    args = parser.parse_args()
+
+    if args.full and os.path.exists(RENDER_CACHE_PATH):
+        os.remove(RENDER_CACHE_PATH)
+    result = render_site(args.summary, args.index, args.svg or None)
+    print(
+        f"{result['rows_rendered']} row(s) rendered; "
+        f"{args.index} {'written' if result['index_written'] else 'unchanged'}"
+        + (f", {args.svg} {'written' if result['svg_written'] else 'unchanged'}" if args.svg else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# roi.py
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from includes.frame import Frame, polygon_mask
+
+ROI_TYPES = ("rectangle", "hexagon")
+
+
+def _int_pair(value: Any, where: str) -> Tuple[int, int]:
+    if (
+        not isinstance(value, (tuple, list)) or len(value) != 2
+        or not all(isinstance(v, int) and not isinstance(v, bool) for v in value)
+    ):
+        raise ValueError(f"{where}: expected an (x, y) pair of ints, got {value!r}")
+    return int(value[0]), int(value[1])
+
+
+class CompiledRoi:
+    """
+    One validated ROI, ready to be cut out of a Frame.
+
+    Rectangles keep their box; hexagons (any polygon) are rasterized once
+    into a mask over their own bounds, so cropping at an offset is just a
+    translation of `origin`. Equality and hashing use the spec, not the mask.
+    """
+
+    __slots__ = ("kind", "box", "points", "threshold", "origin", "mask")
+
+    def __init__(
+        self,
+        kind: str,
+        box: Optional[Tuple[int, int, int, int]] = None,
+        points: Optional[Tuple[Tuple[int, int], ...]] = None,
+        threshold: Optional[int] = None,
+    ) -> None:
+        self.kind = kind
+        self.box = box
+        self.points = points
+        self.threshold = threshold
+        self.origin: Optional[Tuple[int, int]] = None
+        self.mask: Optional[np.ndarray] = None
+        if kind == "hexagon":
+            self.origin, self.mask = polygon_mask(points)
+
+    @classmethod
+    def compile(cls, spec: Dict[str, Any], threshold: Optional[int] = None, where: str = "ROI") -> "CompiledRoi":
+        """
+        Validate one roi_configurations entry and compile it. `threshold`
+        applies to rectangles only, as in the original MotionMark script.
+        """
+        if not isinstance(spec, dict):
+            raise ValueError(f"{where}: expected a dict, got {spec!r}")
+        kind = spec.get("type")
+        if kind == "rectangle":
+            box = spec.get("box")
+            if not isinstance(box, (tuple, list)) or len(box) != 4:
+                raise ValueError(f"{where}: rectangle needs a box (x1, y1, x2, y2), got {box!r}")
+            x1, y1 = _int_pair(box[:2], where)
+            x2, y2 = _int_pair(box[2:], where)
+            if not (0 <= x1 < x2 and 0 <= y1 < y2):
+                raise ValueError(f"{where}: empty or negative box {tuple(box)}")
+            return cls("rectangle", box=(x1, y1, x2, y2), threshold=threshold)
+        if kind == "hexagon":
+            points = spec.get("points")
+            if not isinstance(points, (tuple, list)) or len(points) < 3:
+                raise ValueError(f"{where}: hexagon needs at least 3 points, got {points!r}")
+            points = tuple(_int_pair(p, where) for p in points)
+            if min(x for x, _ in points) < 0 or min(y for _, y in points) < 0:
+                raise ValueError(f"{where}: negative hexagon point in {points}")
+            return cls("hexagon", points=points)
+        raise ValueError(f"{where}: unknown ROI type {kind!r} (expected one of {ROI_TYPES})")
+
+    def key(self) -> Tuple:
+        return (self.kind, self.box, self.points, self.threshold)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, CompiledRoi) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    def __repr__(self) -> str:
+        if self.kind == "rectangle":
+            return f"CompiledRoi(rectangle, box={self.box}, threshold={self.threshold})"
+        return f"CompiledRoi(hexagon, points={self.points})"
+
+    def spec(self) -> Dict[str, Any]:
+        """The roi_configurations entry this was compiled from."""
+        if self.kind == "rectangle":
+            return {"type": "rectangle", "box": self.box}
+        return {"type": "hexagon", "points": self.points}
+
+    def crop(self, frame: Frame, offsets: Sequence[int] = (0, 0)) -> np.ndarray:
+        """Cut this ROI out of `frame`, translated by offsets (x, y)."""
+        dx, dy = offsets
+        if self.kind == "rectangle":
+            x1, y1, x2, y2 = self.box
+            box = (x1 + dx, y1 + dy, x2 + dx, y2 + dy)
+            if self.threshold is not None:
+                return frame.crop_threshold(box, self.threshold)
+            return frame.crop(box)
+        ox, oy = self.origin
+        return frame.crop_with_mask(self.mask, (ox + dx, oy + dy))
+
+
+class RoiPlan:
+    """
+    A folder's compiled ROI list plus its threshold settings: everything
+    process_image needs to turn a Frame into OCR crops. Immutable and
+    hashable; fingerprint() is stable across runs.
+    """
+
+    __slots__ = ("rois", "use_threshold_rectangles", "threshold")
+
+    def __init__(self, rois: Tuple[CompiledRoi, ...], use_threshold_rectangles: bool, threshold: int) -> None:
+        self.rois = rois
+        self.use_threshold_rectangles = use_threshold_rectangles
+        self.threshold = threshold
+
+    @classmethod
+    def compile(
+        cls,
+        roi_list: List[Dict[str, Any]],
+        use_threshold_rectangles: bool,
+        threshold: int,
+        where: str = "ROI list",
+    ) -> "RoiPlan":
+        if not isinstance(roi_list, (list, tuple)) or not roi_list:
+            raise ValueError(f"{where}: expected a non-empty list of ROIs, got {roi_list!r}")
+        if not isinstance(threshold, int) or not 0 <= threshold <= 255:
+            raise ValueError(f"{where}: threshold must be an int in 0..255, got {threshold!r}")
+        rect_threshold = threshold if use_threshold_rectangles else None
+        rois = tuple(
+            CompiledRoi.compile(spec, rect_threshold, where=f"{where}, ROI {idx}")
+            for idx, spec in enumerate(roi_list, start=1)
+        )
+        return cls(rois, bool(use_threshold_rectangles), threshold)
+
+    def key(self) -> Tuple:
+        return (self.rois, self.use_threshold_rectangles, self.threshold)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, RoiPlan) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    def __len__(self) -> int:
+        return len(self.rois)
+
+    def __iter__(self):
+        return iter(self.rois)
+
+    def __repr__(self) -> str:
+        return f"RoiPlan({len(self.rois)} ROIs, threshold_rectangles={self.use_threshold_rectangles})"
+
+    def settings(self) -> str:
+        """Preprocessing settings string, part of the OCR cache key."""
+        return f"threshold_rectangles={self.use_threshold_rectangles};threshold={self.threshold}"
+
+    def fingerprint(self, **extra: Any) -> str:
+        """
+        sha1 of the ROI specs and threshold settings (plus `extra`, e.g. a
+        parser version): changes exactly when the crops would.
+        """
+        payload = json.dumps(dict(
+            extra,
+            rois=[roi.spec() for roi in self.rois],
+            use_threshold_rectangles=self.use_threshold_rectangles,
+            threshold=self.threshold,
+        ), sort_keys=True)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def compile_roi_plans(
+    screenshot_settings: Dict[str, Dict[str, Any]],
+    threshold: int,
+) -> Dict[str, Dict[str, RoiPlan]]:
+    """
+    Compile every folder's ROI list of every screenshot type up front:
+    {screenshot_folder: {iso_folder or 'default': RoiPlan}}.
+    Raises ValueError on the first bad entry, naming where it is.
+    """
+    plans = {}
+    for subfolder, settings in screenshot_settings.items():
+        roi_configurations = settings["roi_configurations"]
+        if "default" not in roi_configurations:
+            raise ValueError(f"{subfolder}: roi_configurations has no 'default' entry")
+        plans[subfolder] = {
+            folder_name: RoiPlan.compile(
+                roi_list,
+                settings["use_threshold_rectangles"],
+                threshold,
+                where=f"{subfolder} / {folder_name}",
+            )
+            for folder_name, roi_list in roi_configurations.items()
+        }
+    return plans
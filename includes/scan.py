@@ -0,0 +1,210 @@
+# scan.py
+
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from includes.config import ROOT_DIR, BENCH_CONFIG
+from includes.store import write_text_atomic
+from includes.utils import latest_timestamp_name
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# {iso_name: {bench_key: [screenshot paths, sorted by filename]}}
+ScreenshotIndex = Dict[str, Dict[str, List[str]]]
+
+SUBFOLDER_BY_BENCH = {bench_key: subfolder for subfolder, bench_key in BENCH_CONFIG.items()}
+
+MANIFEST_VERSION = 1
+
+# A folder modified this recently may still get files within the same
+# mtime tick, so it is not recorded as clean yet
+MANIFEST_SETTLE_NS = 2 * 10**9
+
+
+def scan_root(root_dir: str = ROOT_DIR, manifest: Optional["ScanManifest"] = None) -> ScreenshotIndex:
+    """
+    Walk root_dir once and build the ISO -> bench -> screenshot index.
+
+    Every ISO folder gets an entry (possibly empty), so callers can still
+    create JSON entries for ISOs that have no screenshots yet. Only the
+    Screenshots_* folders listed in BENCH_CONFIG are looked at. With a
+    manifest, folders it records as clean and unchanged are left out of
+    the index (see ScanManifest).
+    """
+    index: ScreenshotIndex = {}
+    if not os.path.isdir(root_dir):
+        return index
+
+    with os.scandir(root_dir) as iso_entries:
+        iso_dirs = sorted(
+            (e for e in iso_entries if e.is_dir()), key=lambda e: e.name
+        )
+
+    for iso_entry in iso_dirs:
+        if manifest is not None:
+            index[iso_entry.name] = manifest.scan_iso(iso_entry)
+            continue
+        benches: Dict[str, List[str]] = {}
+        with os.scandir(iso_entry.path) as sub_entries:
+            for sub in sub_entries:
+                bench_key = BENCH_CONFIG.get(sub.name)
+                if bench_key is None or not sub.is_dir():
+                    continue
+                benches[bench_key] = _list_screenshots(sub.path)
+        index[iso_entry.name] = benches
+
+    return index
+
+
+def _list_screenshots(folder: str) -> List[str]:
+    with os.scandir(folder) as entries:
+        names = sorted(
+            e.name for e in entries
+            if e.name.lower().endswith(IMAGE_EXTENSIONS) and e.is_file()
+        )
+    return [os.path.join(folder, name) for name in names]
+
+
+def get_screenshots(index: ScreenshotIndex, iso_name: str, bench_key: str) -> Optional[List[str]]:
+    """
+    O(1) lookup of the screenshots for one (ISO, bench) pair.
+    Returns None if the ISO or its Screenshots_* folder does not exist.
+    """
+    return index.get(iso_name, {}).get(bench_key)
+
+
+def scan_bench(root_dir: str, iso_name: str, bench_key: str) -> Optional[List[str]]:
+    """
+    List one (ISO, bench) folder, for refreshing a single index entry.
+    Returns None if the folder does not exist.
+    """
+    for subfolder, key in BENCH_CONFIG.items():
+        if key == bench_key:
+            folder = os.path.join(root_dir, iso_name, subfolder)
+            try:
+                return _list_screenshots(folder)
+            except (FileNotFoundError, NotADirectoryError):
+                return None
+    return None
+
+
+# ---------- Scan manifest ----------
+
+class ScanManifest:
+    """
+    Sidecar of the last run's scan: per ISO folder its mtime and bench
+    folders, per bench folder its mtime, latest timestamp and file count.
+
+    A bench folder whose mtime still matches is skipped with one stat: not
+    listed, and left out of the index, so nothing downstream looks at it.
+    Adding, removing or renaming a screenshot changes the folder's mtime;
+    overwriting one in place does not (run with --full-scan for that).
+
+    The manifest is only trusted for the JSON file and ROI/parser config
+    it was saved with; otherwise every folder is listed. Benches that
+    failed are saved without an mtime, so they are listed again next run.
+    """
+
+    def __init__(self, isos: Optional[Dict[str, Any]] = None, key: str = "") -> None:
+        self.isos: Dict[str, Any] = isos or {}
+        self.key = key
+        # Filled by scan_iso(): this scan's view, and the pairs it skipped
+        self.observed: Dict[str, Any] = {}
+        self.skipped: Set[Tuple[str, str]] = set()
+
+    @classmethod
+    def load(cls, path: str, key: str) -> "ScanManifest":
+        """
+        The manifest at `path` if it was saved under the same `key` (see
+        manifest_key), else an empty one.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(key=key)
+        if data.get("version") != MANIFEST_VERSION or data.get("key") != key:
+            return cls(key=key)
+        return cls(data.get("isos") or {}, key=key)
+
+    def scan_iso(self, iso_entry: os.DirEntry) -> Dict[str, List[str]]:
+        """List the changed bench folders of one ISO folder."""
+        name = iso_entry.name
+        known = self.isos.get(name) or {}
+        known_benches = known.get("benches") or {}
+        iso_mtime = iso_entry.stat().st_mtime_ns
+
+        if known.get("mtime_ns") == iso_mtime:
+            # Same Screenshots_* folders as last time
+            folders = [
+                (bench_key, os.path.join(iso_entry.path, SUBFOLDER_BY_BENCH[bench_key]))
+                for bench_key in known_benches if bench_key in SUBFOLDER_BY_BENCH
+            ]
+        else:
+            with os.scandir(iso_entry.path) as sub_entries:
+                folders = [
+                    (BENCH_CONFIG[sub.name], sub.path) for sub in sub_entries
+                    if sub.name in BENCH_CONFIG and sub.is_dir()
+                ]
+
+        benches: Dict[str, List[str]] = {}
+        observed: Dict[str, Any] = {}
+        for bench_key, folder in folders:
+            try:
+                mtime = os.stat(folder).st_mtime_ns
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            old = known_benches.get(bench_key) or {}
+            if old.get("mtime_ns") == mtime:
+                self.skipped.add((name, bench_key))
+                observed[bench_key] = old
+                continue
+            # mtime taken before listing: a file added meanwhile changes it again
+            paths = _list_screenshots(folder)
+            benches[bench_key] = paths
+            observed[bench_key] = {
+                "mtime_ns": mtime,
+                "latest": latest_timestamp_name(paths) or "",
+                "count": len(paths),
+            }
+        self.observed[name] = {"mtime_ns": iso_mtime, "benches": observed}
+        return benches
+
+    def save(self, path: str, failed: Iterable[Tuple[str, str]] = (), key: Optional[str] = None) -> None:
+        """
+        Record this scan's folders. Failed pairs and folders modified in
+        the last MANIFEST_SETTLE_NS keep no mtime, so they are listed again.
+        """
+        settled_before = time.time_ns() - MANIFEST_SETTLE_NS
+        for iso_name, bench_key in failed:
+            bench = self.observed.get(iso_name, {}).get("benches", {}).get(bench_key)
+            if bench is not None:
+                bench["mtime_ns"] = None
+        for iso in self.observed.values():
+            if iso["mtime_ns"] is not None and iso["mtime_ns"] > settled_before:
+                iso["mtime_ns"] = None
+            for bench in iso["benches"].values():
+                if bench["mtime_ns"] is not None and bench["mtime_ns"] > settled_before:
+                    bench["mtime_ns"] = None
+        self.isos = self.observed
+        if key is not None:
+            self.key = key
+        write_text_atomic(path, json.dumps(
+            {"version": MANIFEST_VERSION, "key": self.key, "isos": self.isos},
+            sort_keys=True, separators=(",", ":"),
+        ))
+
+
+def manifest_key(json_path: str, config_fingerprint: str) -> str:
+    """
+    What a manifest is only valid for: the JSON file as this tool last
+    wrote it (size and mtime) and the ROI/parser configuration.
+    """
+    try:
+        st = os.stat(json_path)
+        json_sig = f"{st.st_size}:{st.st_mtime_ns}"
+    except FileNotFoundError:
+        json_sig = "missing"
+    return f"{json_sig}|{config_fingerprint}"
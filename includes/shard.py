@@ -0,0 +1,180 @@
+# shard.py
+#
+# Multi-machine ingestion. `main.py --shard i/N` OCRs only the (ISO,
+# bench) units that shard_of() assigns to shard i (a stable hash, so every
+# host agrees without coordination) and writes them to a partial results
+# file. `main.py --merge PARTIAL...` combines partials into the benchmark
+# JSON: per bench the result with the newest "latest" wins, the stats are
+# recomputed once afterwards.
+#
+# A shard's own results carry the screenshots behind them ("files"): a
+# recomputed result replaces a stored one with the same "latest" (removed
+# screenshots, a ROI change), a copied-through one does not. Between
+# partials the order is total (unit_key), so merging is idempotent and
+# does not depend on the order of the partials.
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from includes.journal import Failure
+from includes.records import PASSMARK_FIELDS, stored_results
+from includes.store import IsoStore, get_bench_dict, write_text_atomic
+
+PARTIAL_VERSION = 1
+
+# A bench's result: "latest" plus "values", or the Passmark fields
+BenchResult = Dict[str, Any]
+
+
+# ---------- Assignment ----------
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """"i/N" -> (i, N), with shards numbered 1..N."""
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N (e.g. 2/3), got `{text}`") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard {text}: expected 1 <= i <= N")
+    return index, count
+
+
+def shard_of(iso_name: str, bench_key: str, count: int) -> int:
+    """The shard (1..count) of an (ISO, bench) unit: the same on every host and run."""
+    digest = hashlib.sha1(f"{iso_name}\0{bench_key}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def in_shard(iso_name: str, bench_key: str, shard: Optional[Tuple[int, int]]) -> bool:
+    """True for every unit when shard is None (no sharding)."""
+    return shard is None or shard_of(iso_name, bench_key, shard[1]) == shard[0]
+
+
+# ---------- Partial results ----------
+
+def bench_result(bench_key: str, bench: Any) -> Optional[BenchResult]:
+    """The result fields of an entry's bench dict; None when it has none yet."""
+    if not isinstance(bench, dict) or not bench.get("latest"):
+        return None
+    keys = ("latest",) + (PASSMARK_FIELDS if bench_key == "passmark" else ("values",))
+    return {key: bench.get(key, [] if key == "values" else "") for key in keys}
+
+
+def write_partial(
+    path: str,
+    store: IsoStore,
+    units: Iterable[Tuple[str, str]],
+    shard: Tuple[int, int],
+    failures: List[Failure],
+) -> int:
+    """
+    Write the results of a shard's (ISO, bench) units, as they are in
+    `store` after its run, with the screenshots behind the values that
+    were recomputed. Returns the units written.
+    """
+    written = []
+    for iso_name, bench_key in sorted(set(units)):
+        result = bench_result(bench_key, (store.get(iso_name) or {}).get(bench_key))
+        if result is None:
+            continue
+        unit = {"iso": iso_name, "bench": bench_key, "result": result}
+        files = store.result_files.get((iso_name, bench_key))
+        if files is not None:
+            unit["files"] = files
+        written.append(unit)
+    doc = {
+        "version": PARTIAL_VERSION,
+        "shard": f"{shard[0]}/{shard[1]}",
+        "units": written,
+        "failures": sorted(failures, key=lambda f: (f["iso"], f["bench"], f["file"] or "")),
+    }
+    write_text_atomic(path, json.dumps(doc, ensure_ascii=False, indent=1))
+    return len(written)
+
+
+def load_partial(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            doc = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path} is not a partial results file ({e})") from e
+    if not isinstance(doc, dict) or doc.get("version") != PARTIAL_VERSION:
+        raise ValueError(f"{path} is not a version {PARTIAL_VERSION} partial results file")
+    return doc
+
+
+# ---------- Merge ----------
+
+def merge_key(result: BenchResult) -> Tuple[str, str]:
+    """Newest "latest" first; equal timestamps are ordered by content, so any merge order agrees."""
+    return result["latest"], json.dumps(result, ensure_ascii=False, sort_keys=True)
+
+
+def unit_key(unit: Dict[str, Any]) -> Tuple[str, bool, str, str]:
+    """
+    Order of the partials' units of one bench: newest "latest", then the
+    ones that were recomputed (they carry "files"), then by content.
+    """
+    result = unit["result"]
+    return (
+        result["latest"],
+        "files" in unit,
+        json.dumps(result, ensure_ascii=False, sort_keys=True),
+        json.dumps(unit.get("files") or []),
+    )
+
+
+def supersedes(unit: Dict[str, Any], current: Optional[BenchResult]) -> bool:
+    """
+    Whether a partial's unit replaces the stored result: when it is newer,
+    or as new and recomputed by its shard (screenshots removed or replaced,
+    a ROI/parser change) with a different result.
+    """
+    result = unit["result"]
+    if current is None or result["latest"] > current["latest"]:
+        return True
+    if result["latest"] < current["latest"]:
+        return False
+    return "files" in unit and merge_key(result) != merge_key(current)
+
+
+def merge_partials(store: IsoStore, partials: List[Dict[str, Any]]) -> Tuple[int, List[Failure]]:
+    """
+    Merge partial results into `store`: each bench takes the best of the
+    partials' results (see unit_key) when it supersedes the stored one.
+    Changed benches are marked dirty, for refresh_stats. Every ISO a
+    partial covers has its error status cleared, as a normal run's update
+    would; the partials' failures mark it again. Returns (benches changed,
+    the partials' failures, for mark_failed_benches).
+    """
+    candidates: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    failures: List[Failure] = []
+    for partial in partials:
+        for unit in partial.get("units") or []:
+            candidates.setdefault((unit["iso"], unit["bench"]), []).append(unit)
+        failures.extend(partial.get("failures") or [])
+
+    changed = 0
+    # Sorted, so ISOs new to the store are appended in the same order whatever the partials' order
+    for iso_name, bench_key in sorted(candidates):
+        best = max(candidates[(iso_name, bench_key)], key=unit_key)
+        entry = store.get_or_create(iso_name)
+        if entry.get("status"):
+            entry["status"] = ""
+            store.mark_dirty(iso_name)
+        if not supersedes(best, bench_result(bench_key, entry.get(bench_key))):
+            continue
+        bench = get_bench_dict(entry, bench_key)
+        bench.update(best["result"])
+        store.mark_dirty(iso_name, bench_key)
+        store.set_results(iso_name, bench_key, stored_results(bench_key, bench))
+        if "files" in best:
+            store.set_result_files(iso_name, bench_key, best["files"])
+        changed += 1
+
+    # One failure per (ISO, bench, file), the same one whatever the order
+    unique: Dict[Tuple[str, str, str], Failure] = {}
+    for failure in sorted(failures, key=lambda f: (f["iso"], f["bench"], f["file"] or "", f["error"])):
+        unique.setdefault((failure["iso"], failure["bench"], failure["file"] or ""), failure)
+    return changed, list(unique.values())
@@ -0,0 +1,190 @@
+# stats.py
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from includes.records import Result, records_array
+from includes.store import IsoStore, get_bench_dict
+
+# Benches with a "values" list and average/highest/lowest fields
+STAT_BENCHES = ("motionmark", "jetstream", "speedometer")
+
+# Values carry at most a few decimals: means are summed as integers in
+# millionths, so the average of the decimal strings is rounded only once
+# (a float pairwise sum would flip e.g. "163.304" to "163.305")
+MEAN_SCALE = 1_000_000
+
+# Share of values cut from each end for the trimmed mean
+TRIM_FRACTION = 0.1
+
+# benchmark_avg, the table's Avg Benchmark: each (bench, field) min-max
+# scaled to 0-100 across ISOs (0 when missing, 100 when all ISOs are
+# equal), then weighted
+SCORE_WEIGHTS = (
+    ("passmark", "main", 0.40),
+    ("motionmark", "average", 0.20),
+    ("jetstream", "average", 0.20),
+    ("speedometer", "average", 0.20),
+)
+
+
+# ---------- Batch statistics ----------
+
+def _pad_rows(rows: List[np.ndarray]) -> np.ndarray:
+    """Stack 1-D arrays of different lengths into a NaN-padded 2-D array."""
+    width = max((len(r) for r in rows), default=0)
+    out = np.full((len(rows), width), np.nan)
+    for i, r in enumerate(rows):
+        out[i, :len(r)] = r
+    return out
+
+
+def exact_mean(matrix: np.ndarray, axis: int) -> np.ndarray:
+    """NaN-skipping mean along `axis`, summed exactly in MEAN_SCALE units."""
+    valid = ~np.isnan(matrix)
+    units = np.rint(np.where(valid, matrix, 0.0) * MEAN_SCALE).astype(np.int64)
+    count = np.count_nonzero(valid, axis=axis)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return units.sum(axis=axis) / (count * MEAN_SCALE)
+
+
+def batch_stats(matrix: np.ndarray, trim: float = TRIM_FRACTION) -> Dict[str, np.ndarray]:
+    """
+    Statistics per row of a NaN-padded (n_isos, n_values) matrix, all rows
+    at once: count, mean, median, stddev (population), min, max and the
+    mean with `trim` of the values cut from each end.
+    """
+    n_rows = matrix.shape[0]
+    count = np.count_nonzero(~np.isnan(matrix), axis=1)
+    stats = {"count": count}
+    names = ("mean", "median", "stddev", "min", "max", "trimmed_mean")
+    if not matrix.size:
+        stats.update({name: np.full(n_rows, np.nan) for name in names})
+        return stats
+
+    has = count > 0
+    # Rows without any value are zero-filled so the nan* reductions stay quiet
+    safe = np.where(has[:, None], matrix, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stats["mean"] = np.where(has, exact_mean(matrix, axis=1), np.nan)
+        stats["median"] = np.where(has, np.nanmedian(safe, axis=1), np.nan)
+        stats["stddev"] = np.where(has, np.nanstd(safe, axis=1), np.nan)
+        stats["min"] = np.where(has, np.nanmin(safe, axis=1), np.nan)
+        stats["max"] = np.where(has, np.nanmax(safe, axis=1), np.nan)
+
+        # Trimmed mean: sort (NaNs go last), keep positions [k, count - k)
+        ordered = np.sort(matrix, axis=1)
+        k = np.floor(count * trim).astype(int)
+        pos = np.arange(matrix.shape[1])[None, :]
+        keep = (pos >= k[:, None]) & (pos < (count - k)[:, None])
+        kept = np.where(keep, ordered, 0.0).sum(axis=1)
+        stats["trimmed_mean"] = np.where(has, kept / np.maximum(count - 2 * k, 1), np.nan)
+    return stats
+
+
+def compute_bench_stats(bench_key: str, result_lists: List[List[Optional[Result]]]) -> Dict[str, Any]:
+    """
+    Summarize one bench type for many ISOs in one batch, from their result
+    records (None, an unparsable value, counts as missing). For MotionMark
+    the statistics are over the score, and "rows" keeps the (score, fps,
+    percent) arrays for formatting.
+    """
+    parsed = [records_array(bench_key, results) for results in result_lists]
+    if bench_key == "motionmark":
+        stats = batch_stats(_pad_rows([p[:, 0] for p in parsed]))
+    else:
+        stats = batch_stats(_pad_rows(parsed))
+    stats["rows"] = parsed
+    return stats
+
+
+# ---------- Formatting into the JSON fields ----------
+
+def _format_motionmark(row: np.ndarray) -> str:
+    score, fps, percent = row
+    return f"{score:.3f} @{fps:.0f}fps {percent:.2f}%"
+
+
+def format_bench_fields(bench_key: str, stats: Dict[str, Any], i: int) -> Dict[str, str]:
+    """average / highest / lowest strings for row i, in the existing formats."""
+    if bench_key == "motionmark":
+        rows = stats["rows"][i]
+        valid = rows[~np.isnan(rows).any(axis=1)]
+        if not len(valid):
+            return {"average": "0.000 @0fps 0.00%", "highest": "", "lowest": ""}
+        # Pick the highest / lowest by score, not by comparing the strings
+        return {
+            "average": _format_motionmark(exact_mean(valid, axis=0)),
+            "highest": _format_motionmark(valid[np.argmax(valid[:, 0])]),
+            "lowest": _format_motionmark(valid[np.argmin(valid[:, 0])]),
+        }
+
+    if not stats["count"][i]:
+        return {"average": "", "highest": "", "lowest": ""}
+    fmt = "{:.2f}" if bench_key == "speedometer" else "{:.3f}"
+    return {
+        "average": fmt.format(stats["mean"][i]),
+        "highest": fmt.format(stats["max"][i]),
+        "lowest": fmt.format(stats["min"][i]),
+    }
+
+
+def leading_number(text: Any) -> float:
+    """First number of a field like "163.304" or "385.313 @60fps 43.59%"."""
+    match = re.match(r"\s*(-?\d+(?:\.\d+)?)", str(text or ""))
+    return float(match.group(1)) if match else np.nan
+
+
+def composite_scores(fields: np.ndarray) -> np.ndarray:
+    """
+    benchmark_avg (0-100) for an (n_isos, len(SCORE_WEIGHTS)) matrix of
+    the SCORE_WEIGHTS fields: each column min-max scaled across ISOs (100
+    when all ISOs are equal), a missing (NaN) field counting 0, then
+    weighted.
+    """
+    weights = np.array([weight for _, _, weight in SCORE_WEIGHTS])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lo = np.min(np.where(np.isnan(fields), np.inf, fields), axis=0, initial=np.inf)
+        hi = np.max(np.where(np.isnan(fields), -np.inf, fields), axis=0, initial=-np.inf)
+        span = hi - lo
+        scaled = np.where(span > 0, (fields - lo) / np.where(span > 0, span, 1) * 100, 100.0)
+        scaled = np.where(np.isnan(fields), 0.0, scaled)
+    return scaled @ weights
+
+
+# ---------- Store refresh ----------
+
+def refresh_stats(store: IsoStore) -> List[Tuple[str, str]]:
+    """
+    Recompute average / highest / lowest for the benches marked dirty in
+    the store (one batch per bench type), then the composite benchmark_avg
+    for every entry, since it is normalized across ISOs. Entries whose
+    benchmark_avg changes are marked dirty. Returns the (iso, bench) pairs
+    whose fields were recomputed.
+    """
+    recomputed = []
+    for bench_key in STAT_BENCHES:
+        names = [name for name in store.dirty if bench_key in store.dirty_benches(name)]
+        if not names:
+            continue
+        benches = [get_bench_dict(store.get(name), bench_key) for name in names]
+        stats = compute_bench_stats(bench_key, [store.bench_results(name, bench_key) for name in names])
+        for i, (name, bench) in enumerate(zip(names, benches)):
+            if not bench.get("values"):
+                continue
+            bench.update(format_bench_fields(bench_key, stats, i))
+            recomputed.append((name, bench_key))
+
+    fields = np.array([
+        [leading_number((entry.get(bench) or {}).get(field)) for bench, field, _ in SCORE_WEIGHTS]
+        for entry in store.entries
+    ]).reshape(len(store.entries), len(SCORE_WEIGHTS))
+    scores = composite_scores(fields)
+    for entry, score in zip(store.entries, scores):
+        value = f"{score:.2f}"
+        if entry.get("benchmark_avg") != value:
+            entry["benchmark_avg"] = value
+            store.mark_dirty(entry.get("name"))
+    return recomputed
@@ -1,60 +1,135 @@
+import argparse
+import copy
 import json
-import re
-from typing import List, Dict, Any
+import os
+import shutil
+import sqlite3
+import tempfile
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
 
-def _wrap_values_arrays(json_text: str, per_line: int) -> str:
-    """
-    Find "values": [ ... ] arrays and reformat them so that each line
-    contains up to `per_line` numbers.
+from includes.config import JSON_PATH, STORE_PATH
+from includes.records import PASSMARK_FIELDS, Result, passmark_text, stored_results
+
+# Arrays under these keys are written up to WRAP_PER_LINE items per line
+WRAPPED_KEYS = ("values", "main")
+WRAP_PER_LINE = 7
+INDENT = "  "
+
+
+def _is_wrappable(value: Any) -> bool:
+    """Flat arrays of strings / numbers (what "values" holds) get wrapped."""
+    return (
+        isinstance(value, list)
+        and bool(value)
+        and all(isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in value)
+    )
 
-    Assumes the arrays contain only numeric literals (ints / floats).
+
+def _iter_json(obj: Any, level: int, wrap: bool = False):
+    """
+    Yield the text of `obj` in one pass: json.dumps(indent=2) layout, except
+    that flat arrays under WRAPPED_KEYS hold WRAP_PER_LINE items per line.
     """
+    if isinstance(obj, dict):
+        if not obj:
+            yield "{}"
+            return
+        inner = "\n" + INDENT * (level + 1)
+        yield "{"
+        first = True
+        for key, value in obj.items():
+            yield (inner if first else "," + inner) + json.dumps(str(key)) + ": "
+            first = False
+            yield from _iter_json(value, level + 1, wrap=key in WRAPPED_KEYS)
+        yield "\n" + INDENT * level + "}"
+    elif isinstance(obj, list):
+        if not obj:
+            yield "[]"
+            return
+        inner = "\n" + INDENT * (level + 1)
+        if wrap and _is_wrappable(obj):
+            yield "["
+            for i in range(0, len(obj), WRAP_PER_LINE):
+                chunk = ", ".join(json.dumps(v) for v in obj[i:i + WRAP_PER_LINE])
+                yield ("" if i == 0 else ",") + inner + chunk
+        else:
+            yield "["
+            for i, value in enumerate(obj):
+                yield ("" if i == 0 else ",") + inner
+                yield from _iter_json(value, level + 1)
+        yield "\n" + INDENT * level + "]"
+    else:
+        yield json.dumps(obj)
 
-    # Match: "values": [ ... ]  (non-greedy inside the brackets)
-    # Keep three groups: prefix, inner body, closing bracket (with indent)
-    pattern = re.compile(r'("(?:values|main)"\s*:\s*\[)(.*?)(\n\s*])', re.DOTALL)
 
-    def repl(match: re.Match) -> str:
-        prefix, body, closing = match.groups()
+def dumps_json(data: List[Dict[str, Any]]) -> str:
+    return "".join(_iter_json(data, 0))
 
-        # Extract all JSON-like elements: strings or numbers
-        items = re.findall(r'"[^"]*"|-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?', body)
-        if not items:
-            # Nothing we recognize inside; just return original match
-            return match.group(0)
 
-        # Guess the indentation used for items (from the first number line)
-        indent_match = re.search(r'\n(\s*)\S', body)
-        indent = indent_match.group(1) if indent_match else "      "
+def write_text_atomic(path: str, text: str, backup: bool = False) -> bool:
+    """
+    Write `text` to `path` through a temp file in the same directory,
+    fsync and os.replace, so a crash never leaves a truncated file.
+    Skips the write (returns False) when the content is unchanged. With
+    backup=True the previous version is kept as `path`.bak.
+    """
+    return write_bytes_atomic(path, text.encode("utf-8"), backup=backup)
 
-        lines = []
-        chunk_count = (len(items) + per_line - 1) // per_line  # number of chunks
-        for idx, i in enumerate(range(0, len(items), per_line)):
-            chunk = items[i:i + per_line]
-            # Join chunk into comma-separated string
-            chunk_text = ", ".join(chunk)
-            # Add trailing comma except for last chunk
-            if idx < chunk_count - 1:
-                lines.append(f"\n{indent}{chunk_text},")
-            else:
-                lines.append(f"\n{indent}{chunk_text}")
 
-        return prefix + "".join(lines) + closing
+def _file_mode(path: str) -> int:
+    """
+    Permission bits for a new version of `path`: the existing file's, or
+    what open() would give a new file (mkstemp's 0600 would make the
+    site files unreadable to the web server).
+    """
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
 
-    return pattern.sub(repl, json_text)
 
-def save_json(path: str, data: List[Dict[str, Any]]) -> None:
-    if not isinstance(data, list):
-        raise TypeError(f"Data should be a list, got: {type(data).__name__}")
+def write_bytes_atomic(path: str, data: bytes, backup: bool = False) -> bool:
+    """write_text_atomic for bytes (e.g. compressed files)."""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+        exists = True
+    except FileNotFoundError:
+        exists = False
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, _file_mode(path))
+        if backup and exists:
+            shutil.copy2(path, path + ".bak")
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return True
 
-    # First create normal pretty JSON
-    text = json.dumps(data, indent=2)
 
-    # Then reflow the "values" arrays
-    text = _wrap_values_arrays(text, per_line=7)
+def save_json(path: str, data: List[Dict[str, Any]]) -> bool:
+    """
+    Atomically write the benchmark JSON (see dumps_json for the layout).
+    Returns False when the file already had this exact content, so an
+    unchanged dataset does not touch the file (or trigger a Pages deploy).
+    """
+    if not isinstance(data, list):
+        raise TypeError(f"Data should be a list, got: {type(data).__name__}")
 
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(text)
+    return write_text_atomic(path, dumps_json(data), backup=True)
 
 def load_json(path: str) -> List[Dict[str, Any]]:
     try:
@@ -67,65 +142,194 @@ def load_json(path: str) -> List[Dict[str, Any]]:
     except FileNotFoundError:
         # File doesn't exist yet -> start with empty list
         return []
-    except json.JSONDecodeError:
-        # Corrupt or invalid JSON -> you can either raise or reset
-        # Here we choose to reset to an empty list
-        return []
+    except json.JSONDecodeError as e:
+        # Corrupt JSON: starting from [] would overwrite the dataset with an
+        # almost empty one on the next save, so stop here instead
+        raise ValueError(
+            f"{path} is not valid JSON ({e}). Refusing to start from an empty "
+            f"dataset; restore it from {path}.bak or version control."
+        ) from e
 
-def get_iso_entry_for_name(data: List[Dict[str, Any]], iso_name: str) -> Dict[str, Any]:
-    """
-    Find JSON entry for given ISO name, or create a new one with default structure.
-    """
-    for entry in data:
-        if entry.get("name") == iso_name:
-            return entry
-
-    new_entry = {
-        "name": iso_name,
-        "version": "",
-        "version_shortcode": "",
-        "used_space": "",
-        "status": "",
-        "youtube_link": "",
-        "iso_file_name": "",
-        "iso_file_size": "",
-        "iso_file_lastmodified": "",
-        "iso_sha1": "",
-        "iso_download_link": "",
-        "comments": "",
-        "benchmark_avg": "",
-        "passmark":  {
-            "main": "",
-            "cpu": "",
-            "3d": "",
-            "2d": "",
-            "memory": "",
-            "disk": ""
-        },
-        "motionmark": {
-            "latest": "",
-            "average": "",
-            "highest": "",
-            "lowest": "",
-            "values": []
-        },
-        "jetstream": {
-            "latest": "",
-            "average": "",
-            "highest": "",
-            "lowest": "",
-            "values": []
-        },
-        "speedometer": {
-            "latest": "",
-            "average": "",
-            "highest": "",
-            "lowest": "",
-            "values": []
-        }
+# Default structure of a new ISO entry (deep-copied for every new entry)
+def _bench_schema() -> Dict[str, Any]:
+    return {
+        "latest": "",
+        "average": "",
+        "highest": "",
+        "lowest": "",
+        "values": []
     }
-    data.append(new_entry)
-    return new_entry
+
+ENTRY_SCHEMA = {
+    "name": "",
+    "version": "",
+    "version_shortcode": "",
+    "used_space": "",
+    "status": "",
+    "youtube_link": "",
+    "iso_file_name": "",
+    "iso_file_size": "",
+    "iso_file_lastmodified": "",
+    "iso_sha1": "",
+    "iso_download_link": "",
+    "comments": "",
+    "benchmark_avg": "",
+    "passmark":  {
+        "main": "",
+        "cpu": "",
+        "3d": "",
+        "2d": "",
+        "memory": "",
+        "disk": ""
+    },
+    "motionmark": _bench_schema(),
+    "jetstream": _bench_schema(),
+    "speedometer": _bench_schema(),
+}
+
+
+def new_iso_entry(iso_name: str) -> Dict[str, Any]:
+    entry = copy.deepcopy(ENTRY_SCHEMA)
+    entry["name"] = iso_name
+    return entry
+
+
+class IsoStore:
+    """
+    The loaded benchmark entries plus a name -> entry index.
+
+    `entries` is the list that gets saved, in its original order (new ISOs
+    are appended). Changes are tracked in `dirty` as
+    {iso_name: {bench_key, ...}}, with "" standing for the entry itself,
+    so later steps (stats, JSON write, site export) can skip the rest.
+    Opened on a ResultDB (see open()), save() writes only those changes
+    to the database before exporting the JSON.
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]], db: Optional["ResultDB"] = None) -> None:
+        if not isinstance(entries, list):
+            raise TypeError(f"Data should be a list, got: {type(entries).__name__}")
+        self.entries = entries
+        self._by_name: Dict[str, Dict[str, Any]] = {}
+        for entry in entries:
+            # Like the old linear scan: the first entry with a name wins
+            self._by_name.setdefault(entry.get("name"), entry)
+        self.dirty: Dict[str, Set[str]] = {}
+        # Backing SQLite store (see ResultDB), None for the plain JSON file
+        self.db = db
+        # (iso, bench) -> timestamps of the screenshots behind the values
+        self.result_files: Dict[Tuple[str, str], List[str]] = {}
+        # (iso, bench) -> the values as records, parsed at most once (see bench_results)
+        self._results: Dict[Tuple[str, str], List[Optional[Result]]] = {}
+        self.export_pending = False
+
+    @classmethod
+    def load(cls, path: str) -> "IsoStore":
+        return cls(load_json(path))
+
+    @classmethod
+    def open(cls, db_path: Optional[str] = STORE_PATH, json_path: str = JSON_PATH) -> "IsoStore":
+        """
+        The store backed by the SQLite file db_path, with json_path as its
+        export. The JSON is imported instead when it is not the file the
+        store last exported (first run, hand edits, a restore from git).
+        Without db_path this is load(json_path).
+        """
+        if not db_path:
+            return cls.load(json_path)
+        db = ResultDB(db_path)
+        signature = file_signature_text(json_path)
+        if signature != "missing" and signature != db.get_meta("json_signature"):
+            entries = load_json(json_path)
+            db.import_entries(entries)
+            db.set_meta("json_signature", signature)
+            return cls(entries, db)
+        store = cls(db.load_entries(), db)
+        # A deleted export is written again on the next save
+        store.export_pending = signature == "missing" and bool(store.entries)
+        return store
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, iso_name: str) -> bool:
+        return iso_name in self._by_name
+
+    def names(self) -> List[str]:
+        return [entry.get("name") for entry in self.entries]
+
+    def get(self, iso_name: str) -> Optional[Dict[str, Any]]:
+        return self._by_name.get(iso_name)
+
+    def get_or_create(self, iso_name: str) -> Dict[str, Any]:
+        """
+        Find the entry for the given ISO name, or create a new one with
+        the default structure.
+        """
+        entry = self._by_name.get(iso_name)
+        if entry is None:
+            entry = new_iso_entry(iso_name)
+            self.entries.append(entry)
+            self._by_name[iso_name] = entry
+            self.mark_dirty(iso_name)
+        return entry
+
+    def mark_dirty(self, iso_name: str, bench_key: str = "") -> None:
+        self.dirty.setdefault(iso_name, set()).add(bench_key)
+
+    def is_dirty(self, iso_name: Optional[str] = None) -> bool:
+        return bool(self.dirty) if iso_name is None else iso_name in self.dirty
+
+    def dirty_benches(self, iso_name: str) -> Set[str]:
+        return self.dirty.get(iso_name, set()) - {""}
+
+    def set_result_files(self, iso_name: str, bench_key: str, paths: Iterable[str]) -> None:
+        """Record the screenshots behind a bench's values, in value order."""
+        self.result_files[(iso_name, bench_key)] = [
+            os.path.splitext(os.path.basename(path))[0] for path in paths
+        ]
+
+    def bench_results(self, iso_name: str, bench_key: str) -> List[Optional[Result]]:
+        """
+        The values of one bench as result records, in value order: as set by
+        this run, else parsed once from the entry (None for a value that
+        does not parse).
+        """
+        key = (iso_name, bench_key)
+        results = self._results.get(key)
+        if results is None:
+            results = stored_results(bench_key, (self.get(iso_name) or {}).get(bench_key))
+            self._results[key] = results
+        return results
+
+    def set_results(self, iso_name: str, bench_key: str, results: List[Optional[Result]]) -> None:
+        """Record the records behind a bench's freshly stored values."""
+        self._results[(iso_name, bench_key)] = list(results)
+
+    def mark_clean(self) -> None:
+        """Forget the tracked changes, e.g. once they are saved."""
+        self.dirty = {}
+        self.result_files = {}
+
+    def save(self, path: str) -> bool:
+        """
+        Write the changed ISOs to the SQLite store (when there is one), then
+        export the JSON with save_json. Skipped entirely when nothing
+        changed during the run.
+        """
+        if not self.dirty and not self.export_pending:
+            return False
+        if self.db is None:
+            return save_json(path, self.entries)
+        self.db.write_changes(self)
+        saved = save_json(path, self.entries)
+        self.db.set_meta("json_signature", file_signature_text(path))
+        self.export_pending = False
+        return saved
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
 
 
 def get_bench_dict(entry: Dict[str, Any], bench_key: str) -> Dict[str, Any]:
@@ -143,3 +347,333 @@ def get_bench_dict(entry: Dict[str, Any], bench_key: str) -> Dict[str, Any]:
     if bench_key != "passmark":
         bench.setdefault("values", [])
     return bench
+
+
+# ---------- SQLite result store ----------
+
+def file_signature_text(path: str) -> str:
+    """"size:mtime_ns" of a file, "missing" when there is none."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return "missing"
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+# Entry keys with typed rows in the database
+BENCH_KEYS = ("passmark", "motionmark", "jetstream", "speedometer")
+
+STAT_FIELDS = ("average", "highest", "lowest")
+
+RESULT_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+-- One row per entry, in JSON order: the entry as compact JSON, which the
+-- JSON export is built from
+CREATE TABLE IF NOT EXISTS isos (
+    position INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS isos_by_name ON isos (name);
+-- One row per (ISO, bench) with the stats fields as numbers (Passmark: main)
+CREATE TABLE IF NOT EXISTS benches (
+    iso TEXT NOT NULL,
+    bench TEXT NOT NULL,
+    latest TEXT,
+    average REAL,
+    highest REAL,
+    lowest REAL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (iso, bench)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS benches_by_average ON benches (bench, average);
+-- One row per screenshot result. MotionMark fills score, fps and percent;
+-- Passmark has one row per run, with main as the score plus its subscores
+CREATE TABLE IF NOT EXISTS results (
+    iso TEXT NOT NULL,
+    bench TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    file_ts TEXT,
+    raw TEXT NOT NULL,
+    score REAL,
+    fps REAL,
+    percent REAL,
+    cpu REAL,
+    d2 REAL,
+    d3 REAL,
+    memory REAL,
+    disk REAL,
+    PRIMARY KEY (iso, bench, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_by_score ON results (bench, score);
+"""
+
+ResultRow = Tuple[Any, ...]
+
+
+def _dumps_doc(entry: Dict[str, Any]) -> str:
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+
+def _number(text: Any) -> Optional[float]:
+    """A field as a number, None for "", "N/A" and other text."""
+    from includes.stats import leading_number
+
+    value = leading_number(text)
+    return None if value != value else value
+
+
+def result_rows(
+    iso_name: str,
+    bench_key: str,
+    bench: Dict[str, Any],
+    files: Optional[List[str]],
+    results: Optional[List[Optional[Result]]] = None,
+) -> List[ResultRow]:
+    """
+    The typed results rows of one bench, in results column order, from its
+    result records (parsed from `bench` when not given).
+    """
+    if results is None:
+        results = stored_results(bench_key, bench)
+    if bench_key == "passmark":
+        if not bench.get("main"):
+            return []
+        result = results[0] if results else None
+        subscores = (
+            [None] * len(PASSMARK_FIELDS) if result is None
+            else [result.main, result.cpu, result.d2, result.d3, result.memory, result.disk]
+        )
+        file_ts = files[0] if files and len(files) == 1 else None
+        return [(iso_name, bench_key, 0, file_ts, passmark_text(bench), subscores[0], None, None, *subscores[1:])]
+
+    values = bench.get("values") or []
+    if files is not None and len(files) != len(values):
+        files = None
+    rows = []
+    for position, (raw, result) in enumerate(zip(values, results)):
+        score = None if result is None else result.score
+        fps = getattr(result, "fps", None)
+        percent = getattr(result, "percent", None)
+        file_ts = files[position] if files else None
+        rows.append((iso_name, bench_key, position, file_ts, str(raw), score, fps, percent, None, None, None, None, None))
+    return rows
+
+
+def bench_row(iso_name: str, bench_key: str, bench: Dict[str, Any]) -> ResultRow:
+    """The typed benches row of one bench."""
+    if bench_key == "passmark":
+        main = _number(bench.get("main"))
+        return (iso_name, bench_key, bench.get("latest") or None, main, None, None, int(main is not None))
+    return (
+        iso_name, bench_key, bench.get("latest") or None,
+        *(_number(bench.get(field)) for field in STAT_FIELDS),
+        len(bench.get("values") or []),
+    )
+
+
+class ResultDB:
+    """
+    SQLite storage of the benchmark data (see RESULT_DB_SCHEMA).
+
+    Every ISO's entry is kept as compact JSON, so the JSON export comes
+    out exactly as the entries were; next to it, each bench and each
+    screenshot result has a typed row (numbers as REAL, N/A as NULL),
+    indexed by bench, for cross-ISO queries without parsing any string.
+    write_changes() rewrites only what the store marked dirty.
+    """
+
+    def __init__(self, path: str = STORE_PATH) -> None:
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(RESULT_DB_SCHEMA)
+        self.conn.commit()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # ---------- Entries ----------
+
+    def load_entries(self) -> List[Dict[str, Any]]:
+        return [json.loads(doc) for (doc,) in self.conn.execute("SELECT doc FROM isos ORDER BY position")]
+
+    def load_entry(self, iso_name: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT doc FROM isos WHERE name = ? ORDER BY position LIMIT 1", (iso_name,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _file_timestamps(self, iso_name: str, bench_key: str) -> Optional[List[str]]:
+        """The stored file timestamps of a bench, when every result has one."""
+        files = [
+            ts for (ts,) in self.conn.execute(
+                "SELECT file_ts FROM results WHERE iso = ? AND bench = ? ORDER BY position", (iso_name, bench_key)
+            )
+        ]
+        return files if files and None not in files else None
+
+    def _write_doc(self, position: int, entry: Dict[str, Any]) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO isos (position, name, doc) VALUES (?, ?, ?)",
+            (position, entry.get("name"), _dumps_doc(entry)),
+        )
+
+    def _write_benches(
+        self,
+        entry: Dict[str, Any],
+        benches: Iterable[str],
+        store: Optional["IsoStore"] = None,
+    ) -> None:
+        """
+        Replace the typed rows of the given benches of one ISO, with the
+        screenshot timestamps and result records `store` has for them.
+        """
+        iso_name = entry.get("name")
+        for bench_key in benches:
+            bench = entry.get(bench_key)
+            known = store.result_files.get((iso_name, bench_key)) if store is not None else None
+            if known is None:
+                # Values rewritten without new screenshots keep their timestamps
+                known = self._file_timestamps(iso_name, bench_key)
+            self.conn.execute("DELETE FROM results WHERE iso = ? AND bench = ?", (iso_name, bench_key))
+            self.conn.execute("DELETE FROM benches WHERE iso = ? AND bench = ?", (iso_name, bench_key))
+            if not isinstance(bench, dict):
+                continue
+            self.conn.execute("INSERT INTO benches VALUES (?, ?, ?, ?, ?, ?, ?)", bench_row(iso_name, bench_key, bench))
+            self.conn.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                result_rows(
+                    iso_name, bench_key, bench, known,
+                    store.bench_results(iso_name, bench_key) if store is not None else None,
+                ),
+            )
+
+    def write_changes(self, store: "IsoStore") -> int:
+        """
+        Write the ISOs marked dirty in `store`, in one transaction: the entry
+        document of each, and the typed rows of its dirty benches (all of
+        them for an ISO new to the database). Returns the ISOs written.
+        """
+        names = [name for name in store.dirty if store.get(name) is not None]
+        if not names:
+            return 0
+        positions: Dict[str, int] = {}
+        for i, entry in enumerate(store.entries):
+            positions.setdefault(entry.get("name"), i)
+        stored = {
+            name for (name,) in self.conn.execute(
+                f"SELECT DISTINCT iso FROM benches WHERE iso IN ({','.join('?' * len(names))})", names
+            )
+        }
+        with self.conn:
+            for iso_name in names:
+                entry = store.get(iso_name)
+                self._write_doc(positions[iso_name], entry)
+                benches = store.dirty_benches(iso_name) if iso_name in stored else BENCH_KEYS
+                self._write_benches(entry, sorted(benches), store)
+        return len(names)
+
+    def import_entries(self, entries: List[Dict[str, Any]]) -> int:
+        """
+        Make the database hold exactly `entries`. Only entries that differ
+        from the stored one at their position are written, and typed rows
+        only for the benches whose content changed (entries that merely
+        moved keep theirs); returns the entries written.
+        """
+        stored: Dict[int, Tuple[str, str]] = {}
+        stored_first: Dict[str, str] = {}
+        for position, name, doc in self.conn.execute("SELECT position, name, doc FROM isos ORDER BY position"):
+            stored[position] = (name, doc)
+            stored_first.setdefault(name, doc)
+        seen: Set[str] = set()
+        written = 0
+        with self.conn:
+            for position, entry in enumerate(entries):
+                name = entry.get("name")
+                doc = _dumps_doc(entry)
+                if stored.get(position) != (name, doc):
+                    self._write_doc(position, entry)
+                    written += 1
+                # Typed rows follow the first entry of a name, like IsoStore
+                if name in seen:
+                    continue
+                seen.add(name)
+                before_doc = stored_first.get(name)
+                if before_doc == doc:
+                    continue
+                before = json.loads(before_doc) if before_doc is not None else {}
+                self._write_benches(entry, [b for b in BENCH_KEYS if before.get(b) != entry.get(b)])
+            self.conn.execute("DELETE FROM isos WHERE position >= ?", (len(entries),))
+            for table in ("benches", "results"):
+                self.conn.execute(f"DELETE FROM {table} WHERE iso NOT IN (SELECT name FROM isos)")
+        return written
+
+    # ---------- Queries ----------
+
+    def bench_stats(self, bench_key: str) -> List[Tuple[str, int, float, float, float]]:
+        """(iso, count, mean, min, max) of the scores of one bench for every ISO, best mean first."""
+        return self.conn.execute(
+            "SELECT iso, COUNT(score), AVG(score), MIN(score), MAX(score) FROM results"
+            " WHERE bench = ? AND score IS NOT NULL GROUP BY iso ORDER BY AVG(score) DESC",
+            (bench_key,),
+        ).fetchall()
+
+    def ranking(self, bench_key: str, limit: int = -1) -> List[Tuple[str, float]]:
+        """(iso, average) of one bench, best first (Passmark: main)."""
+        return self.conn.execute(
+            "SELECT iso, average FROM benches WHERE bench = ? AND average IS NOT NULL"
+            " ORDER BY average DESC LIMIT ?",
+            (bench_key, limit),
+        ).fetchall()
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the SQLite result store and its JSON export.")
+    parser.add_argument('--db', default=STORE_PATH, help='SQLite result store.')
+    parser.add_argument('--json', default=JSON_PATH, help='Benchmark JSON (the export).')
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("import", help="Rebuild the store from the JSON.")
+    sub.add_parser("export", help="Write the JSON from the store.")
+    p_rank = sub.add_parser("rank", help="Rank the ISOs on one bench.")
+    p_rank.add_argument('bench', choices=BENCH_KEYS)
+    p_rank.add_argument('--top', type=int, default=20, help='Rows shown (-1 for all).')
+    args = parser.parse_args()
+
+    db = ResultDB(args.db)
+    try:
+        if args.command == "import":
+            entries = load_json(args.json)
+            written = db.import_entries(entries)
+            db.set_meta("json_signature", file_signature_text(args.json))
+            print(f"{len(entries)} ISO(s) in {args.db}, {written} written from {args.json}")
+        elif args.command == "export":
+            entries = db.load_entries()
+            saved = save_json(args.json, entries)
+            db.set_meta("json_signature", file_signature_text(args.json))
+            print(f"{args.json} {'written' if saved else 'unchanged'} ({len(entries)} ISO(s))")
+        else:
+            stats = {row[0]: row for row in db.bench_stats(args.bench)}
+            for iso_name, average in db.ranking(args.bench, args.top):
+                _, count, _, low, high = stats.get(iso_name, (iso_name, 0, None, None, None))
+                spread = f"  ({count} results, {low:g} - {high:g})" if count else ""
+                print(f"{average:>12.3f}  {iso_name}{spread}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,16 @@
 # utils.py
 
 import os
+import re
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import Iterable, Optional, Tuple
 
 # ---------- Timestamp helpers ----------
 
+# 'YYYY-MM-DD-HH-mm-SS', and the length of such a name with '.png'
+TIMESTAMP_NAME_RE = re.compile(r"\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}")
+TIMESTAMP_NAME_LEN = len("2025-04-16-09-33-13.png")
+
 def parse_timestamp_from_filename(filename: str) -> Optional[datetime]:
     """
     Parse YYYY-MM-DD-HH-mm-SS from a filename like '2025-04-16-09-33-13.png'.
@@ -38,6 +43,30 @@ def dt_to_timestamp_str(dt: datetime) -> str:
 
 # ---------- Filesystem helpers ----------
 
+def is_timestamp_name(base: str) -> bool:
+    """
+    True for a fixed-width YYYY-MM-DD-HH-mm-SS string. Such strings sort
+    like the times they encode, so they can be compared without strptime.
+    """
+    return TIMESTAMP_NAME_RE.fullmatch(base) is not None
+
+
+def latest_timestamp_name(names: Iterable[str]) -> Optional[str]:
+    """
+    Newest 'YYYY-MM-DD-HH-mm-SS.png' among file names or paths, as its
+    name without extension, by plain string comparison. None if none match.
+    """
+    latest: Optional[str] = None
+    for name in names:
+        base = os.path.basename(name)
+        if len(base) != TIMESTAMP_NAME_LEN or base[-4:].lower() != ".png":
+            continue
+        base = base[:-4]
+        if (latest is None or base > latest) and is_timestamp_name(base):
+            latest = base
+    return latest
+
+
 def get_latest_file_timestamp(folder: str) -> Optional[Tuple[str, datetime]]:
     """
     Get the latest PNG file in a folder (by timestamp encoded in filename).
@@ -45,16 +74,29 @@ def get_latest_file_timestamp(folder: str) -> Optional[Tuple[str, datetime]]:
     """
     if not os.path.isdir(folder):
         return None
+    with os.scandir(folder) as entries:
+        names = [e.name for e in entries]
+    return get_latest_timestamp_from_files(names)
 
-    latest: Optional[Tuple[str, datetime]] = None
-
-    for name in os.listdir(folder):
-        ts = parse_timestamp_from_filename(name)
-        if ts is None:
-            continue
 
-        base, _ = os.path.splitext(name)
-        if latest is None or ts > latest[1]:
-            latest = (base, ts)
+def get_latest_timestamp_from_files(paths: Iterable[str]) -> Optional[Tuple[str, datetime]]:
+    """
+    Same as get_latest_file_timestamp, but for an already-listed set of files
+    (e.g. from includes.scan), so the folder is not listed again. Only the
+    newest name goes through strptime.
+    """
+    paths = list(paths)
+    latest = latest_timestamp_name(paths)
+    if latest is None:
+        return None
+    dt = timestamp_str_to_dt(latest)
+    if dt is not None:
+        return latest, dt
 
-    return latest
+    # The newest name is not a real date (e.g. month 13): check them all
+    best: Optional[Tuple[str, datetime]] = None
+    for path in paths:
+        ts = parse_timestamp_from_filename(os.path.basename(path))
+        if ts is not None and (best is None or ts > best[1]):
+            best = (os.path.splitext(os.path.basename(path))[0], ts)
+    return best
@@ -0,0 +1,257 @@
+# watch.py
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from includes.config import BENCH_CONFIG, ROOT_DIR
+from includes.utils import parse_timestamp_from_filename
+
+# (iso_name, bench_key)
+Pair = Tuple[str, str]
+
+# Every complete PNG ends with an empty IEND chunk
+PNG_TRAILER = b"\x00\x00\x00\x00IEND\xaeB`\x82"
+
+
+def png_is_complete(path: str) -> bool:
+    """
+    False while a PNG is still being written (or was cut short): it must
+    start with the PNG signature and end with the IEND chunk.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(8) != b"\x89PNG\r\n\x1a\n":
+                return False
+            f.seek(0, os.SEEK_END)
+            if f.tell() < 8 + len(PNG_TRAILER):
+                return False
+            f.seek(-len(PNG_TRAILER), os.SEEK_END)
+            return f.read(len(PNG_TRAILER)) == PNG_TRAILER
+    except OSError:
+        return False
+
+
+def incomplete_screenshots(folder: str) -> List[str]:
+    """Timestamped PNGs in folder that are not completely written yet."""
+    try:
+        with os.scandir(folder) as entries:
+            return sorted(
+                e.path for e in entries
+                if parse_timestamp_from_filename(e.name) is not None and not png_is_complete(e.path)
+            )
+    except FileNotFoundError:
+        return []
+
+
+# ---------- Watchers ----------
+
+class Watcher:
+    """
+    Reports the (ISO, bench) pairs under root_dir whose Screenshots_*
+    folder changed. poll(timeout) waits up to `timeout` seconds and returns
+    the pairs seen changing meanwhile (possibly none).
+    """
+    kind = "base"
+
+    def __init__(self, root_dir: str = ROOT_DIR) -> None:
+        self.root_dir = root_dir
+
+    def poll(self, timeout: float) -> Set[Pair]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def _bench_dirs(self, iso_dir: str) -> List[Tuple[str, str]]:
+        """(bench_key, path) of the Screenshots_* folders of one ISO folder."""
+        try:
+            with os.scandir(iso_dir) as entries:
+                return [
+                    (BENCH_CONFIG[e.name], e.path) for e in entries
+                    if e.name in BENCH_CONFIG and e.is_dir()
+                ]
+        except (FileNotFoundError, NotADirectoryError):
+            return []
+
+    def _iso_dirs(self) -> List[Tuple[str, str]]:
+        try:
+            with os.scandir(self.root_dir) as entries:
+                return [(e.name, e.path) for e in entries if e.is_dir()]
+        except FileNotFoundError:
+            return []
+
+
+class PollingWatcher(Watcher):
+    """
+    Portable fallback: stats root_dir, every ISO folder and every
+    Screenshots_* folder once per poll and compares their mtimes (adding
+    or removing a file changes its folder's mtime). Only folders whose
+    mtime moved are listed.
+    """
+    kind = "polling"
+
+    def __init__(self, root_dir: str = ROOT_DIR, interval: float = 2.0) -> None:
+        super().__init__(root_dir)
+        self.interval = interval
+        self.mtimes: Dict[str, Optional[int]] = {}
+        self.iso_dirs: Dict[str, str] = {}
+        self.pairs: Dict[str, Pair] = {}  # Screenshots_* folder -> pair
+        self._refresh(initial=True)
+
+    def _mtime(self, path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _refresh(self, initial: bool = False) -> Set[Pair]:
+        changed: Set[Pair] = set()
+        root_mtime = self._mtime(self.root_dir)
+        if root_mtime != self.mtimes.get(self.root_dir) or initial:
+            self.mtimes[self.root_dir] = root_mtime
+            self.iso_dirs = dict(self._iso_dirs())
+
+        for iso_name, iso_dir in self.iso_dirs.items():
+            iso_mtime = self._mtime(iso_dir)
+            if iso_mtime is None or iso_mtime == self.mtimes.get(iso_dir):
+                continue
+            self.mtimes[iso_dir] = iso_mtime
+            for bench_key, bench_dir in self._bench_dirs(iso_dir):
+                if bench_dir not in self.pairs:
+                    self.pairs[bench_dir] = (iso_name, bench_key)
+                    self.mtimes[bench_dir] = self._mtime(bench_dir)
+                    if not initial:
+                        changed.add((iso_name, bench_key))
+
+        for bench_dir, pair in list(self.pairs.items()):
+            mtime = self._mtime(bench_dir)
+            if mtime is None:
+                del self.pairs[bench_dir]
+                self.mtimes.pop(bench_dir, None)
+                continue
+            if mtime != self.mtimes.get(bench_dir):
+                self.mtimes[bench_dir] = mtime
+                changed.add(pair)
+        return changed
+
+    def poll(self, timeout: float) -> Set[Pair]:
+        time.sleep(max(0.0, min(timeout, self.interval)))
+        return self._refresh()
+
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_ISDIR = 0x40000000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+DIR_MASK = IN_CREATE | IN_MOVED_TO | IN_DELETE_SELF
+BENCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE | IN_MODIFY | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher(Watcher):
+    """
+    Linux inotify through libc (no extra package): watches root_dir, every
+    ISO folder (for new Screenshots_* folders) and every Screenshots_*
+    folder (for written, moved and deleted files). Events for names that
+    are not timestamped screenshots (temp files) are ignored.
+    """
+    kind = "inotify"
+
+    def __init__(self, root_dir: str = ROOT_DIR) -> None:
+        super().__init__(root_dir)
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # wd -> (kind, path, iso_name, bench_key)
+        self.watches: Dict[int, Tuple[str, str, Optional[str], Optional[str]]] = {}
+        self._add(self.root_dir, "root", DIR_MASK)
+        for iso_name, iso_dir in self._iso_dirs():
+            self._watch_iso(iso_name, iso_dir)
+
+    def _add(self, path: str, kind: str, mask: int, iso_name: Optional[str] = None, bench_key: Optional[str] = None) -> None:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOENT:
+                return
+            raise OSError(err, f"inotify_add_watch failed for {path}")
+        self.watches[wd] = (kind, path, iso_name, bench_key)
+
+    def _watch_iso(self, iso_name: str, iso_dir: str) -> Set[Pair]:
+        self._add(iso_dir, "iso", DIR_MASK, iso_name)
+        pairs = set()
+        for bench_key, bench_dir in self._bench_dirs(iso_dir):
+            self._add(bench_dir, "bench", BENCH_MASK, iso_name, bench_key)
+            pairs.add((iso_name, bench_key))
+        return pairs
+
+    def poll(self, timeout: float) -> Set[Pair]:
+        changed: Set[Pair] = set()
+        ready, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        if not ready:
+            return changed
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + name_len].rstrip(b"\0")
+                offset += EVENT_HEADER.size + name_len
+                changed |= self._handle(wd, mask, os.fsdecode(name))
+        return changed
+
+    def _handle(self, wd: int, mask: int, name: str) -> Set[Pair]:
+        watch = self.watches.get(wd)
+        if watch is None:
+            return set()
+        kind, path, iso_name, bench_key = watch
+        if mask & IN_IGNORED:
+            del self.watches[wd]
+            return set()
+        if kind == "root" and mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+            return self._watch_iso(name, os.path.join(path, name))
+        if kind == "iso" and mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and name in BENCH_CONFIG:
+            bench_dir = os.path.join(path, name)
+            self._add(bench_dir, "bench", BENCH_MASK, iso_name, BENCH_CONFIG[name])
+            return {(iso_name, BENCH_CONFIG[name])}
+        if kind == "bench":
+            if mask & IN_DELETE_SELF or parse_timestamp_from_filename(name) is not None:
+                return {(iso_name, bench_key)}
+        return set()
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_watcher(root_dir: str = ROOT_DIR, poll_interval: float = 2.0, polling: bool = False) -> Watcher:
+    """inotify on Linux, else (or if it cannot be set up) mtime polling."""
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root_dir)
+        except (OSError, AttributeError) as e:
+            logging.warning(f"inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(root_dir, interval=poll_interval)
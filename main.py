@@ -1,34 +1,472 @@
+import argparse
+import logging
 import os
+import sys
+import time
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
-from includes.config import ROOT_DIR, JSON_PATH, BENCH_CONFIG, ensure_paths
-from includes.store import load_json, save_json, get_iso_entry_for_name
-from includes.bench_update import update_entry_for_bench
+from includes.config import (
+    ROOT_DIR, JSON_PATH, STORE_PATH, PROVENANCE_PATH, JOURNAL_PATH, FAILURE_REPORT_PATH, PROFILE_TRACE_PATH,
+    SCAN_MANIFEST_PATH, SHARD_PARTIAL_PATH, SHARD_JOURNAL_PATH, EXPORT_DIR, WATCH_DEBOUNCE_SECONDS,
+    WATCH_POLL_SECONDS, BENCH_CONFIG, OCR_BACKEND, OCR_CACHE_PATH, ensure_paths,
+)
+from includes.export import SUMMARY_NAME, export_site
+from includes.render import render_site
+from includes.ocr_backends import BACKENDS, close_backend, create_backend, set_backend
+from includes.ocr_cache import close_cache, get_cache, open_cache, report_cache_stats
+from includes.iso_hash import update_iso_metadata
+from includes.journal import Failure, RunJournal, save_failure_report
+from includes.profiling import enable_profiling, get_profiler, span
+from includes.provenance import Provenance, load_provenance, save_provenance
+from includes.scan import ScanManifest, ScreenshotIndex, manifest_key, scan_bench, scan_root
+from includes.shard import in_shard, load_partial, merge_partials, parse_shard, write_partial
+from includes.stats import refresh_stats
+from includes.store import IsoStore
+from includes.bench_update import (
+    update_entry_for_bench, plan_bench_update, finish_bench_update, failure_records, mark_failed_benches,
+)
+from includes.parallel import run_units
+from includes.watch import Watcher, create_watcher, png_is_complete
+from ocr_read import roi_config_fingerprint
 
 
-def process_all_isos() -> List[Dict[str, Any]]:
-    data = load_json(JSON_PATH)
+def process_all_isos(
+    provenance: Provenance,
+    index: Optional[ScreenshotIndex] = None,
+    jobs: int = 1,
+    backend_name: str = OCR_BACKEND,
+    use_cache: bool = True,
+    journal: Optional[RunJournal] = None,
+    manifest: Optional[ScanManifest] = None,
+    shard: Optional[Tuple[int, int]] = None,
+) -> Tuple[IsoStore, List[Failure]]:
+    """
+    Returns (store, failures). A failed bench is logged, reported in
+    failures (see includes/journal.py) and left unchanged; the run goes
+    on with the others. `provenance` is updated in place with the
+    screenshots behind every recomputed value, and every screenshot read
+    is journaled as soon as it is done. With a scan manifest, folders
+    unchanged since the last run are not even listed. Every entry's ISO
+    image fields are filled in first (see includes/iso_hash.py). With a
+    shard (i, N), only the (ISO, bench) units of shard i are processed.
+    """
+    with span("load_store"):
+        # A shard only reads the JSON: its results go to a partial results file
+        store = IsoStore.open(STORE_PATH if shard is None else None, JSON_PATH)
 
-    for iso_name in os.listdir(ROOT_DIR):
-        iso_path = os.path.join(ROOT_DIR, iso_name)
-        if not os.path.isdir(iso_path):
+    # Walk data_collected once; every lookup below is a dict hit
+    if index is None:
+        with span("scan"):
+            index = scan_root(ROOT_DIR, manifest)
+        if manifest is not None:
+            logging.info(f"Scan manifest: {len(manifest.skipped)} unchanged bench folder(s) skipped")
+
+    for iso_name in index:
+        store.get_or_create(iso_name)
+    # Size, date and SHA-1 of the ISO images; unchanged ones come from the hash
+    # cache. Not part of a shard's results, so left to unsharded runs
+    if shard is None:
+        with span("iso_metadata"):
+            update_iso_metadata(store)
+
+    failures: List[Failure] = []
+    if jobs <= 1:
+        for iso_name in index:
+            store.get_or_create(iso_name)
+
+            # Process each benchmark folder defined in BENCH_CONFIG
+            for bench_key in BENCH_CONFIG.values():
+                if not in_shard(iso_name, bench_key, shard):
+                    continue
+                try:
+                    update_entry_for_bench(store, iso_name, bench_key, index, provenance, journal)
+                except Exception as e:
+                    logging.error(f"Failed to update {bench_key} for {iso_name}: {e}")
+                    failures.extend(failure_records(iso_name, bench_key, e))
+        return store, failures
+
+    # Parallel: plan in the parent, OCR (ISO, bench) units in the pool, then
+    # merge the records in serial order so the JSON is byte-identical.
+    planned = []  # (iso_name, bench_key, plan)
+    for iso_name in index:
+        store.get_or_create(iso_name)
+        for bench_key in BENCH_CONFIG.values():
+            if not in_shard(iso_name, bench_key, shard):
+                continue
+            with span("plan", iso=iso_name, bench=bench_key):
+                plan = plan_bench_update(store, iso_name, bench_key, index, provenance, journal)
+            if plan is not None:
+                planned.append((iso_name, bench_key, plan))
+
+    # Benches that only lost screenshots need no OCR at all
+    units = [(iso, bench, plan["stale"]) for iso, bench, plan in planned if plan["stale"]]
+    plans = {(iso, bench): plan for iso, bench, plan in planned}
+
+    profiler = get_profiler()
+
+    def on_record(record: Dict[str, Any]) -> None:
+        if profiler is not None:
+            profiler.merge(record.pop("profile", None))
+        if journal is None:
+            return
+        plan = plans[(record["iso"], record["bench"])]
+        for path, value in record["files"].items():
+            journal.record(record["iso"], record["bench"], path, plan["signatures"][path], plan["fingerprint"], value)
+
+    with span("ocr_units", units=len(units), jobs=jobs):
+        unit_records, cache_stats = run_units(
+            units, jobs, backend_name, use_cache, on_record=on_record, profile=profiler is not None
+        )
+    records = {(record["iso"], record["bench"]): record for record in unit_records}
+    if use_cache:
+        report_cache_stats(OCR_CACHE_PATH, cache_stats)
+
+    for iso_name, bench_key, plan in planned:
+        record = records.get((iso_name, bench_key), {"values": [], "error": None, "errors": []})
+        if record["errors"]:
+            logging.error(f"Failed to update {bench_key} for {iso_name}: {record['error']}")
+            failures.extend(
+                {"iso": iso_name, "bench": bench_key, "file": e["file"], "error": e["error"]}
+                for e in record["errors"]
+            )
             continue
+        try:
+            if record["error"]:
+                raise RuntimeError(record["error"])
+            with span("finish", iso=iso_name, bench=bench_key):
+                finish_bench_update(store, iso_name, bench_key, plan, record["values"], provenance)
+        except Exception as e:
+            logging.error(f"Failed to update {bench_key} for {iso_name}: {e}")
+            failures.extend(failure_records(iso_name, bench_key, e))
+
+    return store, failures
+
+
+def publish(store: IsoStore) -> bool:
+    """
+    Refresh the stats, then write the JSON and, when it changed (or the
+    export is missing), the site export and the static table for the ISOs
+    that changed. Returns whether the JSON changed.
+    """
+    # Stats for the changed benches, composite benchmark_avg for all ISOs
+    with span("stats"):
+        refresh_stats(store)
+    with span("save_json"):
+        saved = store.save(JSON_PATH)
+    if saved:
+        print("Benchmark JSON updated.")
+    else:
+        print("Benchmark JSON unchanged.")
+    if saved or not os.path.exists(os.path.join(EXPORT_DIR, SUMMARY_NAME)):
+        with span("export"):
+            export_site(
+                store.entries, EXPORT_DIR, changed=store.dirty if saved else None,
+                bench_results=store.bench_results,
+            )
+        with span("render"):
+            try:
+                render_site()
+            except (OSError, ValueError) as e:
+                logging.warning(f"Static table not rendered: {e}")
+    return saved
+
 
-        entry = get_iso_entry_for_name(data, iso_name)
+def save_results(store: IsoStore, provenance: Provenance, journal: RunJournal, failures: List[Failure]) -> None:
+    """
+    Mark failed benches, publish the results (see publish), then write the
+    provenance and the failure report. The journal is deleted once a run
+    without failures is saved; otherwise it keeps the screenshots read in
+    the failed benches, so a --resume run after fixing them only re-reads
+    the failed ones.
+    """
+    mark_failed_benches(store, failures)
+    publish(store)
+    with span("save_provenance"):
+        save_provenance(PROVENANCE_PATH, provenance)
+    save_failure_report(FAILURE_REPORT_PATH, failures)
+    if not failures:
+        journal.discard()
+    store.mark_clean()
 
-        # Process each benchmark folder defined in BENCH_CONFIG
-        for subfolder, bench_key in BENCH_CONFIG.items():
-            update_entry_for_bench(entry, iso_path, subfolder, bench_key)
 
-    return data
+def merge_shards(paths: List[str]) -> List[Failure]:
+    """
+    --merge: merge partial results files of --shard runs into the JSON
+    (see includes/shard.py), then recompute the stats once and publish.
+    Returns the failures the partials reported.
+    """
+    partials = [load_partial(path) for path in paths]
+    with span("load_store"):
+        store = IsoStore.open(STORE_PATH, JSON_PATH)
+    try:
+        with span("merge"):
+            changed, failures = merge_partials(store, partials)
+        logging.info(f"Merged {len(partials)} partial file(s): {changed} bench(es) changed")
+        mark_failed_benches(store, failures)
+        publish(store)
+        save_failure_report(FAILURE_REPORT_PATH, failures)
+        store.mark_clean()
+    finally:
+        store.close()
+    return failures
+
+
+def report_failures(failures: List[Failure]) -> None:
+    if not failures:
+        return
+    print(f"{len(failures)} screenshot(s) / benchmark(s) failed, see {FAILURE_REPORT_PATH}:")
+    for failure in failures:
+        where = f"{failure['iso']} / {failure['bench']}"
+        if failure["file"]:
+            where += f" / {failure['file']}"
+        print(f"  {where}: {failure['error']}")
+
+
+def watch_forever(
+    store: IsoStore,
+    provenance: Provenance,
+    watcher: Watcher,
+    debounce: float = WATCH_DEBOUNCE_SECONDS,
+) -> None:
+    """
+    --watch: keep the store, provenance and OCR backend in memory and
+    update the (ISO, bench) pairs the watcher reports. Changes are batched
+    until nothing new happened for `debounce` seconds; each batch writes
+    the JSON once. A pair with a partially written PNG waits for the next
+    quiet period. Runs until interrupted (Ctrl+C).
+    """
+    index = scan_root(ROOT_DIR)
+    pending: Dict[Tuple[str, str], float] = {}  # pair -> time of its last change
+    logging.info(f"Watching {ROOT_DIR} ({watcher.kind}); batches run after {debounce:.0f} s without changes")
+    try:
+        while True:
+            quiet_at = max(pending.values()) + debounce if pending else time.monotonic() + debounce
+            for pair in watcher.poll(max(0.0, quiet_at - time.monotonic())):
+                pending[pair] = time.monotonic()
+            if not pending or time.monotonic() < max(pending.values()) + debounce:
+                continue
+
+            ready = []
+            for pair in sorted(pending):
+                iso_name, bench_key = pair
+                screenshots = scan_bench(ROOT_DIR, iso_name, bench_key)
+                partial = [p for p in screenshots or [] if p.lower().endswith(".png") and not png_is_complete(p)]
+                if partial:
+                    logging.info(f"{iso_name} / {bench_key}: waiting for {len(partial)} partially written screenshot(s)")
+                    pending[pair] = time.monotonic()
+                    continue
+                del pending[pair]
+                if screenshots is None:
+                    index.get(iso_name, {}).pop(bench_key, None)
+                else:
+                    index.setdefault(iso_name, {})[bench_key] = screenshots
+                ready.append(pair)
+            if ready:
+                process_pairs(store, provenance, index, ready)
+    except KeyboardInterrupt:
+        logging.info("Stopped watching.")
+
+
+def process_pairs(
+    store: IsoStore,
+    provenance: Provenance,
+    index: ScreenshotIndex,
+    pairs: List[Tuple[str, str]],
+) -> None:
+    """Update and save one watch batch of (ISO, bench) pairs."""
+    logging.info(f"Updating {len(pairs)} bench folder(s): " + ", ".join(f"{i} / {b}" for i, b in pairs))
+    journal = RunJournal(JOURNAL_PATH)
+    failures: List[Failure] = []
+    try:
+        for iso_name, bench_key in pairs:
+            store.get_or_create(iso_name)
+            try:
+                update_entry_for_bench(store, iso_name, bench_key, index, provenance, journal)
+            except Exception as e:
+                logging.error(f"Failed to update {bench_key} for {iso_name}: {e}")
+                failures.extend(failure_records(iso_name, bench_key, e))
+    finally:
+        journal.close()
+    save_results(store, provenance, journal, failures)
+    report_failures(failures)
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Update data_benchmarks.json from data_collected screenshots.")
+    parser.add_argument(
+        '--ocr-backend',
+        default=OCR_BACKEND,
+        choices=sorted(BACKENDS),
+        help='OCR backend to use (see includes/ocr_backends.py).'
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of worker processes for (ISO, benchmark) units (default: 1, serial).'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the OCR result cache.'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Reuse the screenshots already read by an interrupted run (from its run journal).'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='After the run, keep watching data_collected and ingest new screenshots as they land.'
+    )
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help='With --watch, poll folder mtimes instead of using inotify.'
+    )
+    parser.add_argument(
+        '--full-scan',
+        action='store_true',
+        help='List every screenshot folder, ignoring the scan manifest of the last run.'
+    )
+    parser.add_argument(
+        '--shard',
+        default=None,
+        metavar='I/N',
+        help='Only process shard I of N (ISO, bench) units and write them to a partial results file.'
+    )
+    parser.add_argument(
+        '--partial',
+        default=None,
+        metavar='PATH',
+        help=f'With --shard, the partial results file (default: {SHARD_PARTIAL_PATH}).'
+    )
+    parser.add_argument(
+        '--merge',
+        nargs='+',
+        default=None,
+        metavar='PARTIAL',
+        help='Merge the partial results files of --shard runs into the benchmark JSON, then exit.'
+    )
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const=PROFILE_TRACE_PATH,
+        default=None,
+        metavar='TRACE_JSON',
+        help=f'Time every stage; write a Chrome trace (default: {PROFILE_TRACE_PATH}) and print a summary.'
+    )
+    args = parser.parse_args()
+    shard = None
+    if args.shard is not None:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.watch or args.merge:
+            parser.error("--shard cannot be combined with --watch or --merge")
+
+    if args.profile:
+        enable_profiling()
+    if args.merge:
+        try:
+            failures = merge_shards(args.merge)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        print_profile(args.profile)
+        report_failures(failures)
+        if failures:
+            sys.exit(1)
+        return
     ensure_paths()
-    data = process_all_isos()
-    save_json(JSON_PATH, data)
-    print("Benchmark JSON updated.")
+    try:
+        set_backend(create_backend(args.ocr_backend))
+    except ValueError as e:
+        parser.error(str(e))
+    # With --jobs, each pool process opens its own cache connection
+    if not args.no_cache and args.jobs <= 1:
+        open_cache()
+    provenance = load_provenance(PROVENANCE_PATH)
+    # Set up before the first pass, so screenshots landing during it are seen
+    watcher = create_watcher(ROOT_DIR, poll_interval=WATCH_POLL_SECONDS, polling=args.poll) if args.watch else None
+    journal_path = JOURNAL_PATH
+    if shard is not None:
+        journal_path = SHARD_JOURNAL_PATH.format(index=shard[0], count=shard[1])
+    journal = RunJournal(journal_path, resume=args.resume)
+    config_fingerprint = roi_config_fingerprint()
+    # A shard lists everything: the manifest is kept for the unsharded runs
+    if args.full_scan or shard is not None:
+        manifest = ScanManifest()
+    else:
+        manifest = ScanManifest.load(SCAN_MANIFEST_PATH, manifest_key(JSON_PATH, config_fingerprint))
+    if args.resume:
+        logging.info(f"Resuming: {len(journal.replayed)} screenshot(s) replayed from {journal_path}")
+    store = None
+    try:
+        try:
+            index = None
+            if shard is not None:
+                with span("scan"):
+                    index = scan_root(ROOT_DIR, manifest)
+            store, failures = process_all_isos(
+                provenance, jobs=args.jobs, backend_name=args.ocr_backend, use_cache=not args.no_cache,
+                journal=journal, index=index, manifest=manifest, shard=shard,
+            )
+        finally:
+            # Kept on disk until the results are saved, for --resume
+            journal.close()
+        if shard is not None:
+            # The partial is a shard's only output: the JSON, the site, the
+            # provenance and the manifest are left to --merge and unsharded runs
+            partial_path = args.partial or SHARD_PARTIAL_PATH.format(index=shard[0], count=shard[1])
+            units = [
+                (iso_name, bench_key) for iso_name, benches in index.items()
+                for bench_key in benches if in_shard(iso_name, bench_key, shard)
+            ]
+            written = write_partial(partial_path, store, units, shard, failures)
+            print(f"Shard {shard[0]}/{shard[1]}: {written} bench result(s) written to {partial_path}")
+            if not failures:
+                journal.discard()
+        else:
+            save_results(store, provenance, journal, failures)
+            # Valid only for the JSON as just saved: any other writer forces a full scan
+            manifest.save(
+                SCAN_MANIFEST_PATH,
+                failed={(f["iso"], f["bench"]) for f in failures},
+                key=manifest_key(JSON_PATH, config_fingerprint),
+            )
+        print_profile(args.profile)
+        report_failures(failures)
+
+        if watcher is not None:
+            # The pool is gone: the backend (and cache) stay warm in this process
+            if not args.no_cache and get_cache() is None:
+                open_cache()
+            watch_forever(store, provenance, watcher)
+            return
+    finally:
+        if watcher is not None:
+            watcher.close()
+        if store is not None:
+            store.close()
+        close_backend()
+        close_cache()
+
+    if failures:
+        sys.exit(1)
+
+
+def print_profile(trace_path: Optional[str]) -> None:
+    """With --profile, write the Chrome trace and print the summary table."""
+    profiler = get_profiler()
+    if profiler is None or not trace_path:
+        return
+    profiler.write_trace(trace_path)
+    print("")
+    print(profiler.summary())
+    print(f"Chrome trace written to {trace_path} (open in chrome://tracing or ui.perfetto.dev)")
 
 
 if __name__ == "__main__":
@@ -1,25 +1,31 @@
 import os
-import sys
-import re
-import subprocess
+import hashlib
 import time
 import logging
 import argparse
-import json
-from PIL import Image, ImageDraw
+import tracemalloc
+from collections import namedtuple
+import numpy as np
+from PIL import Image
+
+
+from includes.config import OCR_BACKEND, PIPELINE_DECODE_THREADS, PIPELINE_OCR_THREADS, PIPELINE_WINDOW
+from includes.frame import Frame
+from includes.roi import compile_roi_plans
+from includes.ocr_backends import (
+    BACKENDS, OcrError, close_backend, create_backend, get_backend, get_backends, set_backend,
+)
+from includes.ocr_cache import cache_key, close_cache, get_cache, open_cache
+from includes.pipeline import StreamingPipeline
+from includes.profiling import count, span, span_since
+from includes.records import ResultParseError, parse_result
+from includes.scan import scan_root
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def crop_hexagon(img, hexagon_points, save_path):
-    mask = Image.new('L', img.size, 0)
-    ImageDraw.Draw(mask).polygon(hexagon_points, outline=1, fill=255)
-    result = Image.new('RGB', img.size)
-    result.paste(img, mask=mask)
-    bbox = mask.getbbox()
-    hex_cropped = result.crop(bbox)
-    hex_cropped.save(save_path)
-    return save_path
+class ScreenshotError(Exception):
+    """A screenshot whose value cannot be read (anchor not found, text not matching)."""
 
 def colors_close(c, target, tol=8):
     """Return True if RGB color c is within tol of target."""
@@ -56,7 +62,7 @@ def find_color_runs(img, target_color, tol=8):
 
     return runs_by_row
 
-def find_grey_white_pair(
+def find_grey_white_pair_loop(
     img,
     grey_color=(64, 64, 64),   # adjust if needed
     white_color=(255, 255, 255),  # adjust if needed
@@ -65,8 +71,9 @@ def find_grey_white_pair(
     tol_white=8
 ):
     """
-    Find one grey horizontal line that has a white horizontal line directly
-    under it, with at least `length` overlapping pixels.
+    Pure-Python reference for find_grey_white_pair, walking every pixel via
+    find_color_runs. Kept for benchmarks/anchor_bench.py to check results
+    and timings against the vectorized version.
 
     Returns (x_start, y_grey, x_end, y_white) or None if not found.
     """
@@ -96,14 +103,88 @@ def find_grey_white_pair(
 
     return None
 
+# Rows examined per step of the vectorized search, so we can stop early
+ANCHOR_BAND_ROWS = 64
+
+def color_mask(arr, target_color, tol=8):
+    """
+    Boolean (h, w) mask of pixels within tol of target_color on every channel.
+    Same rule as colors_close, but over a whole uint8 RGB array at once.
+    """
+    mask = None
+    for ch in range(3):
+        lo = max(0, target_color[ch] - tol)
+        hi = min(255, target_color[ch] + tol)
+        plane = arr[..., ch]
+        ch_mask = (plane >= lo) & (plane <= hi)
+        mask = ch_mask if mask is None else mask & ch_mask
+    return mask
+
+def find_grey_white_pair_array(
+    arr,
+    grey_color=(64, 64, 64),
+    white_color=(255, 255, 255),
+    length=597,
+    tol_grey=8,
+    tol_white=8
+):
+    """
+    Vectorized find_grey_white_pair over an (h, w, 3) uint8 RGB array.
+
+    The overlap of a grey run on row y and a white run on row y + 1 is
+    exactly a run of (grey[y] & white[y + 1]), so the first such run of at
+    least `length` pixels (top-most row, then left-most run) is the same
+    pair the per-pixel search returns.
+    """
+    h, w = arr.shape[:2]
+    if w < length:
+        return None
+
+    for y0 in range(0, h - 1, ANCHOR_BAND_ROWS):
+        y1 = min(y0 + ANCHOR_BAND_ROWS, h - 1)
+        grey = color_mask(arr[y0:y1], grey_color, tol_grey)
+        white = color_mask(arr[y0 + 1:y1 + 1], white_color, tol_white)
+        both = grey & white
+
+        # Cheap prefilter: a row can only qualify with enough overlap pixels
+        candidates = np.flatnonzero(np.count_nonzero(both, axis=1) >= length)
+        for row in candidates:
+            padded = np.concatenate(([False], both[row], [False]))
+            edges = np.flatnonzero(padded[1:] != padded[:-1])
+            starts, ends = edges[0::2], edges[1::2]
+            long_runs = np.flatnonzero(ends - starts >= length)
+            if long_runs.size:
+                x_start = int(starts[long_runs[0]])
+                y_grey = y0 + int(row)
+                return x_start, y_grey, x_start + length - 1, y_grey + 1
+
+    return None
+
+def find_grey_white_pair(
+    img,
+    grey_color=(64, 64, 64),   # adjust if needed
+    white_color=(255, 255, 255),  # adjust if needed
+    length=597,
+    tol_grey=8,
+    tol_white=8
+):
+    """
+    Find one grey horizontal line that has a white horizontal line directly
+    under it, with at least `length` overlapping pixels.
+
+    Returns (x_start, y_grey, x_end, y_white) or None if not found.
+    """
+    arr = np.asarray(img.convert("RGB"))
+    return find_grey_white_pair_array(
+        arr, grey_color, white_color, length, tol_grey, tol_white
+    )
+
 # === Configuration ===
-OCR_EXECUTABLE = 'Capture2Text_CLI.exe'
+# OCR backend selection lives in includes/config.py (OCR_BACKEND)
 THRESHOLD = 128
 ROOT_DIR = os.path.join('.', 'data_collected')
 CROPPED_DIR = os.path.join(os.getcwd(), 'cropped_images')
 
-image_extensions = ('.png', '.jpg', '.jpeg')
-
 # ROI configurations per script/folder type (kept exactly as in originals)
 
 # 01. ocr_read_jetstream.py
@@ -207,91 +288,249 @@ SCREENSHOT_TYPE_MAP = {
     'Screenshots_Passmark': 'passmark',
 }
 
-def process_image(img, roi_list, filename_base, benchmark_type, use_threshold_rectangles=False, offsets=[0, 0]):
-    x_offset, y_offset = offsets
-    concatenated_text = ''
-    
-    for idx, roi in enumerate(roi_list, start=1):
-        cropped_path = os.path.join(CROPPED_DIR, f"cropped_{filename_base}_{idx}.png")
+# Reverse of SCREENSHOT_TYPE_MAP: logical type name -> screenshot folder base name
+BENCH_SUBFOLDER_MAP = {v: k for k, v in SCREENSHOT_TYPE_MAP.items()}
+
+# Bump when the text fixups in parse_roi_texts or the parsers in
+# includes/records.py change, so values recorded with an older parser get
+# re-OCRed (see roi_fingerprint)
+PARSER_VERSION = 1
+
+# Every folder's ROI list, validated and compiled once at import, so a bad
+# box fails here rather than halfway through a run
+ROI_PLANS = compile_roi_plans(screenshot_settings, THRESHOLD)
+
+def get_roi_plan(folder_name, benchmark_type):
+    """Compiled ROI plan for a folder (or the type's default)."""
+    plans = ROI_PLANS[BENCH_SUBFOLDER_MAP[benchmark_type]]
+    return plans.get(folder_name, plans['default'])
+
+# RoiPlan -> fingerprint; most folders share their type's 'default' plan
+_ROI_FINGERPRINTS = {}
+
+def roi_fingerprint(folder_name, benchmark_type):
+    """
+    Fingerprint of everything that decides a screenshot's value apart from
+    its pixels: the folder's ROI plan (ROIs and threshold settings) and the
+    parser version. Computed once per plan.
+    """
+    plan = get_roi_plan(folder_name, benchmark_type)
+    if plan not in _ROI_FINGERPRINTS:
+        _ROI_FINGERPRINTS[plan] = plan.fingerprint(parser=PARSER_VERSION)
+    return _ROI_FINGERPRINTS[plan]
+
+def roi_config_fingerprint():
+    """
+    One fingerprint over every folder's ROI plan and the parser version:
+    changes whenever any screenshot's value could (see includes/scan.py).
+    """
+    h = hashlib.sha1()
+    for subfolder in sorted(ROI_PLANS):
+        for folder_name in sorted(ROI_PLANS[subfolder]):
+            plan = ROI_PLANS[subfolder][folder_name]
+            h.update(f"{subfolder}|{folder_name}|{plan.fingerprint(parser=PARSER_VERSION)}\n".encode("utf-8"))
+    return h.hexdigest()
+
+def screenshot_offsets(frame, benchmark_type):
+    """
+    ROI offsets [x, y] for one screenshot. Passmark ROIs follow the
+    grey/white line pair; returns None when it is not found.
+    """
+    if benchmark_type != "passmark":
+        return [0, 0]
+    pair = find_grey_white_pair_array(frame.rgb, length=597)
+    if not pair:
+        return None
+    x0, y_grey, x1, y_white = pair
+    offset_x = x0 - 113
+    offset_y = y_white - 193
+    return [offset_x, offset_y]
+
+def recognize_crops(images, backend, cache, settings, filename_base):
+    """
+    OCR a batch of crops through the result cache (if any).
+    Returns one text per image, or None where OCR failed.
+    """
+    keys = [cache_key(image, settings, backend.identity()) for image in images] if cache else []
+    cached = cache.get_many(keys) if cache else {}
+    missing = [i for i in range(len(images)) if not cache or keys[i] not in cached]
+
+    texts = [cached.get(keys[i]) if cache else None for i in range(len(images))]
+    count("crops", len(images))
+    count("ocr_cache_hits", len(images) - len(missing))
+    if missing:
+        count("ocr_calls")
+    try:
+        fresh = backend.recognize_many([images[i] for i in missing])
+    except OcrError as e:
+        # Fall back to one ROI at a time, so only the failing ROIs are lost
+        logging.error(f"OCR batch failed for {filename_base}: {e}")
+        fresh = []
+        for i in missing:
+            try:
+                count("ocr_calls")
+                fresh.append(backend.recognize(images[i]))
+            except OcrError as e:
+                logging.error(str(e))
+                fresh.append(None)
+
+    for i, text in zip(missing, fresh):
+        texts[i] = text
+    if cache:
+        cache.put_many({keys[i]: text for i, text in zip(missing, fresh) if text is not None})
+    return texts
+
+def crop_rois(frame, plan, offsets, filename_base, debug=False):
+    """
+    Cut every ROI of the folder's compiled plan (see includes/roi.py) out of
+    the screenshot's shared pixel buffer: [(roi index, PIL image), ...].
+    Crops are only written to CROPPED_DIR in debug mode, for inspection.
+    """
+    cropped = []
+    for idx, roi in enumerate(plan, start=1):
         try:
-            if roi['type'] == 'rectangle':
-                # Apply offsets to rectangle box
-                x1, y1, x2, y2 = roi['box']
-                adjusted_box = (x1 + x_offset, y1 + y_offset, x2 + x_offset, y2 + y_offset)
-                
-                if use_threshold_rectangles:
-                    # MotionMark behavior
-                    roi_img = img.crop(adjusted_box).convert('L')
-                    roi_bw = roi_img.point(lambda x: 255 if x > THRESHOLD else 0)
-                    roi_bw.save(cropped_path)
-                else:
-                    # JetStream & Speedometer behavior
-                    roi_img = img.crop(adjusted_box)
-                    roi_img.save(cropped_path)
-            elif roi['type'] == 'hexagon':
-                # Apply offsets to hexagon points
-                adjusted_points = [
-                    (x + x_offset, y + y_offset) for (x, y) in roi['points']
-                ]
-                crop_hexagon(img, adjusted_points, cropped_path)
-            else:
-                logging.warning(f"Unknown ROI type: {roi['type']}")
-                continue
-            
-            # Run OCR
-            result = subprocess.run(
-                [OCR_EXECUTABLE, '-i', cropped_path],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            text = result.stdout.strip()
-            if idx == 1:
-                text = text.replace(' ', '')
-            
-            concatenated_text += text + ' '
-
-        except subprocess.CalledProcessError as e:
-            logging.error(f"OCR failed for {cropped_path}: {e}")
+            # The OCR backends and the cache take PIL images: only the ROI is copied
+            roi_img = Image.fromarray(roi.crop(frame, offsets))
+            if debug:
+                roi_img.save(os.path.join(CROPPED_DIR, f"cropped_{filename_base}_{idx}.png"))
+            cropped.append((idx, roi_img))
         except Exception as e:
             logging.error(f"Error processing ROI {idx} in {filename_base}: {e}")
+    return cropped
+
+def read_crops(cropped, plan, filename_base, benchmark_type, backend, cache):
+    """OCR one screenshot's crops in one backend batch (cached crops skipped) and parse the texts."""
+    with span("ocr", bench=benchmark_type):
+        texts = recognize_crops([roi_img for _, roi_img in cropped], backend, cache, plan.settings(), filename_base)
+    with span("parse", bench=benchmark_type):
+        return parse_roi_texts(
+            [(idx, text) for (idx, _), text in zip(cropped, texts)], benchmark_type, filename_base
+        )
+
+def process_image(frame, plan, filename_base, benchmark_type, offsets=[0, 0], backend=None, debug=False, cache=None):
+    """
+    Crop, OCR and parse one decoded screenshot in the calling thread,
+    skipping crops already in the OCR result cache. Returns its record.
+    """
+    backend = backend or get_backend()
+    cache = cache or get_cache()
+    with span("crop", bench=benchmark_type):
+        cropped = crop_rois(frame, plan, offsets, filename_base, debug)
+    return read_crops(cropped, plan, filename_base, benchmark_type, backend, cache)
+
+# One screenshot on its way through ocr_reader's pipeline; `group` is the
+# position of its (folder, type) in the run
+ScreenshotJob = namedtuple("ScreenshotJob", "group folder_name benchmark_type image_path plan")
+
+def prepare_screenshot(job, debug=False):
+    """
+    Pipeline stage 1 (decode threads): decode, find the anchor and cut the
+    ROIs. Only the crops go on; the decoded frame is dropped here.
+    Returns (job, start time, crops).
+    """
+    started_ns = time.perf_counter_ns()
+    filename = os.path.basename(job.image_path)
+    if debug:
+        tracemalloc.reset_peak()
+    # Decoded once; anchor search and every ROI crop share this buffer
+    with span("decode", bench=job.benchmark_type):
+        frame = Frame.open(job.image_path)
+    with span("anchor", bench=job.benchmark_type):
+        offsets = screenshot_offsets(frame, job.benchmark_type)
+    if offsets is None:
+        raise ScreenshotError(
+            f"No matching grey/white line pair found, for folder: {job.folder_name} and type: {job.benchmark_type}"
+        )
+    with span("crop", bench=job.benchmark_type):
+        cropped = crop_rois(frame, job.plan, offsets, os.path.splitext(filename)[0], debug)
+    if debug:
+        _, peak = tracemalloc.get_traced_memory()
+        logging.info(
+            f"{filename}: frame {frame.width}x{frame.height} "
+            f"({frame.nbytes / 2**20:.1f} MiB), {frame.copies} pixel buffers, "
+            f"peak {peak / 2**20:.1f} MiB"
+        )
+    return job, started_ns, cropped
+
+def finish_screenshot(backend, prepared):
+    """Pipeline stage 2 (one OCR thread per backend): OCR and parse the crops."""
+    job, started_ns, cropped = prepared
+    filename = os.path.basename(job.image_path)
+    count("images")
+    try:
+        return read_crops(cropped, job.plan, os.path.splitext(filename)[0], job.benchmark_type, backend, get_cache())
+    finally:
+        span_since("image", started_ns, iso=job.folder_name, bench=job.benchmark_type, file=filename)
+
+def parse_roi_texts(roi_texts, benchmark_type, filename_base):
+    """
+    Join the OCR texts of one screenshot's ROIs ([(roi index, text or
+    None), ...]), apply the per-benchmark fixups and parse the result into
+    the benchmark's record (includes/records.py). Raises ScreenshotError
+    on a mismatch.
+    """
+    concatenated_text = ''
+    for idx, text in roi_texts:
+        if text is None:
+            continue
+        if idx == 1:
+            text = text.replace(' ', '')
+        concatenated_text += text + ' '
 
     concatenated_text = concatenated_text.strip()
 
     if benchmark_type == "jetstream":
         concatenated_text = concatenated_text.replace("181_.442","181.442")
         concatenated_text = concatenated_text.replace("178-035","178.035")
-        regex_to_match = r"^([\d.]+)$"
     elif benchmark_type == "motionmark":
         concatenated_text = concatenated_text.replace("@ ","@")
         concatenated_text = concatenated_text.replace(" %","%")
-        regex_to_match = r"^([\d.]+)\s+@(\d+)fps\s+([\d.]+)%$"
-    elif benchmark_type == "speedometer":
-        regex_to_match = r"^([\d]+(?:\.\d+)?)$"
-    elif benchmark_type == "passmark":
-        regex_to_match = r"^([\d\w\s\.\/]+)$"
-
-    match = re.search(regex_to_match, concatenated_text)
-    if not match:
-        print(f"Error: Failed to match pattern for `{benchmark_type}` in fie `{cropped_path}`, got this: `{concatenated_text}`")
-        sys.exit(1)
 
-    print(".", end="", flush=True)
-    return concatenated_text
+    try:
+        return parse_result(benchmark_type, concatenated_text)
+    except ResultParseError as e:
+        raise ScreenshotError(
+            f"Failed to match pattern for `{benchmark_type}` in file `{filename_base}`, got this: `{concatenated_text}` ({e})"
+        ) from None
 
-def ocr_reader(debug=False, target_folder_name=None, benchmark_type=None):
+def ocr_reader(debug=False, target_folder_name=None, benchmark_type=None, index=None, on_result=None, on_error=None):
     """
     benchmark_type: one of None, 'motionmark', 'speedometer', 'jetstream'
-    Returns a dict suitable for JSON, e.g.:
+    index: screenshot index from includes.scan.scan_root, built once per run
+           by the caller; when omitted, ROOT_DIR is scanned here.
+    debug: also write every ROI crop to CROPPED_DIR (and keep it), and log
+           each screenshot's peak memory and pixel buffer count. Runs the
+           pipeline one screenshot at a time, so the peaks are per image.
+    on_result / on_error: called as f(folder_name, type, image_path, text)
+           (the record's text) as soon as a screenshot is read, or f(..., image_path, exception)
+           when it fails, in screenshot order. A failed screenshot is logged
+           and left out of the values; the remaining screenshots are still
+           processed.
+
+    Screenshots stream through a StreamingPipeline (includes/pipeline.py):
+    decode/anchor/crop threads feed PIPELINE_OCR_THREADS concurrent OCR
+    calls, so decoding overlaps OCR, and at most PIPELINE_WINDOW
+    screenshots are in memory at once, however large the folders.
+
+    Returns the values as result records (includes/records.py; .text is
+    the value as stored in the JSON), e.g.:
     {
         "motionmark": [
-            {"folder_name": "...", "values": ["...", "..."]},
+            {"folder_name": "...", "values": [MotionMarkResult(...), ...]},
         ],
         "speedometer": [],
         "jetstream": []
     }
+    or, for one target_folder_name and benchmark_type, just that list.
     """
-    os.makedirs(CROPPED_DIR, exist_ok=True)
+    if index is None:
+        index = scan_root(ROOT_DIR)
+    if debug:
+        os.makedirs(CROPPED_DIR, exist_ok=True)
+        # Per-image peak memory, reported after each screenshot
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
     aggregated_results = {
         "jetstream": [],
         "motionmark": [],
@@ -299,70 +538,69 @@ def ocr_reader(debug=False, target_folder_name=None, benchmark_type=None):
         "passmark": []
     }
 
-    for dirpath, dirnames, filenames in os.walk(ROOT_DIR):
-        base = os.path.basename(dirpath)
-        if base in screenshot_settings:
-            this_type = SCREENSHOT_TYPE_MAP.get(base)
-            folder_name = os.path.basename(os.path.dirname(dirpath))
-            extracted_values = []
-
-            # If a specific benchmark type is requested, skip others
-            if benchmark_type and this_type != benchmark_type:
-                continue
-
-            settings = screenshot_settings[base]
-            roi_configurations = settings['roi_configurations']
-            use_threshold_rectangles = settings['use_threshold_rectangles']
-
-            # If a specific folder name is requested, skip others
-            if target_folder_name and folder_name != target_folder_name:
-                continue
-
-            roi_list = roi_configurations.get(folder_name, roi_configurations['default'])
-
-            for filename in filenames:
-                if filename.lower().endswith(image_extensions):
-                    image_path = os.path.join(dirpath, filename)
-                    try:
-                        with Image.open(image_path) as img:
-                            offsets = [0, 0]
-                            if this_type == "passmark":
-                                pair = find_grey_white_pair(img, length=597)
-                                if pair:
-                                    x0, y_grey, x1, y_white = pair
-                                    offset_x = x0 - 113
-                                    offset_y = y_white - 193
-                                    offsets = [offset_x, offset_y]
-                                else:
-                                    print(f"No matching grey/white line pair found, for folder: {folder_name} and type: {this_type}")
-                                    sys.exit(1)
-                            filename_base = os.path.splitext(filename)[0]
-                            text = process_image(img, roi_list, filename_base, benchmark_type, use_threshold_rectangles, offsets)
-                            extracted_values.append(text)
-                    except Exception as e:
-                        logging.error(f"Failed to process image {image_path}: {e}")
-            print("")
-            logging.info(f"Extracted Texts for {folder_name}: {', '.join(extracted_values)}")
+    if target_folder_name:
+        iso_items = [(target_folder_name, index.get(target_folder_name, {}))]
+    else:
+        iso_items = list(index.items())
+
+    # (folder_name, type, image paths), in processing order
+    groups = [
+        (folder_name, this_type, image_paths)
+        for folder_name, benches in iso_items
+        for this_type, image_paths in benches.items()
+        # If a specific benchmark type is requested, skip others
+        if not benchmark_type or this_type == benchmark_type
+    ]
 
-            # Store results in JSON-serializable structure
+    def discover():
+        # File discovery: jobs are produced lazily, as the pipeline has room
+        for group, (folder_name, this_type, image_paths) in enumerate(groups):
+            plan = get_roi_plan(folder_name, this_type)
+            for image_path in image_paths:
+                yield ScreenshotJob(group, folder_name, this_type, image_path, plan)
+
+    group_values = [[] for _ in groups]
+    flushed = 0
+
+    def flush(upto):
+        # Groups before `upto` are complete: log them and store their values
+        nonlocal flushed
+        while flushed < upto:
+            folder_name, this_type, _ = groups[flushed]
+            extracted_values = group_values[flushed]
+            print("")
+            logging.info(f"Extracted Texts for {folder_name}: {', '.join(r.text for r in extracted_values)}")
             aggregated_results[this_type].append({
                 "folder_name": folder_name,
                 "values": extracted_values
             })
-
-    if not debug and os.path.isdir(CROPPED_DIR):
-        for f in os.listdir(CROPPED_DIR):
-            try:
-                os.unlink(os.path.join(CROPPED_DIR, f))
-            except Exception as e:
-                logging.warning(f"Failed to delete {f}: {e}")
-        try:
-            os.rmdir(CROPPED_DIR)
-        except Exception as e:
-            logging.warning(f"Failed to remove cropped_images folder: {e}")
+            flushed += 1
+
+    pipeline = StreamingPipeline(
+        prepare=lambda job: prepare_screenshot(job, debug),
+        finish=finish_screenshot,
+        workers=get_backends(1 if debug else PIPELINE_OCR_THREADS),
+        prepare_threads=1 if debug else PIPELINE_DECODE_THREADS,
+        window=1 if debug else PIPELINE_WINDOW,
+    )
+    # Results come back in screenshot order, whatever order they finish in
+    for job, result, error in pipeline.run(discover()):
+        flush(job.group)
+        if error is not None:
+            logging.error(f"Failed to process image {job.image_path}: {error}")
+            if on_error:
+                on_error(job.folder_name, job.benchmark_type, job.image_path, error)
+            continue
+        # The run's one progress tick per screenshot
+        print(".", end="", flush=True)
+        group_values[job.group].append(result)
+        if on_result:
+            on_result(job.folder_name, job.benchmark_type, job.image_path, result.text)
+    flush(len(groups))
 
     if target_folder_name and benchmark_type:
-        return aggregated_results[benchmark_type][0]['values']
+        found = aggregated_results[benchmark_type]
+        return found[0]['values'] if found else []
     else:
         return aggregated_results
 
@@ -371,7 +609,7 @@ if __name__ == "__main__":
     parser.add_argument(
         '--debug',
         action='store_true',
-        help='Enable debug mode (keep cropped_images folder and its contents).'
+        help='Enable debug mode (write every ROI crop to the cropped_images folder, report per-image memory).'
     )
     parser.add_argument(
         '--folder-name',
@@ -382,9 +620,28 @@ if __name__ == "__main__":
         choices=['motionmark', 'speedometer', 'jetstream', 'passmark'],
         help='Limit processing to this benchmark type.'
     )
+    parser.add_argument(
+        '--ocr-backend',
+        default=OCR_BACKEND,
+        choices=sorted(BACKENDS),
+        help='OCR backend to use (see includes/ocr_backends.py).'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the OCR result cache.'
+    )
     args = parser.parse_args()
+    try:
+        set_backend(create_backend(args.ocr_backend))
+    except ValueError as e:
+        parser.error(str(e))
+    if not args.no_cache:
+        open_cache()
     result = ocr_reader(
         debug=args.debug,
         target_folder_name=args.folder_name,
         benchmark_type=args.type
     )
+    close_backend()
+    close_cache()
@@ -0,0 +1,46 @@
+# conftest.py
+#
+# The tests import the repo's modules the way main.py does (includes.*,
+# ocr_read), from the repo root. The `archive` fixture runs a test in a
+# fresh working directory holding a small synthetic data_collected (see
+# benchmarks/synthetic.py), read by the deterministic fake OCR backend.
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import pytest
+
+from pipeline_support import ISOS, SHOTS, CountingRecognizer
+
+
+@pytest.fixture
+def recognizer():
+    return CountingRecognizer()
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch, recognizer):
+    """A synthetic archive in ROOT_DIR of a fresh working directory, read by the fake backend."""
+    import includes.parallel
+    import main
+    from benchmarks.synthetic import SyntheticArchive
+    from includes.config import ROOT_DIR
+    from includes.ocr_backends import FakeOcrBackend, close_backend, set_backend
+
+    monkeypatch.chdir(tmp_path)
+    archive = SyntheticArchive(ROOT_DIR, shots=SHOTS, seed=0)
+    archive.add_isos(ISOS)
+
+    def fake_backend(name, **kwargs):
+        return FakeOcrBackend(recognizer=recognizer)
+
+    monkeypatch.setattr(main, "create_backend", fake_backend)
+    # --jobs workers are forked and build their own backend
+    monkeypatch.setattr(includes.parallel, "create_backend", fake_backend)
+    set_backend(fake_backend("fake"))
+    yield archive
+    close_backend()
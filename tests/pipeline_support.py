@@ -0,0 +1,69 @@
+# pipeline_support.py
+#
+# Helpers for the tests that run main.py on the synthetic archive of the
+# `archive` fixture (see conftest.py).
+
+import json
+import os
+import sys
+import threading
+
+from benchmarks.synthetic import SyntheticArchive, archive_entries, decode_strip
+from includes.config import BENCH_CONFIG, JSON_PATH, ROOT_DIR
+from includes.scan import SUBFOLDER_BY_BENCH
+
+ISOS = 3
+SHOTS = 4
+
+
+class CountingRecognizer:
+    """decode_strip, counting the crops it reads (in this process: not in --jobs workers)."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, image) -> str:
+        with self.lock:
+            self.calls += 1
+        return decode_strip(image)
+
+
+def run_main(monkeypatch, *args: str) -> int:
+    """main.main() with the given options (and --no-cache); returns its exit code."""
+    import main
+
+    monkeypatch.setattr(sys, "argv", ["main.py", "--no-cache", *args])
+    try:
+        main.main()
+    except SystemExit as e:
+        return e.code
+    return 0
+
+
+def load_entries() -> dict:
+    with open(JSON_PATH, "r", encoding="utf-8") as f:
+        return {entry["name"]: entry for entry in json.load(f)}
+
+
+def bench_folder(iso_name: str, bench_key: str) -> str:
+    return os.path.join(ROOT_DIR, iso_name, SUBFOLDER_BY_BENCH[bench_key])
+
+
+def results(entries) -> dict:
+    """{iso: {bench: OCR-derived fields}} of data_benchmarks.json entries."""
+    return {
+        entry["name"]: {
+            bench_key: {k: v for k, v in entry[bench_key].items() if k not in ("average", "highest", "lowest")}
+            for bench_key in BENCH_CONFIG.values()
+        }
+        for entry in entries
+    }
+
+
+def expected_results(archive: SyntheticArchive) -> dict:
+    return results(archive_entries(archive))
+
+
+def folder_values(archive: SyntheticArchive, folder: str) -> list:
+    return [archive.expected[os.path.join(folder, name)] for name in sorted(os.listdir(folder))]
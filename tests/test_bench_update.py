@@ -0,0 +1,126 @@
+# test_bench_update.py
+#
+# Rules 04(a)-(c) of includes/bench_update.py through main.py, on the
+# synthetic archive of the `archive` fixture: only new or changed
+# screenshots are read, and an unchanged archive is a no-op.
+
+import json
+import os
+import shutil
+
+import main
+from includes.config import JSON_PATH, PROVENANCE_PATH
+from includes.provenance import Provenance, load_provenance
+from includes.store import IsoStore
+from pipeline_support import (
+    bench_folder, expected_results, folder_values, load_entries, results, run_main,
+)
+
+
+def test_process_all_isos_stores_every_value(archive, recognizer):
+    store, failures = main.process_all_isos(Provenance(), use_cache=False)
+    try:
+        assert failures == []
+        assert store.names() == archive.iso_names
+        assert results(store.get(name) for name in store.names()) == expected_results(archive)
+        assert recognizer.calls > 0
+    finally:
+        store.close()
+
+
+def test_unchanged_screenshots_are_not_read_again(archive, monkeypatch, recognizer):
+    assert run_main(monkeypatch) == 0
+    first = load_entries()
+    assert results(first.values()) == expected_results(archive)
+
+    # 04(b): same files, same signatures, same config
+    recognizer.calls = 0
+    assert run_main(monkeypatch, "--full-scan") == 0
+    assert recognizer.calls == 0
+    assert load_entries() == first
+
+
+def test_only_new_screenshots_are_read(archive, monkeypatch, recognizer):
+    assert run_main(monkeypatch) == 0
+    iso_name = archive.iso_names[1]
+    folder = bench_folder(iso_name, "jetstream")
+    names = sorted(os.listdir(folder))
+
+    # A newer screenshot: one crop (JetStream has one ROI) is read
+    newest = os.path.join(folder, "2030-01-01-00-00-00.png")
+    shutil.copyfile(os.path.join(folder, names[0]), newest)
+    archive.expected[newest] = archive.expected[os.path.join(folder, names[0])]
+    recognizer.calls = 0
+    assert run_main(monkeypatch) == 0
+    assert recognizer.calls == 1
+    bench = load_entries()[iso_name]["jetstream"]
+    assert bench["latest"] == "2030-01-01-00-00-00"
+    assert bench["values"] == folder_values(archive, folder)
+
+    # A removed screenshot drops its value without any OCR
+    os.remove(os.path.join(folder, names[1]))
+    recognizer.calls = 0
+    assert run_main(monkeypatch) == 0
+    assert recognizer.calls == 0
+    assert load_entries()[iso_name]["jetstream"]["values"] == folder_values(archive, folder)
+
+
+def test_missing_and_older_screenshots_leave_the_bench_alone(archive, monkeypatch, recognizer):
+    iso_name = archive.iso_names[2]
+    # 04(a): no screenshot folder
+    shutil.rmtree(bench_folder(iso_name, "speedometer"))
+    # 04(b): without provenance, a stored "latest" at least as new wins
+    store = IsoStore([])
+    entry = store.get_or_create(iso_name)
+    entry["jetstream"].update({"latest": "2099-01-01-00-00-00", "values": ["111.111"]})
+    store.save(JSON_PATH)
+
+    assert run_main(monkeypatch) == 0
+    entry = load_entries()[iso_name]
+    assert entry["speedometer"]["values"] == []
+    assert entry["speedometer"]["latest"] == ""
+    assert entry["jetstream"]["values"] == ["111.111"]
+    assert entry["jetstream"]["latest"] == "2099-01-01-00-00-00"
+    assert entry["motionmark"]["values"] == folder_values(archive, bench_folder(iso_name, "motionmark"))
+
+
+def test_rerun_with_several_passmark_screenshots_is_a_no_op(archive, monkeypatch, recognizer):
+    iso_name = archive.iso_names[0]
+    folder = bench_folder(iso_name, "passmark")
+    first = os.path.join(folder, sorted(os.listdir(folder))[0])
+    # Another ISO's (different) result, in a newer screenshot
+    other_folder = bench_folder(archive.iso_names[1], "passmark")
+    other = os.path.join(other_folder, sorted(os.listdir(other_folder))[0])
+    newer = os.path.join(folder, "2030-01-01-00-00-00.png")
+    shutil.copyfile(other, newer)
+    archive.expected[newer] = archive.expected[other]
+    assert archive.expected[newer] != archive.expected[first]
+
+    assert run_main(monkeypatch) == 0
+    entries = load_entries()
+    # Only the first screenshot's result is stored
+    assert expected_results(archive)[iso_name]["passmark"] == results([entries[iso_name]])[iso_name]["passmark"]
+
+    recognizer.calls = 0
+    store, failures = main.process_all_isos(load_provenance(PROVENANCE_PATH), use_cache=False)
+    try:
+        assert failures == []
+        assert recognizer.calls == 0
+        assert not store.is_dirty()
+    finally:
+        store.close()
+
+
+def test_hand_edited_values_are_restored_from_provenance(archive, monkeypatch, recognizer):
+    assert run_main(monkeypatch) == 0
+    first = load_entries()
+    with open(JSON_PATH, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    data[0]["jetstream"]["values"][0] = "1.000"
+    with open(JSON_PATH, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+    recognizer.calls = 0
+    assert run_main(monkeypatch, "--full-scan") == 0
+    assert recognizer.calls == 0
+    assert load_entries() == first
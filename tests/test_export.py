@@ -0,0 +1,67 @@
+# test_export.py
+
+import filecmp
+import json
+import os
+import sys
+
+from includes import export
+from includes.export import COLUMNS, SUMMARY_NAME, benchmark_score, sort_orders, summary_row
+from includes.store import new_iso_entry, save_json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCORE = COLUMNS.index("benchmark_score")
+
+
+def entry(name: str, main: str, average: str) -> dict:
+    e = new_iso_entry(name)
+    e["passmark"]["main"] = main
+    for bench_key in ("motionmark", "jetstream", "speedometer"):
+        e[bench_key]["average"] = average
+    return e
+
+
+def run_export(monkeypatch, json_path: str, out_dir: str) -> dict:
+    monkeypatch.setattr(sys, "argv", ["export.py", "--json", json_path, "--out", out_dir])
+    export.main()
+    with open(os.path.join(out_dir, SUMMARY_NAME), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_benchmark_score_rounds_halves_up():
+    assert benchmark_score({"benchmark_avg": "52.50"}) == 53
+    assert benchmark_score({"benchmark_avg": "52.49"}) == 52
+    assert benchmark_score({"benchmark_avg": ""}) is None
+
+
+def test_export_cli_fills_the_avg_benchmark_column(tmp_path, monkeypatch):
+    json_path = str(tmp_path / "data.json")
+    # No benchmark_avg in the JSON, as before the stats engine
+    save_json(json_path, [entry("A", "400.0", "100.0"), entry("B", "800.0", "300.0"), entry("C", "600.0", "200.0")])
+    summary = run_export(monkeypatch, json_path, str(tmp_path / "data"))
+    assert [row[SCORE] for row in summary["rows"]] == [0, 100, 50]
+    assert summary["order"][str(SCORE)] == [0, 2, 1]
+
+
+def test_committed_export_matches_the_committed_json(tmp_path, monkeypatch):
+    out_dir = str(tmp_path / "data")
+    run_export(monkeypatch, os.path.join(ROOT, "data_benchmarks.json"), out_dir)
+    committed = os.path.join(ROOT, "data")
+    assert filecmp.cmp(os.path.join(out_dir, SUMMARY_NAME), os.path.join(committed, SUMMARY_NAME), shallow=False)
+    names = sorted(os.listdir(os.path.join(out_dir, "iso")))
+    assert names == sorted(os.listdir(os.path.join(committed, "iso")))
+    _, mismatch, errors = filecmp.cmpfiles(os.path.join(out_dir, "iso"), os.path.join(committed, "iso"), names, shallow=False)
+    assert mismatch == errors == []
+
+
+def test_sort_orders_put_numbers_before_text_and_keep_ties():
+    rows = [summary_row(new_iso_entry(name)) for name in "ABCD"]
+    for row, score in zip(rows, [12, "N/A", 9, 12]):
+        row[SCORE] = score
+    for row, values in zip(rows, [[10, 5, 1], [None, None, None], [20, 6, 2], [3, 3, 3]]):
+        row[COLUMNS.index("motionmark")] = values
+    orders = sort_orders(rows)
+    assert orders[str(SCORE)] == [2, 0, 3, 1]
+    motionmark = COLUMNS.index("motionmark")
+    assert orders[f"{motionmark}:max"] == [3, 0, 2, 1]
+    assert orders[f"{motionmark}:min"] == [0, 2, 3, 1]
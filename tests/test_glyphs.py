@@ -0,0 +1,66 @@
+# test_glyphs.py
+#
+# Accuracy of the glyph-template OCR backend on labeled crops rendered with
+# PIL: templates learned from one set of values, read back on another.
+
+import random
+from typing import List
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from benchmarks.synthetic import random_tokens
+from includes.glyphs import GlyphRecognizer, Sample, build_templates, evaluate
+
+BENCHES = ("jetstream", "speedometer", "motionmark", "passmark")
+FONT_SIZES = (14, 18, 22, 28)
+
+# Held-out crops read exactly, and the worst confidence of a read
+MIN_ACCURACY = 0.98
+MIN_CONFIDENCE = 0.5
+
+
+def labeled_crops(seed: int, n: int, light: bool = False) -> List[Sample]:
+    """n ROI-like crops of random benchmark values, one token each."""
+    rnd = random.Random(seed)
+    background, text = ((240, 240, 240), (20, 20, 20)) if light else ((30, 30, 30), (220, 220, 220))
+    samples = []
+    while len(samples) < n:
+        bench_key = rnd.choice(BENCHES)
+        font = ImageFont.load_default(size=rnd.choice(FONT_SIZES))
+        for token in random_tokens(bench_key, rnd):
+            _, _, right, bottom = font.getbbox(token)
+            img = Image.new("RGB", (right + 12, bottom + 10), background)
+            ImageDraw.Draw(img).text((6, 4), token, fill=text, font=font)
+            samples.append((np.asarray(img), token, bench_key))
+    return samples
+
+
+@pytest.fixture(scope="module")
+def recognizer() -> GlyphRecognizer:
+    templates, report = build_templates(labeled_crops(seed=1, n=600))
+    assert report["used"] > 0.9 * (report["used"] + report["skipped"])
+    return GlyphRecognizer(templates)
+
+
+@pytest.mark.parametrize("light", [False, True], ids=["light-on-dark", "dark-on-light"])
+def test_held_out_accuracy(recognizer, light):
+    result = evaluate(recognizer, labeled_crops(seed=2, n=400, light=light))
+    assert result["crops"] >= 400
+    assert result["accuracy"] >= MIN_ACCURACY, result
+    assert result["min_confidence"] >= MIN_CONFIDENCE, result
+
+
+def test_touching_glyphs_are_split(recognizer):
+    # At this size the '/' and 'A' of "N/A" share columns
+    font = ImageFont.load_default(size=28)
+    img = Image.new("RGB", (70, 40), (30, 30, 30))
+    ImageDraw.Draw(img).text((6, 4), "N/A", fill=(220, 220, 220), font=font)
+    text, confidence = recognizer.read(np.asarray(img))
+    assert text == "N/A"
+    assert confidence >= MIN_CONFIDENCE
+
+
+def test_blank_crop(recognizer):
+    assert recognizer.read(np.full((30, 60, 3), 30, dtype=np.uint8)) == ("", 0.0)
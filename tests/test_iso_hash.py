@@ -0,0 +1,63 @@
+# test_iso_hash.py
+
+import hashlib
+import os
+
+from includes.iso_hash import generate_file, hash_files, update_iso_metadata
+from includes.store import IsoStore, new_iso_entry
+
+CHUNK_BYTES = 2**20
+
+
+def sha1_of(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def test_hash_files_matches_hashlib(tmp_path):
+    # Several chunks plus a partial one, on more threads than files
+    paths = [str(tmp_path / f"image-{i}.iso") for i in range(2)]
+    for path in paths:
+        generate_file(path, 5)
+    with open(paths[1], "ab") as f:
+        f.write(b"tail")
+
+    result = hash_files(paths, threads=4, chunk_bytes=CHUNK_BYTES)
+    assert result["errors"] == {}
+    assert result["hashes"] == {path: sha1_of(path) for path in paths}
+    assert result["bytes"] == sum(os.path.getsize(path) for path in paths)
+
+
+def test_hash_files_reports_unreadable_files(tmp_path):
+    missing = str(tmp_path / "missing.iso")
+    result = hash_files([missing], chunk_bytes=CHUNK_BYTES)
+    assert result["hashes"] == {}
+    assert "FileNotFoundError" in result["errors"][missing]
+
+
+def test_update_iso_metadata_uses_the_hash_cache(tmp_path):
+    iso_dir = tmp_path / "isos"
+    iso_dir.mkdir()
+    path = str(iso_dir / "Example.iso")
+    generate_file(path, 3)
+    cache_path = str(tmp_path / "hashes.json")
+    store = IsoStore([new_iso_entry("Example")])
+
+    assert update_iso_metadata(store, str(iso_dir), cache_path)["hashed"] == 1
+    entry = store.get("Example")
+    assert entry["iso_file_name"] == "Example.iso"
+    assert entry["iso_sha1"] == sha1_of(path)
+    assert store.is_dirty("Example")
+
+    # Same size and mtime: the SHA-1 comes from the cache, nothing changes
+    store.mark_clean()
+    assert update_iso_metadata(store, str(iso_dir), cache_path)["hashed"] == 0
+    assert not store.is_dirty()
+
+    # A new mtime invalidates the cached SHA-1, even with the same content
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 3600 * 10**9))
+    assert update_iso_metadata(store, str(iso_dir), cache_path)["hashed"] == 1
+    assert entry["iso_sha1"] == sha1_of(path)
+    # Only the shown date changed
+    assert store.is_dirty("Example")
@@ -0,0 +1,75 @@
+# test_journal.py
+
+import json
+import os
+
+from includes.config import FAILURE_REPORT_PATH
+from includes.journal import ROTATED_SUFFIX, RunJournal, load_journal
+from pipeline_support import bench_folder, folder_values, load_entries, run_main
+
+SIGNATURE = {"size": 10, "mtime_ns": 20}
+
+
+def test_journal_replays_the_last_record_per_file(tmp_path):
+    path = str(tmp_path / "run_journal.jsonl")
+    journal = RunJournal(path)
+    journal.record("A", "jetstream", "/x/2025-01-01-09-00-00.png", SIGNATURE, "fp", "1.000")
+    journal.record("A", "jetstream", "/x/2025-01-01-09-00-00.png", SIGNATURE, "fp", "2.000")
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"iso": "A", "bench"')  # torn last line
+
+    resumed = RunJournal(path, resume=True)
+    paths = ["/y/2025-01-01-09-00-00.png"]
+    assert resumed.resumed_values("A", "jetstream", "fp", {paths[0]: SIGNATURE}, paths) == {paths[0]: "2.000"}
+    # Another ROI/parser fingerprint or file signature: read again
+    assert resumed.resumed_values("A", "jetstream", "fp2", {paths[0]: SIGNATURE}, paths) == {}
+    assert resumed.resumed_values("A", "jetstream", "fp", {paths[0]: dict(SIGNATURE, size=11)}, paths) == {}
+    resumed.record("A", "speedometer", "/x/2025-01-01-09-00-00.png", SIGNATURE, "fp", "9.9")
+    resumed.close()
+    assert len(load_journal(path)) == 2
+
+
+def test_run_without_resume_keeps_the_unfinished_journal(tmp_path):
+    path = str(tmp_path / "run_journal.jsonl")
+    journal = RunJournal(path)
+    journal.record("A", "jetstream", "/x/2025-01-01-09-00-00.png", SIGNATURE, "fp", "1.000")
+    journal.close()
+
+    fresh = RunJournal(path)
+    fresh.close()
+    assert os.path.getsize(path) == 0
+    assert list(load_journal(path + ROTATED_SUFFIX)) == [("A", "jetstream", "2025-01-01-09-00-00.png")]
+
+    # An empty journal is not worth a rotation
+    RunJournal(path).discard()
+    assert not os.path.exists(path)
+    assert len(load_journal(path + ROTATED_SUFFIX)) == 1
+
+
+def test_unreadable_screenshot_marks_the_iso_failed(archive, monkeypatch):
+    iso_name = archive.iso_names[0]
+    folder = bench_folder(iso_name, "motionmark")
+    broken = os.path.join(folder, sorted(os.listdir(folder))[0])
+    good = broken + ".bak"
+    os.rename(broken, good)
+    with open(broken, "wb") as f:
+        f.write(b"not a png")
+
+    assert run_main(monkeypatch) == 1
+    entries = load_entries()
+    assert entries[iso_name]["status"] == "Error"
+    # The failed bench is left untouched, the others are stored
+    assert entries[iso_name]["motionmark"]["values"] == []
+    assert entries[iso_name]["jetstream"]["values"] == folder_values(archive, bench_folder(iso_name, "jetstream"))
+    assert all(entries[name]["status"] == "" for name in archive.iso_names[1:])
+    with open(FAILURE_REPORT_PATH, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    assert [(r["iso"], r["bench"], r["file"]) for r in report] == [(iso_name, "motionmark", os.path.basename(broken))]
+
+    # Fixed: the next run stores the bench and clears the status
+    os.replace(good, broken)
+    assert run_main(monkeypatch) == 0
+    entry = load_entries()[iso_name]
+    assert entry["status"] == ""
+    assert entry["motionmark"]["values"] == folder_values(archive, folder)
@@ -0,0 +1,70 @@
+# test_ocr_backends.py
+
+import hashlib
+import io
+import json
+import os
+import sys
+
+import pytest
+from PIL import Image
+
+from benchmarks.synthetic import decode_strip
+from includes import ocr_backends
+from includes.frame import Frame
+from includes.ocr_backends import FakeOcrBackend, create_backend, encode_image, serve_worker
+from ocr_read import get_roi_plan, process_image, screenshot_offsets
+from pipeline_support import bench_folder
+
+
+def test_fake_backend_answers_by_pixels():
+    image = Image.new("L", (8, 4), 255)
+    digest = hashlib.sha1(image.tobytes()).hexdigest()
+    backend = create_backend("fake", answers={digest: "12.5"}, default="?")
+    assert backend.recognize_many([image, Image.new("L", (8, 4), 0)]) == ["12.5", "?"]
+    assert backend.stats()["images"] == 2
+
+
+def test_serve_worker_speaks_the_line_protocol():
+    image = Image.new("L", (8, 4), 255)
+    requests = json.dumps(encode_image(image)) + "\n\n" + json.dumps({"mode": "L"}) + "\n"
+    replies = io.StringIO()
+    serve_worker(FakeOcrBackend(default="7"), stdin=io.StringIO(requests), stdout=replies)
+    first, second = [json.loads(line) for line in replies.getvalue().splitlines()]
+    assert first == {"text": "7"}
+    assert "error" in second
+
+
+@pytest.mark.parametrize("bench_key", ["motionmark", "jetstream", "speedometer", "passmark"])
+def test_process_image_reads_every_roi(archive, bench_key):
+    iso_name = archive.iso_names[0]
+    folder = bench_folder(iso_name, bench_key)
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        frame = Frame.open(path)
+        offsets = screenshot_offsets(frame, bench_key)
+        assert offsets is not None
+        result = process_image(
+            frame, get_roi_plan(iso_name, bench_key), os.path.splitext(name)[0], bench_key, offsets,
+            backend=FakeOcrBackend(recognizer=decode_strip),
+        )
+        assert result.text == archive.expected[path]
+
+
+def test_worker_backend_needs_a_command(monkeypatch):
+    monkeypatch.setattr(ocr_backends, "OCR_WORKER_COMMAND", None)
+    with pytest.raises(ValueError, match="OCR_WORKER_COMMAND"):
+        create_backend("worker")
+
+
+def test_worker_backend_keeps_one_worker_process():
+    backend = create_backend("worker", command=[sys.executable, "-m", "includes.ocr_backends", "--serve", "fake"])
+    try:
+        images = [Image.new("L", (8, 4), value) for value in (0, 255)]
+        assert backend.recognize_many(images) == ["0", "0"]
+        proc = backend.proc
+        assert backend.recognize(images[0]) == "0"
+        assert backend.proc is proc and proc.poll() is None
+    finally:
+        backend.close()
+    assert proc.poll() is not None
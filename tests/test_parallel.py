@@ -0,0 +1,24 @@
+# test_parallel.py
+
+import os
+import shutil
+
+from includes.config import JSON_PATH, ROOT_DIR
+from pipeline_support import expected_results, load_entries, results, run_main
+
+
+def test_jobs_output_matches_serial(archive, monkeypatch, tmp_path):
+    assert run_main(monkeypatch, "--jobs", "1") == 0
+    with open(JSON_PATH, "rb") as f:
+        serial = f.read()
+
+    for name in os.listdir(tmp_path):
+        if name.startswith(("data_", "run_")) and name != os.path.basename(ROOT_DIR):
+            path = os.path.join(tmp_path, name)
+            shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+    assert not os.path.exists(JSON_PATH)
+
+    assert run_main(monkeypatch, "--jobs", "2") == 0
+    with open(JSON_PATH, "rb") as f:
+        assert f.read() == serial
+    assert results(load_entries().values()) == expected_results(archive)
@@ -0,0 +1,65 @@
+# test_pipeline.py
+
+import threading
+import time
+
+import pytest
+
+from includes.pipeline import StreamingPipeline
+
+
+def slow_square(worker, x):
+    time.sleep(0.001 * (x % 3))
+    return worker, x * x
+
+
+def test_results_come_back_in_input_order():
+    pipeline = StreamingPipeline(prepare=lambda x: x, finish=slow_square, workers=["a", "b", "c"], window=4)
+    results = list(pipeline.run(range(50)))
+    assert [item for item, _, _ in results] == list(range(50))
+    assert [result[1] for _, result, _ in results] == [x * x for x in range(50)]
+    assert {result[0] for _, result, _ in results} <= {"a", "b", "c"}
+
+
+def test_a_stage_exception_is_that_items_error():
+    def prepare(x):
+        if x == 3:
+            raise ValueError("bad screenshot")
+        return x
+
+    results = list(StreamingPipeline(prepare=prepare, finish=slow_square, workers=[0]).run(range(6)))
+    errors = {item: error for item, _, error in results if error is not None}
+    assert list(errors) == [3]
+    assert isinstance(errors[3], ValueError)
+    assert len(results) == 6
+
+
+@pytest.mark.parametrize("stage", ["prepare", "finish"])
+def test_keyboard_interrupt_in_a_stage_stops_the_run(stage):
+    def interrupt_at_5(x):
+        if x == 5:
+            raise KeyboardInterrupt
+        return x
+
+    if stage == "prepare":
+        pipeline = StreamingPipeline(prepare=interrupt_at_5, finish=lambda w, x: x, workers=[0, 1])
+    else:
+        pipeline = StreamingPipeline(prepare=lambda x: x, finish=lambda w, x: interrupt_at_5(x), workers=[0, 1])
+
+    seen = []
+    outcome = {}
+
+    def consume():
+        try:
+            for item, _, _ in pipeline.run(range(100)):
+                seen.append(item)
+        except BaseException as e:
+            outcome["raised"] = e
+
+    thread = threading.Thread(target=consume, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "pipeline hung after a KeyboardInterrupt in a stage"
+    assert isinstance(outcome.get("raised"), KeyboardInterrupt)
+    assert 5 not in seen
+    assert not [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
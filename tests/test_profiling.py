@@ -0,0 +1,70 @@
+# test_profiling.py
+
+import json
+import threading
+
+import pytest
+
+from includes import profiling
+from includes.profiling import Profiler, count, percentiles, span
+
+
+@pytest.fixture
+def profiler():
+    yield profiling.enable_profiling()
+    profiling.disable_profiling()
+
+
+def test_spans_and_counters_while_profiling_is_off():
+    profiling.disable_profiling()
+    with span("decode") as s:
+        pass
+    count("images")
+    assert s is profiling._NULL_SPAN
+    assert profiling.get_profiler() is None
+
+
+def test_counters_from_many_threads_add_up(profiler):
+    def work():
+        for _ in range(2000):
+            count("images")
+            with span("ocr", bench="jetstream"):
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert profiler.counters["images"] == 16000
+    assert len(profiler.events) == 16000
+
+
+def test_worker_exports_merge_into_one_trace(profiler, tmp_path):
+    with span("plan", iso="A", bench="jetstream"):
+        pass
+    worker = Profiler()
+    worker.add_span("image", 0, 2_000_000, {"iso": "A", "bench": "jetstream"})
+    worker.count("images", 3)
+    snapshot = worker.export()
+    assert worker.events == [] and worker.counters == {}
+
+    profiler.merge(json.loads(json.dumps(snapshot)))
+    profiler.merge(None)
+    assert profiler.counters["images"] == 3
+
+    path = str(tmp_path / "trace.json")
+    profiler.write_trace(path)
+    with open(path, "r", encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    spans = sorted(e["name"] for e in events if e["ph"] == "X")
+    assert spans == ["image", "plan"]
+    assert [e["args"] for e in events if e["ph"] == "C"] == [{"images": 3}]
+    image = next(e for e in events if e["name"] == "image")
+    assert image["dur"] == 2000
+    assert "jetstream" in profiler.summary()
+
+
+def test_percentiles_are_nearest_rank():
+    assert percentiles(range(1, 101), (0.5, 0.95)) == [51, 96]
+    assert percentiles([], (0.5,)) == [0.0]
@@ -0,0 +1,66 @@
+# test_records.py
+
+import math
+
+import numpy as np
+import pytest
+
+from includes.records import (
+    MotionMarkResult, PassmarkResult, ResultParseError, parse_result, parse_stored, passmark_text,
+    records_array, stored_results,
+)
+from includes.store import new_iso_entry
+
+
+def test_each_bench_parses_into_its_record():
+    assert parse_result("jetstream", "150.123").score == 150.123
+    assert parse_result("speedometer", "31.6").score == 31.6
+    assert parse_result("motionmark", "495.02 @60fps 34.53%") == MotionMarkResult(495.02, 60.0, 34.53, "495.02 @60fps 34.53%")
+
+    result = parse_result("passmark", "600.5 5000 50 N/A 2000 N/A")
+    assert result == PassmarkResult(600.5, 5000.0, 50.0, None, 2000.0, None, "600.5 5000 50 N/A 2000 N/A")
+    assert result.score == 600.5
+    assert result.fields() == {"main": "600.5", "cpu": "5000", "2d": "50", "3d": "N/A", "memory": "2000", "disk": "N/A"}
+
+
+@pytest.mark.parametrize("bench_key, text", [
+    ("jetstream", "1.2.3"),
+    ("speedometer", "31."),
+    ("motionmark", "495.02 @60fps"),
+    ("passmark", "600 5000 50"),
+    ("passmark", "600 cpu 50 N/A 2000 N/A"),
+])
+def test_invalid_text_raises_and_parses_as_none_when_stored(bench_key, text):
+    with pytest.raises(ResultParseError):
+        parse_result(bench_key, text)
+    assert parse_stored(bench_key, text) is None
+
+
+def test_parse_stored_ignores_non_strings():
+    assert parse_stored("jetstream", None) is None
+    assert parse_stored("jetstream", 150.0) is None
+
+
+def test_stored_results_follow_the_entry():
+    entry = new_iso_entry("A")
+    assert stored_results("jetstream", entry["jetstream"]) == []
+    assert stored_results("passmark", entry["passmark"]) == []
+    assert stored_results("jetstream", None) == []
+
+    entry["jetstream"]["values"] = ["140.000", "oops"]
+    assert [r and r.score for r in stored_results("jetstream", entry["jetstream"])] == [140.0, None]
+
+    entry["passmark"].update({"main": "600.0", "cpu": "5000.0", "2d": "50.0", "3d": "N/A", "memory": "2000.0", "disk": "N/A"})
+    assert passmark_text(entry["passmark"]) == "600.0 5000.0 50.0 N/A 2000.0 N/A"
+    [result] = stored_results("passmark", entry["passmark"])
+    assert result.fields() == {field: entry["passmark"][field] for field in result.fields()}
+
+
+def test_records_array_is_nan_for_missing_values():
+    scores = records_array("jetstream", [parse_result("jetstream", "1.5"), None])
+    assert scores.shape == (2,) and scores[0] == 1.5 and math.isnan(scores[1])
+
+    matrix = records_array("passmark", [parse_result("passmark", "600 5000 50 N/A 2000 N/A")])
+    assert matrix.shape == (1, 6) and matrix.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(matrix[0], [600, 5000, 50, np.nan, 2000, np.nan])
+    assert records_array("motionmark", []).shape == (0, 3)
@@ -0,0 +1,115 @@
+# test_render.py
+
+import json
+import os
+
+import pytest
+
+from includes.export import SUMMARY_NAME, export_site
+from includes.render import ROWS_BEGIN, ROWS_END, render_site, sort_ranks, splice_rows, svg_fragment
+from includes.store import new_iso_entry
+
+PAGE = f"<table>\n        {ROWS_BEGIN}\n        {ROWS_END}\n</table>\n"
+
+
+def entries():
+    out = []
+    for i, (main, average, status) in enumerate([("600.0", "150.000", "Success"), ("400.0", "120.500", ""), ("800.0", "99.000", "Error")]):
+        entry = new_iso_entry(f"B{i:02d}. ISO {i}")
+        entry["passmark"]["main"] = main
+        entry["jetstream"].update({"average": average, "highest": average, "lowest": average})
+        entry["status"] = status
+        out.append(entry)
+    return out
+
+
+@pytest.fixture
+def site(tmp_path):
+    paths = {
+        "out": str(tmp_path / "data"),
+        "index": str(tmp_path / "index.html"),
+        "svg": str(tmp_path / "table.svg"),
+        "cache": str(tmp_path / "render_cache.json"),
+    }
+    with open(paths["index"], "w", encoding="utf-8") as f:
+        f.write(PAGE)
+    return paths
+
+
+def render(site, data, cache=None):
+    export_site(data, site["out"])
+    return render_site(
+        os.path.join(site["out"], SUMMARY_NAME), site["index"], site["svg"], cache or site["cache"],
+    )
+
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_only_changed_rows_are_rendered_again(site, tmp_path):
+    data = entries()
+    assert render(site, data)["rows_rendered"] == 3
+    result = render(site, data)
+    assert result == {"rows_rendered": 0, "index_written": 0, "svg_written": 0}
+
+    data[1]["jetstream"]["average"] = "130.250"
+    result = render(site, data)
+    assert result["rows_rendered"] == 1 and result["index_written"] == 1
+    cached = (read(site["index"]), read(site["svg"]))
+
+    # Same pages as a render without any cache
+    with open(site["index"], "w", encoding="utf-8") as f:
+        f.write(PAGE)
+    assert render(site, data, cache=str(tmp_path / "fresh.json"))["rows_rendered"] == 3
+    assert (read(site["index"]), read(site["svg"])) == cached
+
+
+def test_identical_rows_share_one_cached_fragment(site):
+    data = entries()
+    data.append(json.loads(json.dumps(data[0])))
+    assert render(site, data)["rows_rendered"] == 3
+    assert read(site["index"]).count("B00. ISO 0") == 2
+
+
+def test_sort_ranks_invert_every_slot_order():
+    summary = {"rows": [[], [], []], "order": {"4": [2, 0, 1], "5:max": [0, 1, 2]}}
+    slots, ranks = sort_ranks(summary)
+    assert slots == ["4", "5:max"]
+    assert ranks == [[1, 0], [2, 1], [0, 2]]
+
+
+def test_rows_carry_their_sort_ranks(site):
+    render(site, entries())
+    summary = json.loads(read(os.path.join(site["out"], SUMMARY_NAME)))
+    slots, ranks = sort_ranks(summary)
+    page = read(site["index"])
+    assert f'data-sort-slots="{" ".join(slots)}"' in page
+    for row_ranks in ranks:
+        assert f'data-sort="{" ".join(map(str, row_ranks))}"' in page
+
+
+def test_status_classes_are_known_values_only(site):
+    data = entries()
+    data[1]["status"] = '"><script>alert(1)</script>'
+    render(site, data)
+    page = read(site["index"])
+    assert '<div class="bubble-row status-success">' in page
+    assert '<div class="bubble-row status-error">' in page
+    assert "<script>" not in page
+    assert "&lt;script&gt;" in page
+    assert '<div class="bubble-row ">' in page
+
+
+def test_svg_row_shows_the_default_phases():
+    row = ["x.iso", "Name", None, None, 42, [3, 2, 1], [6, 5, 4], ["9", "8", "7"], ["1", "2", "3", "4"], None, None, None, "Warning"]
+    tr = svg_fragment(row)
+    assert '<td class="status-warning">Warning</td>' in tr
+    assert "<td>2</td>" in tr and "<td>5</td>" in tr and "<td>8</td>" in tr and "<td>1</td>" in tr
+
+
+def test_splice_rows_needs_both_markers():
+    assert "<tr>" in splice_rows(PAGE, "<tr>")
+    with pytest.raises(ValueError):
+        splice_rows("<table></table>", "<tr>")
@@ -0,0 +1,87 @@
+# test_scan.py
+
+import logging
+import os
+import shutil
+import time
+
+from includes.config import BENCH_CONFIG, JSON_PATH, ROOT_DIR
+from includes.scan import ScanManifest, scan_root
+from pipeline_support import bench_folder, run_main
+
+KEY = "data.json:1|config"
+
+
+def age_folders(root_dir: str, seconds: int = 3600) -> None:
+    """Backdate every folder past MANIFEST_SETTLE_NS, as if the archive were old."""
+    past_ns = time.time_ns() - seconds * 10**9
+    for folder, _, _ in os.walk(root_dir):
+        os.utime(folder, ns=(past_ns, past_ns))
+
+
+def all_pairs(archive) -> set:
+    return {(iso_name, bench_key) for iso_name in archive.iso_names for bench_key in BENCH_CONFIG.values()}
+
+
+def scan(path: str, key: str = KEY):
+    manifest = ScanManifest.load(path, key)
+    index = scan_root(ROOT_DIR, manifest)
+    listed = {(iso_name, bench_key) for iso_name, benches in index.items() for bench_key in benches}
+    return manifest, index, listed
+
+
+def test_manifest_skips_unchanged_bench_folders(archive, tmp_path):
+    path = str(tmp_path / "manifest.json")
+    age_folders(ROOT_DIR)
+    manifest, index, listed = scan(path)
+    assert listed == all_pairs(archive)
+    assert index == scan_root(ROOT_DIR)
+    manifest.save(path)
+
+    manifest, index, listed = scan(path)
+    assert listed == set()
+    assert manifest.skipped == all_pairs(archive)
+    # Every ISO still gets an entry
+    assert sorted(index) == sorted(archive.iso_names)
+
+    # A new screenshot: only its folder is listed, in full
+    iso_name = archive.iso_names[1]
+    folder = bench_folder(iso_name, "jetstream")
+    names = sorted(os.listdir(folder))
+    shutil.copyfile(os.path.join(folder, names[0]), os.path.join(folder, "2030-01-01-00-00-00.png"))
+    manifest.save(path)
+    manifest, index, listed = scan(path)
+    assert listed == {(iso_name, "jetstream")}
+    assert [os.path.basename(p) for p in index[iso_name]["jetstream"]] == names + ["2030-01-01-00-00-00.png"]
+
+    # Modified just now: not recorded as clean, so listed again next time
+    manifest.save(path)
+    assert scan(path)[2] == {(iso_name, "jetstream")}
+
+
+def test_manifest_lists_failed_pairs_and_other_keys_again(archive, tmp_path):
+    path = str(tmp_path / "manifest.json")
+    age_folders(ROOT_DIR)
+    manifest, _, _ = scan(path)
+    failed = (archive.iso_names[0], "motionmark")
+    manifest.save(path, failed={failed})
+
+    assert scan(path)[2] == {failed}
+    # Another JSON or ROI/parser config: nothing is trusted
+    assert scan(path, key="data.json:2|config")[2] == all_pairs(archive)
+
+
+def test_runs_without_full_scan_skip_unchanged_folders(archive, monkeypatch, recognizer, caplog):
+    age_folders(ROOT_DIR)
+    assert run_main(monkeypatch) == 0
+    with open(JSON_PATH, "rb") as f:
+        first = f.read()
+
+    recognizer.calls = 0
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        assert run_main(monkeypatch) == 0
+    assert recognizer.calls == 0
+    assert f"Scan manifest: {len(all_pairs(archive))} unchanged bench folder(s) skipped" in caplog.messages
+    with open(JSON_PATH, "rb") as f:
+        assert f.read() == first
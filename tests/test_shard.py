@@ -0,0 +1,112 @@
+# test_shard.py
+
+import itertools
+import os
+
+import pytest
+
+from includes.config import BENCH_CONFIG, JSON_PATH, SHARD_PARTIAL_PATH
+from includes.shard import in_shard, merge_partials, parse_shard, shard_of
+from includes.store import IsoStore, new_iso_entry
+from pipeline_support import expected_results, load_entries, results, run_main
+
+
+def unit(latest, values, files=None, iso="A", bench="jetstream"):
+    out = {"iso": iso, "bench": bench, "result": {"latest": latest, "values": values}}
+    if files is not None:
+        out["files"] = files
+    return out
+
+
+def partial(*units, failures=()):
+    return {"version": 1, "shard": "1/2", "units": list(units), "failures": list(failures)}
+
+
+def stored_store(latest="2025-01-01-00-00-00", values=("100.000",), status=""):
+    entry = new_iso_entry("A")
+    entry["jetstream"].update({"latest": latest, "values": list(values)})
+    entry["status"] = status
+    return IsoStore([entry])
+
+
+def test_parse_shard():
+    assert parse_shard("2/3") == (2, 3)
+    for text in ("0/3", "4/3", "1/0", "x", "1/2/3"):
+        with pytest.raises(ValueError):
+            parse_shard(text)
+
+
+def test_every_unit_is_in_exactly_one_shard():
+    units = list(itertools.product([f"ISO {i}" for i in range(20)], BENCH_CONFIG.values()))
+    for count in (1, 2, 3):
+        owners = [[i for i in range(1, count + 1) if in_shard(iso, bench, (i, count))] for iso, bench in units]
+        assert all(len(o) == 1 for o in owners)
+        assert [o[0] for o in owners] == [shard_of(iso, bench, count) for iso, bench in units]
+    assert all(in_shard(iso, bench, None) for iso, bench in units)
+
+
+def test_newest_latest_wins_whatever_the_partials_order():
+    newer = unit("2025-02-01-00-00-00", ["120.000"])
+    older = unit("2024-12-01-00-00-00", ["90.000"], files=["2024-12-01-00-00-00"])
+    for partials in ([partial(newer), partial(older)], [partial(older), partial(newer)]):
+        store = stored_store()
+        assert merge_partials(store, partials)[0] == 1
+        assert store.get("A")["jetstream"]["values"] == ["120.000"]
+
+    # Older than the stored result: ignored, even though recomputed
+    store = stored_store()
+    assert merge_partials(store, [partial(older)])[0] == 0
+    assert store.get("A")["jetstream"]["values"] == ["100.000"]
+
+
+def test_a_recomputed_result_replaces_one_as_new():
+    latest = "2025-01-01-00-00-00"
+    copied = unit(latest, ["90.000"])
+    recomputed = unit(latest, ["95.000"], files=[latest])
+
+    store = stored_store(latest)
+    assert merge_partials(store, [partial(copied)])[0] == 0
+    assert store.get("A")["jetstream"]["values"] == ["100.000"]
+
+    for partials in ([partial(copied), partial(recomputed)], [partial(recomputed), partial(copied)]):
+        store = stored_store(latest)
+        assert merge_partials(store, partials)[0] == 1
+        assert store.get("A")["jetstream"]["values"] == ["95.000"]
+        assert store.result_files[("A", "jetstream")] == [latest]
+        # Merging the same partials again changes nothing
+        assert merge_partials(store, partials)[0] == 0
+
+
+def test_merge_clears_the_error_status_and_keeps_one_failure_per_file():
+    failure = {"iso": "A", "bench": "jetstream", "file": "a.png", "error": "boom"}
+    store = stored_store(status="Error")
+    changed, failures = merge_partials(store, [partial(unit("2024-01-01-00-00-00", ["1.000"]), failures=[failure]), partial(failures=[failure])])
+    assert changed == 0
+    assert store.get("A")["status"] == ""
+    assert failures == [failure]
+
+    # A new ISO is added to the store
+    assert merge_partials(store, [partial(unit("2025-01-01-00-00-00", ["2.000"], iso="B"))])[0] == 1
+    assert store.names() == ["A", "B"]
+
+
+def test_merged_shards_match_an_unsharded_run(archive, monkeypatch):
+    paths = []
+    for index in (1, 2):
+        path = SHARD_PARTIAL_PATH.format(index=index, count=2)
+        assert run_main(monkeypatch, "--shard", f"{index}/2") == 0
+        assert os.path.exists(path)
+        paths.append(path)
+    # Shards leave the JSON alone
+    assert not os.path.exists(JSON_PATH)
+
+    assert run_main(monkeypatch, "--merge", *paths) == 0
+    merged = load_entries()
+    assert results(merged.values()) == expected_results(archive)
+    with open(JSON_PATH, "rb") as f:
+        first = f.read()
+
+    # Merging again is a no-op
+    assert run_main(monkeypatch, "--merge", *reversed(paths)) == 0
+    with open(JSON_PATH, "rb") as f:
+        assert f.read() == first
@@ -0,0 +1,83 @@
+# test_stats.py
+
+import math
+import statistics
+
+import numpy as np
+import pytest
+
+from includes.records import parse_stored
+from includes.stats import (
+    TRIM_FRACTION, batch_stats, composite_scores, compute_bench_stats, format_bench_fields,
+)
+
+ROWS = [
+    [163.304, 150.25, 171.5, 149.0, 158.75, 160.0, 155.5, 162.125, 170.0, 148.5, 166.0],
+    [12.5, 9.0],
+    [],
+    [7.25],
+]
+
+
+def trimmed_mean(values, trim=TRIM_FRACTION):
+    ordered = sorted(values)
+    k = math.floor(len(ordered) * trim)
+    kept = ordered[k:len(ordered) - k]
+    return sum(kept) / len(kept)
+
+
+def padded(rows):
+    out = np.full((len(rows), max(len(r) for r in rows)), np.nan)
+    for i, row in enumerate(rows):
+        out[i, :len(row)] = row
+    return out
+
+
+def test_batch_stats_match_the_statistics_module():
+    stats = batch_stats(padded(ROWS))
+    for i, row in enumerate(ROWS):
+        assert stats["count"][i] == len(row)
+        if not row:
+            for name in ("mean", "median", "stddev", "min", "max", "trimmed_mean"):
+                assert np.isnan(stats[name][i])
+            continue
+        assert stats["mean"][i] == pytest.approx(statistics.mean(row))
+        assert stats["median"][i] == pytest.approx(statistics.median(row))
+        assert stats["stddev"][i] == pytest.approx(statistics.pstdev(row))
+        assert stats["min"][i] == min(row)
+        assert stats["max"][i] == max(row)
+        assert stats["trimmed_mean"][i] == pytest.approx(trimmed_mean(row))
+
+
+def test_trimmed_mean_cuts_each_end():
+    # 10 values, 10% trim: the outliers 1 and 1000 are cut, 2..9 kept
+    row = [1000.0, 2, 3, 4, 5, 6, 7, 8, 9, 1]
+    stats = batch_stats(padded([row]))
+    assert stats["trimmed_mean"][0] == pytest.approx((2 + 3 + 4 + 5 + 6 + 7 + 8 + 9) / 8)
+    assert batch_stats(padded([row]), trim=0.0)["trimmed_mean"][0] == pytest.approx(sum(row) / 10)
+
+
+def test_batch_stats_of_an_empty_matrix():
+    stats = batch_stats(np.empty((2, 0)))
+    assert list(stats["count"]) == [0, 0]
+    assert np.isnan(stats["median"]).all()
+
+
+def test_motionmark_highest_and_lowest_compare_scores_as_numbers():
+    values = ["99.50 @60fps 10.00%", "1000.25 @60fps 50.00%", "385.31 @60fps 43.59%"]
+    stats = compute_bench_stats("motionmark", [[parse_stored("motionmark", v) for v in values]])
+    fields = format_bench_fields("motionmark", stats, 0)
+    assert fields["highest"] == "1000.250 @60fps 50.00%"
+    assert fields["lowest"] == "99.500 @60fps 10.00%"
+    assert fields["average"] == "495.020 @60fps 34.53%"
+
+
+def test_composite_scores_weight_the_scaled_fields():
+    # passmark main, motionmark / jetstream / speedometer averages
+    fields = np.array([
+        [800.0, 400.0, 150.0, 10.0],
+        [400.0, 200.0, 100.0, np.nan],
+        [600.0, 300.0, 125.0, 5.0],
+    ])
+    scores = composite_scores(fields)
+    assert scores == pytest.approx([100.0, 0.0, 0.4 * 50 + 0.2 * 50 + 0.2 * 50 + 0.2 * 0])
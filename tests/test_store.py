@@ -0,0 +1,122 @@
+# test_store.py
+
+import os
+import stat
+
+from includes.store import IsoStore, load_json, new_iso_entry, save_json, write_text_atomic
+
+
+def mode_of(path: str) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_atomic_write_keeps_the_target_mode(tmp_path):
+    path = str(tmp_path / "index.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("old")
+    os.chmod(path, 0o644)
+
+    assert write_text_atomic(path, "new")
+    with open(path, "r", encoding="utf-8") as f:
+        assert f.read() == "new"
+    assert mode_of(path) == 0o644
+
+
+def test_atomic_write_gives_new_files_the_umask_mode(tmp_path):
+    umask = os.umask(0o022)
+    try:
+        path = str(tmp_path / "table.svg")
+        assert write_text_atomic(path, "<svg/>")
+        assert mode_of(path) == 0o644
+    finally:
+        os.umask(umask)
+
+
+def test_save_json_skips_unchanged_data_and_keeps_a_backup(tmp_path):
+    path = str(tmp_path / "data.json")
+    first = [{"name": "A", "values": [str(i) for i in range(9)]}]
+    assert save_json(path, first)
+    assert not save_json(path, first)
+    assert load_json(path) == first
+
+    second = [{"name": "B", "values": []}]
+    assert save_json(path, second)
+    assert load_json(path) == second
+    assert load_json(path + ".bak") == first
+
+
+# ---------- SQLite result store ----------
+
+def sample_entries():
+    a = new_iso_entry("A")
+    a["jetstream"].update({"latest": "2025-01-01-09-00-00", "average": "150.000", "values": ["140.000", "160.000"]})
+    a["passmark"].update({"main": "600.0", "cpu": "5000.0", "2d": "50.0", "3d": "N/A", "memory": "2000.0", "disk": "N/A"})
+    b = new_iso_entry("B")
+    b["jetstream"].update({"average": "170.500", "values": ["170.500", "oops"]})
+    return [a, b]
+
+
+def open_store(tmp_path) -> IsoStore:
+    return IsoStore.open(str(tmp_path / "store.sqlite"), str(tmp_path / "data.json"))
+
+
+def test_store_round_trips_the_json_export(tmp_path):
+    json_path = str(tmp_path / "data.json")
+    save_json(json_path, sample_entries())
+    with open(json_path, "rb") as f:
+        exported = f.read()
+
+    store = open_store(tmp_path)
+    assert store.entries == sample_entries()
+    store.close()
+
+    # Unchanged JSON: the entries come from the database
+    store = open_store(tmp_path)
+    store.get("B")["jetstream"]["values"][1] = "171.000"
+    store.mark_dirty("B", "jetstream")
+    store.get_or_create("C")
+    assert store.save(json_path)
+    store.close()
+    store = open_store(tmp_path)
+    assert store.names() == ["A", "B", "C"]
+    assert store.get("B")["jetstream"]["values"] == ["170.500", "171.000"]
+    store.close()
+
+    # A hand edit (or restore) of the JSON is imported
+    with open(json_path, "wb") as f:
+        f.write(exported)
+    store = open_store(tmp_path)
+    assert store.entries == sample_entries()
+    store.close()
+
+
+def test_deleted_export_is_written_again(tmp_path):
+    json_path = str(tmp_path / "data.json")
+    save_json(json_path, sample_entries())
+    open_store(tmp_path).close()
+    os.remove(json_path)
+
+    store = open_store(tmp_path)
+    assert store.entries == sample_entries()
+    assert store.save(json_path)
+    store.close()
+    assert load_json(json_path) == sample_entries()
+
+
+def test_typed_rows_hold_numbers_and_nulls(tmp_path):
+    save_json(str(tmp_path / "data.json"), sample_entries())
+    store = open_store(tmp_path)
+    db = store.db
+    try:
+        assert db.ranking("jetstream") == [("B", 170.5), ("A", 150.0)]
+        assert db.ranking("passmark") == [("A", 600.0)]
+        # "oops" does not parse: kept as raw text, without a score
+        assert db.conn.execute(
+            "SELECT raw, score FROM results WHERE iso = 'B' AND bench = 'jetstream' ORDER BY position"
+        ).fetchall() == [("170.500", 170.5), ("oops", None)]
+        assert db.conn.execute(
+            "SELECT score, cpu, d3, disk FROM results WHERE iso = 'A' AND bench = 'passmark'"
+        ).fetchall() == [(600.0, 5000.0, None, None)]
+        assert db.bench_stats("jetstream") == [("B", 1, 170.5, 170.5, 170.5), ("A", 2, 150.0, 140.0, 160.0)]
+    finally:
+        store.close()
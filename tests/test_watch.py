@@ -0,0 +1,103 @@
+# test_watch.py
+
+import os
+import shutil
+
+import main
+from includes.config import BENCH_CONFIG, PROVENANCE_PATH
+from includes.ocr_backends import FakeOcrBackend, set_backend
+from includes.provenance import load_provenance
+from includes.store import IsoStore
+from includes.watch import PollingWatcher, Watcher, incomplete_screenshots, png_is_complete
+from pipeline_support import bench_folder, folder_values, load_entries, run_main
+
+
+def write_prefix(src: str, dst: str, size: int) -> None:
+    with open(src, "rb") as f:
+        data = f.read(size)
+    with open(dst, "wb") as f:
+        f.write(data)
+
+
+def test_png_is_complete_only_once_the_iend_chunk_is_written(archive, tmp_path):
+    folder = bench_folder(archive.iso_names[0], "jetstream")
+    src = os.path.join(folder, sorted(os.listdir(folder))[0])
+    assert png_is_complete(src)
+
+    partial = str(tmp_path / "2030-01-01-00-00-00.png")
+    write_prefix(src, partial, os.path.getsize(src) // 2)
+    assert not png_is_complete(partial)
+    assert incomplete_screenshots(str(tmp_path)) == [partial]
+
+    write_prefix(src, partial, 4)
+    assert not png_is_complete(partial)
+    with open(partial, "wb") as f:
+        f.write(b"GIF89a" + b"\0" * 64)
+    assert not png_is_complete(partial)
+    assert not png_is_complete(str(tmp_path / "missing.png"))
+
+    shutil.copyfile(src, partial)
+    assert png_is_complete(partial)
+    assert incomplete_screenshots(str(tmp_path)) == []
+
+
+def test_polling_watcher_reports_changed_bench_folders(archive):
+    watcher = PollingWatcher(interval=0)
+    assert watcher.poll(0) == set()
+
+    iso_name = archive.iso_names[1]
+    folder = bench_folder(iso_name, "speedometer")
+    shutil.copyfile(os.path.join(folder, sorted(os.listdir(folder))[0]), os.path.join(folder, "2030-01-01-00-00-00.png"))
+    assert watcher.poll(0) == {(iso_name, "speedometer")}
+    assert watcher.poll(0) == set()
+
+    # A new ISO folder is picked up with its bench folders
+    iso_dir = os.path.dirname(folder)
+    shutil.copytree(iso_dir, os.path.join(os.path.dirname(iso_dir), "Z99. New ISO"))
+    assert watcher.poll(0) == {("Z99. New ISO", bench_key) for bench_key in BENCH_CONFIG.values()}
+
+
+class ScriptedWatcher(Watcher):
+    """Runs one step per poll; the step returns the changed pairs. Out of steps: Ctrl+C."""
+    kind = "scripted"
+
+    def __init__(self, steps) -> None:
+        super().__init__()
+        self.steps = list(steps)
+
+    def poll(self, timeout: float):
+        if not self.steps:
+            raise KeyboardInterrupt
+        return self.steps.pop(0)()
+
+
+def test_watch_waits_for_partially_written_screenshots(archive, monkeypatch, recognizer):
+    assert run_main(monkeypatch) == 0
+    iso_name = archive.iso_names[0]
+    folder = bench_folder(iso_name, "jetstream")
+    src = os.path.join(folder, sorted(os.listdir(folder))[0])
+    landing = os.path.join(folder, "2030-01-01-00-00-00.png")
+    before = load_entries()[iso_name]["jetstream"]["values"]
+
+    def start_writing():
+        write_prefix(src, landing, os.path.getsize(src) // 2)
+        return {(iso_name, "jetstream")}
+
+    def finish_writing():
+        # The half-written PNG was not read
+        assert recognizer.calls == 0
+        assert load_entries()[iso_name]["jetstream"]["values"] == before
+        shutil.copyfile(src, landing)
+        archive.expected[landing] = archive.expected[src]
+        return set()
+
+    # main() closed the run's backend; --watch keeps it open
+    set_backend(FakeOcrBackend(recognizer=recognizer))
+    recognizer.calls = 0
+    store = IsoStore.open()
+    try:
+        main.watch_forever(store, load_provenance(PROVENANCE_PATH), ScriptedWatcher([start_writing, finish_writing]), debounce=0)
+    finally:
+        store.close()
+    assert recognizer.calls == 1
+    assert load_entries()[iso_name]["jetstream"]["values"] == folder_values(archive, folder)